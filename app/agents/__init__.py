@@ -4,7 +4,9 @@ from .unique_strengths import UniqueStrengthsAgent
 from .target_audience import TargetAudienceAgent
 from .content_strategy import ContentStrategyAgent
 from .launch_planning import LaunchPlanningAgent
-from .orchestrator import AgentOrchestrator
+from .combined import CombinedAgent
+from .orchestrator import AgentOrchestrator, REPORT_SECTIONS, WORKFLOW_DEADLINE_SECONDS
+from .registry import create_orchestrator
 
 __all__ = [
     'BaseAgent',
@@ -13,5 +15,9 @@ __all__ = [
     'TargetAudienceAgent',
     'ContentStrategyAgent',
     'LaunchPlanningAgent',
-    'AgentOrchestrator'
+    'CombinedAgent',
+    'AgentOrchestrator',
+    'REPORT_SECTIONS',
+    'WORKFLOW_DEADLINE_SECONDS',
+    'create_orchestrator'
 ]
@@ -1,32 +1,343 @@
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Awaitable, Callable, Tuple, Type
 from abc import ABC, abstractmethod
+from openai import AsyncOpenAI
+from pydantic import BaseModel, ValidationError
+import os
+import time
+import logging
+from ..core.deadline import Deadline, DeadlineExceeded
+from ..core.json_stream import IncrementalJSONParser, parse_json_object
+from ..core.metrics import LLMMetrics
+from ..core.tracing import current_span, span
+from ..services.llm_client import get_llm_client
+from ..services.llm_cache import get_llm_cache
+from ..services.single_flight import get_llm_single_flight
+from ..services.rate_limiter import (
+    get_rate_limiter, estimate_tokens, estimate_prompt_tokens, count_tokens
+)
+from ..services.resilience import (
+    LatencyTracker, call_with_retries, hedged, LLM_HEDGE_ENABLED, LLM_HEDGE_MIN_SAMPLES, TRANSIENT_ERRORS
+)
+
+logger = logging.getLogger(__name__)
+
+# Stream completions and publish output fields as soon as each one closes
+LLM_STREAMING = os.getenv("LLM_STREAMING", "false").lower() == "true"
+
+# Errors after which the orchestrator skips an agent instead of failing the
+# workflow: running out of time, and transient LLM errors that outlasted retries
+SKIPPABLE_ERRORS = (DeadlineExceeded,) + TRANSIENT_ERRORS
+
+def skippable_cause(error: BaseException) -> Optional[BaseException]:
+    """
+    Find the skippable error behind an agent failure.
+    
+    Agents wrap their errors with context (`raise ... from e`), so the
+    chain of causes is searched rather than the error itself.
+    
+    Args:
+        error: The error raised by an agent
+        
+    Returns:
+        The first error in the chain of causes that is skippable, or None
+    """
+    while error is not None:
+        if isinstance(error, SKIPPABLE_ERRORS):
+            return error
+        error = error.__cause__
+    return None
+
+# Callback receiving (field name, value) for each completed output field
+FieldCallback = Callable[[str, Any], None]
 
 class BaseAgent(ABC):
     """Base class for all agents in the PersonalBrand.AI system."""
     
-    def __init__(self, name: str, description: str):
+    # Context fields the agent reads (user input or another agent's output)
+    required_fields: List[str] = []
+    # Context fields the agent contributes to the workflow context
+    output_fields: List[str] = []
+    # System message for the agent's completions
+    system_prompt: str = ""
+    # Model in app/models/output_models.py describing the agent's output
+    output_model: Optional[Type[BaseModel]] = None
+    # Values used for output fields missing from a completion
+    fallback_output: Dict[str, Any] = {}
+    
+    def __init__(self, name: str, description: str, client: Optional[AsyncOpenAI] = None):
+        # Agents hold no per-request state so one instance can serve
+        # concurrent workflows; the LLM client is shared process-wide
         self.name = name
         self.description = description
-        self.context: Dict[str, Any] = {}
+        self.client = client or get_llm_client()
+        self.model_name = os.getenv("OPENAI_MODEL_NAME", "gpt-4")
+        self.streaming = LLM_STREAMING
+        self.hedging = LLM_HEDGE_ENABLED
+        # Latencies of this agent's completions, used to decide when to hedge
+        self.latency = LatencyTracker()
+        self.metrics = LLMMetrics(name)
+    
+    @abstractmethod
+    def build_prompt(self, input_data: Dict[str, Any]) -> str:
+        """
+        Build the task prompt for the agent's completion.
+        
+        Args:
+            input_data: Dictionary containing the agent's required fields
+            
+        Returns:
+            The user message sent to the LLM
+        """
+        pass
     
     @abstractmethod
-    async def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def process(
+        self,
+        input_data: Dict[str, Any],
+        on_field: Optional[FieldCallback] = None,
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
         """
         Process the input data and return the results.
         
         Args:
             input_data: Dictionary containing the input data for the agent
+            on_field: Optional callback for output fields completed while streaming
+            deadline: Optional time budget for the agent's LLM calls
             
         Returns:
             Dictionary containing the processed results
         """
         pass
     
-    def update_context(self, new_context: Dict[str, Any]) -> None:
-        """Update the agent's context with new information."""
-        self.context.update(new_context)
+    async def complete(
+        self,
+        system_prompt: str,
+        prompt: str,
+        on_field: Optional[FieldCallback] = None,
+        deadline: Optional[Deadline] = None,
+        **params: Any
+    ) -> str:
+        """
+        Run a chat completion for this agent.
+        
+        Prompts are built only from the input data, so identical requests are
+        answered from the response cache instead of calling the LLM again.
+        When streaming is enabled and on_field is given, the completion is
+        streamed and each output field is published as soon as it closes.
+        Transient errors are retried while the deadline allows, and with
+        hedging enabled a second call is sent if the first is slower than
+        this agent's p95 latency. While streaming fields, only the first call
+        publishes them and no hedge is sent, so fields never come from two
+        different completions. Enforcing the deadline is left to the caller.
+        Concurrent calls with the same prompt share a single LLM call.
+        
+        Args:
+            system_prompt: System message describing the agent's role
+            prompt: User message with the task
+            on_field: Optional callback for output fields completed while streaming
+            deadline: Optional deadline bounding retries
+            **params: Extra sampling parameters passed to the API
+            
+        Returns:
+            The completion text
+        """
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt}
+        ]
+        cache = get_llm_cache()
+        cache_key = cache.make_key(self.model_name, messages, params)
+        
+        cached = await cache.get(cache_key)
+        if cached is not None:
+            self.metrics.cache_hits.inc()
+            current_span().set_attribute("cache_hit", True)
+            return cached
+        self.metrics.cache_misses.inc()
+        
+        streaming = self.streaming and on_field is not None
+        
+        async def generate() -> str:
+            hedge_after = (
+                self.latency.percentile(0.95, min_samples=LLM_HEDGE_MIN_SAMPLES)
+                if self.hedging and not streaming else None
+            )
+            attempts = 0
+            
+            def attempt() -> Awaitable[str]:
+                nonlocal attempts
+                attempts += 1
+                # Retries are not streamed: fields the failed first call
+                # published must not be joined by those of another completion
+                return self._call_llm(messages, on_field if attempts == 1 else None, params)
+            
+            content = await call_with_retries(
+                lambda: hedged(
+                    attempt,
+                    hedge_after,
+                    on_hedge=self.metrics.hedges.inc
+                ),
+                deadline=deadline,
+                on_retry=lambda _: self.metrics.retries.inc()
+            )
+            # A truncated or malformed response is not cached, so the next
+            # identical request asks the LLM again instead of getting fallbacks
+            if self.is_valid_output(content):
+                await cache.set(cache_key, content)
+            else:
+                logger.warning(f"Not caching incomplete or invalid {self.name} response")
+            return content
+        
+        # Identical prompts already being answered join that call; only the
+        # first caller's on_field sees fields while streaming
+        return await get_llm_single_flight().do(cache_key, generate)
+    
+    async def _call_llm(
+        self,
+        messages: List[Dict[str, str]],
+        on_field: Optional[FieldCallback],
+        params: Dict[str, Any]
+    ) -> str:
+        """Make one completion call through the shared rate limiter."""
+        # Every agent in every request shares the process-wide rate limits
+        estimated = estimate_tokens(messages, params.get("max_tokens"))
+        streaming = self.streaming and on_field is not None
+        with span("llm.chat_completion", agent=self.name, model=self.model_name, streaming=streaming) as llm_span:
+            queued = time.monotonic()
+            try:
+                async with get_rate_limiter().limit(estimated) as permit:
+                    started = time.monotonic()
+                    llm_span.set_attribute("queued_ms", round((started - queued) * 1000, 3))
+                    if streaming:
+                        content = await self._stream_completion(messages, on_field, params)
+                        # Streamed responses carry no usage; count the text instead
+                        prompt_tokens = estimate_prompt_tokens(messages)
+                        completion_tokens = count_tokens(content)
+                        permit.record_usage(prompt_tokens + completion_tokens)
+                        self.metrics.record_usage(prompt_tokens, completion_tokens)
+                        llm_span.set_attribute("prompt_tokens", prompt_tokens)
+                        llm_span.set_attribute("completion_tokens", completion_tokens)
+                    else:
+                        response = await self.client.chat.completions.create(
+                            model=self.model_name,
+                            messages=messages,
+                            **params
+                        )
+                        content = response.choices[0].message.content
+                        if response.usage is not None:
+                            permit.record_usage(response.usage.total_tokens)
+                            self.metrics.record_usage(
+                                response.usage.prompt_tokens, response.usage.completion_tokens
+                            )
+                            llm_span.set_attribute("prompt_tokens", response.usage.prompt_tokens)
+                            llm_span.set_attribute("completion_tokens", response.usage.completion_tokens)
+                    elapsed = time.monotonic() - started
+                    self.latency.record(elapsed)
+                    self.metrics.seconds.observe(elapsed)
+            except Exception as e:
+                self.metrics.record_error(e)
+                raise
+        return content
+    
+    async def _stream_completion(
+        self,
+        messages: List[Dict[str, str]],
+        on_field: FieldCallback,
+        params: Dict[str, Any]
+    ) -> str:
+        """Stream a completion, publishing output fields as the JSON is parsed."""
+        parser = IncrementalJSONParser()
+        chunks: List[str] = []
+        
+        stream = await self.client.chat.completions.create(
+            model=self.model_name,
+            messages=messages,
+            stream=True,
+            **params
+        )
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            chunks.append(delta)
+            for field, value in parser.feed(delta):
+                if field in self.output_fields:
+                    on_field(field, value)
+        
+        return "".join(chunks)
+    
+    def split_result(self, result: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+        """Return (agent name, result) pairs for the report sections this result covers."""
+        return [(self.name, result)]
+    
+    def parse_output(self, content: str, fallback: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Extract the agent's output fields from a JSON completion.
+        
+        Args:
+            content: Completion text containing a JSON object
+            fallback: Values used for output fields missing from the completion
+            
+        Returns:
+            Dictionary with exactly the agent's output fields
+        """
+        parsed = parse_json_object(content)
+        return {
+            field: parsed[field] if field in parsed else fallback[field]
+            for field in self.output_fields
+        }
+    
+    def validate_output(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Validate a result against the agent's output model.
+        
+        Results are built from LLM output, so a field of the wrong type is
+        replaced by its fallback value instead of reaching the report.
+        
+        Args:
+            result: The agent's output fields
+            
+        Returns:
+            The validated output fields, as dumped by the output model
+        """
+        if self.output_model is None:
+            return result
+        try:
+            return self.output_model.model_validate(result).model_dump()
+        except ValidationError as e:
+            invalid = {error["loc"][0] for error in e.errors() if error["loc"]}
+            logger.warning(f"Invalid {self.name} output fields {sorted(invalid)}: {str(e)}")
+            result = {
+                field: self.fallback_output[field] if field in invalid or field not in result else result[field]
+                for field in self.output_fields
+            }
+            return self.output_model.model_validate(result).model_dump()
+    
+    def is_valid_output(self, content: str) -> bool:
+        """
+        Check that a completion is a complete JSON object with a valid value
+        for each of the agent's output fields.
+        
+        Args:
+            content: Completion text containing a JSON object
+            
+        Returns:
+            Boolean indicating if the completion needs no fallback values
+        """
+        parser = IncrementalJSONParser()
+        parsed = dict(parser.feed(content or ""))
+        if not parser.finished or any(field not in parsed for field in self.output_fields):
+            return False
+        if self.output_model is not None:
+            try:
+                self.output_model.model_validate({field: parsed[field] for field in self.output_fields})
+            except ValidationError:
+                return False
+        return True
     
-    @abstractmethod
     def validate_input(self, input_data: Dict[str, Any]) -> bool:
         """
         Validate the input data before processing.
@@ -35,6 +346,6 @@ class BaseAgent(ABC):
             input_data: Dictionary containing the input data to validate
             
         Returns:
-            Boolean indicating if the input is valid
+            Boolean indicating if all of the agent's required fields are present
         """
-        pass 
\ No newline at end of file
+        return all(field in input_data for field in self.required_fields)
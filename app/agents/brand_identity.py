@@ -1,34 +1,43 @@
-from typing import Dict, List, Any
-from .base import BaseAgent
+from typing import Dict, List, Any, Optional
+from .base import BaseAgent, FieldCallback
+from ..core.deadline import Deadline
+from ..models.output_models import BrandIdentity
 from openai import AsyncOpenAI
-import os
 
 class BrandIdentityAgent(BaseAgent):
     """Agent responsible for defining the user's brand identity."""
     
-    def __init__(self):
+    required_fields = [
+        "basic_identity",
+        "branding_goal",
+        "style_tone",
+        "industry_focus"
+    ]
+    output_fields = [
+        "brand_title",
+        "brand_slogan",
+        "core_values"
+    ]
+    system_prompt = "You are a personal branding expert."
+    output_model = BrandIdentity
+    # Example values used for fields missing from the response
+    fallback_output = {
+        "brand_title": "Example: AI Developer and Tech Educator",
+        "brand_slogan": "Example: Building AI, Inspiring Minds",
+        "core_values": ["Innovation", "Authenticity", "Growth"]
+    }
+    
+    def __init__(self, client: Optional[AsyncOpenAI] = None):
         super().__init__(
             name="BrandIdentityAgent",
-            description="Helps define user's professional brand identity and positioning"
+            description="Helps define user's professional brand identity and positioning",
+            client=client
         )
-        self.client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        self.model_name = os.getenv("OPENAI_MODEL_NAME", "gpt-4")
-    
-    def validate_input(self, input_data: Dict[str, Any]) -> bool:
-        """Validate required input fields."""
-        required_fields = [
-            "basic_identity",
-            "branding_goal",
-            "style_tone",
-            "industry_focus"
-        ]
-        return all(field in input_data for field in required_fields)
     
-    async def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Process user input to generate brand identity recommendations."""
-        
+    def build_prompt(self, input_data: Dict[str, Any]) -> str:
+        """Build the task prompt from the agent's input fields."""
         # Construct prompt for the LLM
-        prompt = f"""
+        return f"""
         Based on the following information about a professional seeking to build their personal brand:
         
         Background: {input_data['basic_identity']}
@@ -43,25 +52,27 @@ class BrandIdentityAgent(BaseAgent):
         
         Format the response as a JSON object with keys: brand_title, brand_slogan, core_values (array)
         """
+    
+    async def process(
+        self,
+        input_data: Dict[str, Any],
+        on_field: Optional[FieldCallback] = None,
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
+        """Process user input to generate brand identity recommendations."""
+        
+        prompt = self.build_prompt(input_data)
         
         try:
-            # Call OpenAI API using the new syntax
-            response = await self.client.chat.completions.create(
-                model=self.model_name,
-                messages=[
-                    {"role": "system", "content": "You are a personal branding expert."},
-                    {"role": "user", "content": prompt}
-                ]
+            # Call OpenAI API through the shared cached completion path
+            result = await self.complete(
+                system_prompt=self.system_prompt,
+                prompt=prompt,
+                on_field=on_field,
+                deadline=deadline
             )
             
-            # Extract and structure the response
-            result = response.choices[0].message.content
-            # Note: In production, add proper JSON parsing and error handling
-            
-            return {
-                "brand_title": "Example: AI Developer and Tech Educator",  # Replace with actual parsed result
-                "brand_slogan": "Example: Building AI, Inspiring Minds",   # Replace with actual parsed result
-                "core_values": ["Innovation", "Authenticity", "Growth"]    # Replace with actual parsed result
-            }
+            # Fields missing from the response fall back to the example values
+            return self.parse_output(result, fallback=self.fallback_output)
         except Exception as e:
-            raise Exception(f"Failed to process brand identity: {str(e)}") 
\ No newline at end of file
+            raise Exception(f"Failed to process brand identity: {str(e)}") from e
\ No newline at end of file
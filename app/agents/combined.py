@@ -0,0 +1,126 @@
+import json
+import logging
+from typing import Dict, List, Any, Optional, Tuple
+from pydantic import ValidationError
+from .base import BaseAgent, FieldCallback
+from ..core.deadline import Deadline
+from ..core.json_stream import parse_json_object
+
+logger = logging.getLogger(__name__)
+
+class CombinedAgent(BaseAgent):
+    """
+    Runs several agents' tasks as a single completion.
+
+    The member agents' prompts are sent together with a JSON schema merged
+    from their output models, and the response is split back into one
+    result per member. Fields a member reads from an earlier member are
+    answered within the same completion, so the group needs only the
+    inputs coming from outside it.
+    """
+
+    system_prompt = (
+        "You are a team of personal branding experts completing several related "
+        "tasks in one response."
+    )
+
+    def __init__(self, agents: List[BaseAgent]):
+        super().__init__(
+            name="+".join(agent.name for agent in agents),
+            description="Combined: " + "; ".join(agent.description for agent in agents),
+            client=agents[0].client
+        )
+        self.members = agents
+        produced = {field for agent in agents for field in agent.output_fields}
+        self.required_fields = list(dict.fromkeys(
+            field for agent in agents for field in agent.required_fields if field not in produced
+        ))
+        self.output_fields = [field for agent in agents for field in agent.output_fields]
+        self.output_schema = self._merge_schemas(agents)
+
+    @staticmethod
+    def _merge_schemas(agents: List[BaseAgent]) -> Dict[str, Any]:
+        """Merge the members' output model schemas into one flat object schema."""
+        schema: Dict[str, Any] = {"type": "object", "properties": {}, "required": []}
+        definitions: Dict[str, Any] = {}
+        for agent in agents:
+            model_schema = agent.output_model.model_json_schema()
+            schema["properties"].update(model_schema["properties"])
+            schema["required"].extend(model_schema.get("required", []))
+            definitions.update(model_schema.get("$defs", {}))
+        if definitions:
+            schema["$defs"] = definitions
+        return schema
+
+    def build_prompt(self, input_data: Dict[str, Any]) -> str:
+        """Build one prompt containing every member's task, in dependency order."""
+        context = dict(input_data)
+        tasks = []
+        for number, agent in enumerate(self.members, start=1):
+            tasks.append(f"Task {number} ({agent.system_prompt})\n{agent.build_prompt(context)}")
+            # Later tasks refer to this task's answers instead of known values
+            for field, info in agent.output_model.model_json_schema()["properties"].items():
+                reference = f"(your {field.replace('_', ' ')} from task {number})"
+                context[field] = [reference] if info.get("type") == "array" else reference
+
+        return (
+            "Complete the following tasks in order; later tasks build on your answers "
+            "to earlier ones.\n\n"
+            + "\n\n".join(tasks)
+            + "\n\nIgnore the response formats requested in the individual tasks. Answer "
+            "with a single JSON object containing the keys of every task, matching this "
+            f"JSON schema:\n{json.dumps(self.output_schema)}"
+        )
+
+    async def process(
+        self,
+        input_data: Dict[str, Any],
+        on_field: Optional[FieldCallback] = None,
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
+        """Run the members' tasks in one completion and return all their fields."""
+        try:
+            result = await self.complete(
+                system_prompt=self.system_prompt,
+                prompt=self.build_prompt(input_data),
+                on_field=on_field,
+                deadline=deadline
+            )
+        except Exception as e:
+            raise Exception(f"Failed to process combined agents {self.name}: {str(e)}") from e
+
+        parsed = parse_json_object(result)
+        output: Dict[str, Any] = {}
+        for agent in self.members:
+            section = {
+                field: parsed.get(field, agent.fallback_output[field])
+                for field in agent.output_fields
+            }
+            try:
+                agent.output_model.model_validate(section)
+            except ValidationError as e:
+                # An invalid section falls back as a whole, like missing fields do
+                logger.warning(f"Invalid {agent.name} output in combined response: {str(e)}")
+                section = dict(agent.fallback_output)
+            output.update(section)
+        return output
+
+    def validate_output(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate each member's fields against that member's output model."""
+        output: Dict[str, Any] = {}
+        for agent in self.members:
+            output.update(agent.validate_output({
+                field: result[field] for field in agent.output_fields if field in result
+            }))
+        return output
+
+    def is_valid_output(self, content: str) -> bool:
+        """Check that the completion answers every member's task with valid values."""
+        return all(agent.is_valid_output(content) for agent in self.members)
+
+    def split_result(self, result: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+        """Split the combined result into one result per member agent."""
+        return [
+            (agent.name, {field: result[field] for field in agent.output_fields})
+            for agent in self.members
+        ]
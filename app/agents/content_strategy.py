@@ -1,35 +1,61 @@
-from typing import Dict, List, Any
-from .base import BaseAgent
+from typing import Dict, List, Any, Optional
+from .base import BaseAgent, FieldCallback
+from ..core.deadline import Deadline
+from ..models.output_models import ContentStrategy
 from openai import AsyncOpenAI
-import os
 
 class ContentStrategyAgent(BaseAgent):
     """Agent responsible for developing content strategy and platform recommendations."""
     
-    def __init__(self):
+    required_fields = [
+        "content_format_preference",
+        "preferred_platforms",
+        "target_language",
+        "target_audience_profile",    # From TargetAudienceAgent
+        "audience_interests",         # From TargetAudienceAgent
+        "brand_title",               # From BrandIdentityAgent
+    ]
+    output_fields = [
+        "recommended_platforms",
+        "content_themes",
+        "content_formats"
+    ]
+    system_prompt = "You are an expert content strategist who excels at developing engaging content strategies for professional personal brands."
+    output_model = ContentStrategy
+    # Example values used for fields missing from the response
+    fallback_output = {
+        "recommended_platforms": [
+            "LinkedIn",
+            "Twitter",
+            "Personal Blog",
+            "YouTube"
+        ],
+        "content_themes": [
+            "AI Project Showcases",
+            "Technical Tutorial Series",
+            "Industry Trends Analysis",
+            "Career Growth Tips",
+            "Behind-the-Scenes Development"
+        ],
+        "content_formats": [
+            "Technical Blog Posts",
+            "Code Walkthrough Videos",
+            "LinkedIn Articles",
+            "Twitter Threads",
+            "Live Coding Sessions"
+        ]
+    }
+    
+    def __init__(self, client: Optional[AsyncOpenAI] = None):
         super().__init__(
             name="ContentStrategyAgent",
-            description="Develops content themes and platform strategy for personal brand"
+            description="Develops content themes and platform strategy for personal brand",
+            client=client
         )
-        self.client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        self.model_name = os.getenv("OPENAI_MODEL_NAME", "gpt-4")
     
-    def validate_input(self, input_data: Dict[str, Any]) -> bool:
-        """Validate required input fields."""
-        required_fields = [
-            "content_format_preference",
-            "preferred_platforms",
-            "target_language",
-            "target_audience_profile",    # From TargetAudienceAgent
-            "audience_interests",         # From TargetAudienceAgent
-            "brand_title",               # From BrandIdentityAgent
-        ]
-        return all(field in input_data for field in required_fields)
-    
-    async def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Process user input to develop content strategy recommendations."""
-        
-        prompt = f"""
+    def build_prompt(self, input_data: Dict[str, Any]) -> str:
+        """Build the task prompt from the agent's input fields."""
+        return f"""
         Based on the following personal brand and audience information:
         
         Brand Title: {input_data['brand_title']}
@@ -51,43 +77,27 @@ class ContentStrategyAgent(BaseAgent):
         
         Ensure recommendations are practical and aligned with the target audience's preferences.
         """
+    
+    async def process(
+        self,
+        input_data: Dict[str, Any],
+        on_field: Optional[FieldCallback] = None,
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
+        """Process user input to develop content strategy recommendations."""
+        
+        prompt = self.build_prompt(input_data)
         
         try:
-            response = await self.client.chat.completions.create(
-                model=self.model_name,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert content strategist who excels at developing engaging content strategies for professional personal brands."
-                    },
-                    {"role": "user", "content": prompt}
-                ]
+            result = await self.complete(
+                system_prompt=self.system_prompt,
+                prompt=prompt,
+                on_field=on_field,
+                deadline=deadline
             )
             
-            # In production, add proper JSON parsing
-            # This is a simplified example response structure
-            return {
-                "recommended_platforms": [
-                    "LinkedIn",
-                    "Twitter",
-                    "Personal Blog",
-                    "YouTube"
-                ],
-                "content_themes": [
-                    "AI Project Showcases",
-                    "Technical Tutorial Series",
-                    "Industry Trends Analysis",
-                    "Career Growth Tips",
-                    "Behind-the-Scenes Development"
-                ],
-                "content_formats": [
-                    "Technical Blog Posts",
-                    "Code Walkthrough Videos",
-                    "LinkedIn Articles",
-                    "Twitter Threads",
-                    "Live Coding Sessions"
-                ]
-            }
+            # Fields missing from the response fall back to this example structure
+            return self.parse_output(result, fallback=self.fallback_output)
             
         except Exception as e:
-            raise Exception(f"Failed to process content strategy development: {str(e)}") 
\ No newline at end of file
+            raise Exception(f"Failed to process content strategy development: {str(e)}") from e
\ No newline at end of file
@@ -1,34 +1,93 @@
-from typing import Dict, List, Any
-from .base import BaseAgent
-from openai import AsyncOpenAI
 import os
+import asyncio
+import logging
+from typing import Dict, List, Any, Optional, Tuple
+from pydantic import ValidationError
+from .base import BaseAgent, FieldCallback
+from ..core.deadline import Deadline
+from ..core.json_stream import parse_json_object
+from ..core.metrics import LAUNCH_PLAN_OUTLINE_WEEKS
+from ..models.output_models import ContentPiece, LaunchPlan, WeeklyPlan
+from openai import AsyncOpenAI
+
+logger = logging.getLogger(__name__)
+
+# Length of the launch plan, and the number of week ranges generated concurrently
+LAUNCH_PLAN_WEEKS = 12
+LAUNCH_PLAN_SHARDS = int(os.getenv("LAUNCH_PLAN_SHARDS", "1"))
 
 class LaunchPlanningAgent(BaseAgent):
     """Agent responsible for creating a concrete launch plan and content calendar."""
     
-    def __init__(self):
+    required_fields = [
+        "recommended_platforms",    # From ContentStrategyAgent
+        "content_themes",          # From ContentStrategyAgent
+        "content_formats",         # From ContentStrategyAgent
+        "brand_title",            # From BrandIdentityAgent
+        "personal_story"          # From UniqueStrengthsAgent
+    ]
+    output_fields = [
+        "launch_schedule"
+    ]
+    system_prompt = "You are an expert content calendar strategist who excels at creating realistic and impactful launch plans."
+    output_model = LaunchPlan
+    # Example values used for fields missing from the response
+    fallback_output = {
+        "launch_schedule": [
+            {
+                "week_number": 1,
+                "content": [
+                    {
+                        "content_type": "Article",
+                        "topic": "Personal Introduction and Vision",
+                        "platform": "LinkedIn"
+                    },
+                    {
+                        "content_type": "Thread",
+                        "topic": "My AI Journey Highlights",
+                        "platform": "Twitter"
+                    }
+                ]
+            },
+            {
+                "week_number": 2,
+                "content": [
+                    {
+                        "content_type": "Tutorial",
+                        "topic": "Building Your First AI Model",
+                        "platform": "Personal Blog"
+                    },
+                    {
+                        "content_type": "Video",
+                        "topic": "Code Walkthrough",
+                        "platform": "YouTube"
+                    }
+                ]
+            }
+            # Additional weeks would be included in production
+        ]
+    }
+    
+    def __init__(self, client: Optional[AsyncOpenAI] = None, shards: int = LAUNCH_PLAN_SHARDS):
         super().__init__(
             name="LaunchPlanningAgent",
-            description="Develops actionable launch plan and content calendar for personal brand"
+            description="Develops actionable launch plan and content calendar for personal brand",
+            client=client
         )
-        self.client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        self.model_name = os.getenv("OPENAI_MODEL_NAME", "gpt-4")
-    
-    def validate_input(self, input_data: Dict[str, Any]) -> bool:
-        """Validate required input fields."""
-        required_fields = [
-            "recommended_platforms",    # From ContentStrategyAgent
-            "content_themes",          # From ContentStrategyAgent
-            "content_formats",         # From ContentStrategyAgent
-            "brand_title",            # From BrandIdentityAgent
-            "personal_story"          # From UniqueStrengthsAgent
-        ]
-        return all(field in input_data for field in required_fields)
+        self.shards = max(1, min(shards, LAUNCH_PLAN_WEEKS))
     
-    async def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Process user input to create launch schedule and content calendar."""
-        
-        prompt = f"""
+    def build_prompt(self, input_data: Dict[str, Any], weeks: Optional[Tuple[int, int]] = None) -> str:
+        """Build the task prompt from the agent's input fields, for the whole plan or one shard's (first, last) weeks."""
+        if weeks is None:
+            tasks = f"""1. A {LAUNCH_PLAN_WEEKS}-week launch plan with specific content pieces and timing
+        2. Each week should have 2-3 content pieces across different platforms
+        3. Start with introduction content and gradually build complexity"""
+        else:
+            first, last = weeks
+            tasks = f"""1. A launch plan for weeks {first} to {last} only, with specific content pieces and timing; the other weeks are planned separately
+        2. Each week should have 2-3 content pieces across different platforms
+        3. Give each week the phase and theme the outline below sets for it"""
+        return f"""
         Based on the following content strategy and brand information:
         
         Brand Title: {input_data['brand_title']}
@@ -38,68 +97,188 @@ class LaunchPlanningAgent(BaseAgent):
         Personal Story: {input_data['personal_story']}
         
         Please create:
-        1. A 12-week launch plan with specific content pieces and timing
-        2. Each week should have 2-3 content pieces across different platforms
-        3. Start with introduction content and gradually build complexity
+        {tasks}
         
-        Format the response as a JSON array of weekly plans, each containing:
+        Format the response as a JSON object with key launch_schedule, an array of weekly plans, each containing:
         - week_number (int)
-        - content_type (string)
-        - topic (string)
-        - platform (string)
+        - content (array of objects with content_type, topic and platform strings)
         
         Ensure the plan is realistic and manageable for one person to execute.
         """
+    
+    async def process(
+        self,
+        input_data: Dict[str, Any],
+        on_field: Optional[FieldCallback] = None,
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
+        """Process user input to create launch schedule and content calendar."""
+        
+        if self.shards > 1:
+            return await self._process_sharded(input_data, on_field, deadline)
+        
+        prompt = self.build_prompt(input_data)
         
         try:
-            response = await self.client.chat.completions.create(
-                model=self.model_name,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert content calendar strategist who excels at creating realistic and impactful launch plans."
-                    },
-                    {"role": "user", "content": prompt}
-                ]
+            result = await self.complete(
+                system_prompt=self.system_prompt,
+                prompt=prompt,
+                on_field=on_field,
+                deadline=deadline
             )
             
-            # In production, add proper JSON parsing
-            # This is a simplified example response structure
-            return {
-                "launch_schedule": [
-                    {
-                        "week_number": 1,
-                        "content": [
-                            {
-                                "content_type": "Article",
-                                "topic": "Personal Introduction and Vision",
-                                "platform": "LinkedIn"
-                            },
-                            {
-                                "content_type": "Thread",
-                                "topic": "My AI Journey Highlights",
-                                "platform": "Twitter"
-                            }
-                        ]
-                    },
-                    {
-                        "week_number": 2,
-                        "content": [
-                            {
-                                "content_type": "Tutorial",
-                                "topic": "Building Your First AI Model",
-                                "platform": "Personal Blog"
-                            },
-                            {
-                                "content_type": "Video",
-                                "topic": "Code Walkthrough",
-                                "platform": "YouTube"
-                            }
-                        ]
-                    }
-                    # Additional weeks would be included in production
-                ]
-            }
+            # Fields missing from the response fall back to this example structure
+            return self.parse_output(result, fallback=self.fallback_output)
             
         except Exception as e:
-            raise Exception(f"Failed to create launch plan: {str(e)}") 
\ No newline at end of file
+            raise Exception(f"Failed to create launch plan: {str(e)}") from e
+    
+    def week_ranges(self) -> List[Tuple[int, int]]:
+        """Split the plan into contiguous, near-equal (first week, last week) ranges."""
+        size, extra = divmod(LAUNCH_PLAN_WEEKS, self.shards)
+        ranges = []
+        first = 1
+        for index in range(self.shards):
+            last = first + size - 1 + (1 if index < extra else 0)
+            ranges.append((first, last))
+            first = last + 1
+        return ranges
+    
+    def outline_weeks(self, input_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Derive a week-by-week outline of the plan from the content strategy.
+        
+        The outline needs no LLM call, so shards agree on the progression,
+        themes and platforms of the plan, and weeks a shard left out can be
+        filled in from it.
+        
+        Returns:
+            One dict per week with its week_number, phase, theme and platforms
+        """
+        themes = input_data['content_themes'] or ["Brand introduction"]
+        platforms = input_data['recommended_platforms'] or ["LinkedIn"]
+        # Start with introduction content and gradually build complexity
+        phases = ["introduction", "deepening expertise", "advanced topics and community"]
+        weeks = []
+        for week in range(1, LAUNCH_PLAN_WEEKS + 1):
+            weeks.append({
+                "week_number": week,
+                "phase": phases[(week - 1) * len(phases) // LAUNCH_PLAN_WEEKS],
+                "theme": themes[(week - 1) % len(themes)],
+                "platforms": sorted({platforms[(week - 1) % len(platforms)], platforms[week % len(platforms)]})
+            })
+        return weeks
+    
+    def build_outline(self, input_data: Dict[str, Any]) -> str:
+        """Build the short week-by-week outline shared by every shard's prompt."""
+        return "\n".join(
+            f"Week {week['week_number']}: {week['phase']}; theme: {week['theme']}; "
+            f"platforms: {', '.join(week['platforms'])}"
+            for week in self.outline_weeks(input_data)
+        )
+    
+    def outline_week_plan(self, input_data: Dict[str, Any], week: Dict[str, Any]) -> WeeklyPlan:
+        """Turn one outline week into a plan, for weeks no shard produced."""
+        formats = input_data['content_formats'] or ["Post"]
+        return WeeklyPlan(
+            week_number=week["week_number"],
+            from_outline=True,
+            content=[
+                ContentPiece(
+                    content_type=formats[(week["week_number"] - 1 + index) % len(formats)],
+                    topic=f"{week['theme']} ({week['phase']})",
+                    platform=platform
+                )
+                for index, platform in enumerate(week["platforms"])
+            ]
+        )
+    
+    @staticmethod
+    def merge_shards(ranges: List[Tuple[int, int]], schedules: List[Any]) -> Dict[int, WeeklyPlan]:
+        """Collect the valid weeks each shard was responsible for, by week number."""
+        weeks: Dict[int, WeeklyPlan] = {}
+        for (first, last), schedule in zip(ranges, schedules):
+            for entry in schedule if isinstance(schedule, list) else []:
+                try:
+                    week = WeeklyPlan.model_validate(entry)
+                except ValidationError as e:
+                    logger.warning(f"Dropping invalid launch plan week: {str(e)}")
+                    continue
+                # Keep only the weeks this shard was responsible for
+                if first <= week.week_number <= last and week.week_number not in weeks:
+                    week.from_outline = False
+                    weeks[week.week_number] = week
+        return weeks
+    
+    async def _process_sharded(
+        self,
+        input_data: Dict[str, Any],
+        on_field: Optional[FieldCallback],
+        deadline: Optional[Deadline]
+    ) -> Dict[str, Any]:
+        """
+        Generate the plan's week ranges concurrently and merge them.
+        
+        Weeks that a shard left out, got wrong or could not produce because
+        its call failed are filled in from the outline, so the plan always
+        covers every week; those weeks are marked from_outline. The plan is only published through on_field once
+        complete: the launch_schedule field is published a single time.
+        """
+        outline = self.outline_weeks(input_data)
+        outline_text = self.build_outline(input_data)
+        ranges = self.week_ranges()
+        streamed: Dict[int, Any] = {}
+        
+        def shard_callback(index: int) -> FieldCallback:
+            # Publish as soon as every shard's schedule has been parsed, before the streams end
+            def on_shard_field(field: str, value: Any) -> None:
+                streamed[index] = value
+                if len(streamed) == len(ranges):
+                    weeks = self.merge_shards(ranges, [streamed[number] for number in range(len(ranges))])
+                    on_field(field, self._complete_plan(input_data, outline, weeks).model_dump()[field])
+            return on_shard_field
+        
+        results = await asyncio.gather(*(
+            self.complete(
+                system_prompt=self.system_prompt,
+                prompt=(
+                    f"{self.build_prompt(input_data, (first, last))}\n"
+                    f"Follow this outline of the full plan for continuity:\n{outline_text}"
+                ),
+                on_field=shard_callback(index) if on_field is not None else None,
+                deadline=deadline
+            )
+            for index, (first, last) in enumerate(ranges)
+        ), return_exceptions=True)
+        
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if len(errors) == len(results):
+            raise Exception(f"Failed to create launch plan: {str(errors[0])}") from errors[0]
+        for (first, last), result in zip(ranges, results):
+            if isinstance(result, BaseException):
+                logger.warning(f"Launch plan weeks {first}-{last} failed, using the outline: {str(result)}")
+        
+        weeks = self.merge_shards(ranges, [
+            None if isinstance(result, BaseException) else parse_json_object(result).get("launch_schedule")
+            for result in results
+        ])
+        missing = [number for number in range(1, LAUNCH_PLAN_WEEKS + 1) if number not in weeks]
+        if missing:
+            logger.warning(f"Launch plan weeks {', '.join(map(str, missing))} filled in from the outline")
+            LAUNCH_PLAN_OUTLINE_WEEKS.inc(len(missing))
+        plan = self._complete_plan(input_data, outline, weeks).model_dump()
+        if on_field is not None and len(streamed) < len(ranges):
+            on_field("launch_schedule", plan["launch_schedule"])
+        return plan
+    
+    def _complete_plan(
+        self,
+        input_data: Dict[str, Any],
+        outline: List[Dict[str, Any]],
+        weeks: Dict[int, WeeklyPlan]
+    ) -> LaunchPlan:
+        """Build the full plan from the shards' weeks, filling the others from the outline."""
+        return LaunchPlan(launch_schedule=[
+            weeks.get(week["week_number"]) or self.outline_week_plan(input_data, week)
+            for week in outline
+        ])
@@ -1,52 +1,531 @@
-from typing import Dict, List, Any
-from .base import BaseAgent
+import os
+import json
+import asyncio
+import time
+import hashlib
+import logging
+from typing import Dict, List, Any, AsyncIterator, Callable, Optional, Tuple
+from .base import BaseAgent, FieldCallback, skippable_cause
+from .combined import CombinedAgent
+from ..core.deadline import Deadline, DeadlineExceeded
+from ..core.metrics import AGENT_RUNS, AGENT_SECONDS, WORKFLOW_SECONDS
+from ..core.tracing import span
+from ..models.workflow_models import ExecutionMode
+from ..services.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Time allowed for a whole workflow, and for each agent within it
+WORKFLOW_DEADLINE_SECONDS = float(os.getenv("WORKFLOW_DEADLINE_SECONDS", "120"))
+AGENT_TIMEOUT_SECONDS = float(os.getenv("AGENT_TIMEOUT_SECONDS", "60"))
+# Default execution mode when a request does not choose one
+AGENT_EXECUTION_MODE = ExecutionMode(os.getenv("AGENT_EXECUTION_MODE", ExecutionMode.MULTI.value))
+
+# Report section populated by each agent's result
+REPORT_SECTIONS = {
+    "BrandIdentityAgent": "brand_identity",
+    "UniqueStrengthsAgent": "unique_strengths",
+    "TargetAudienceAgent": "target_audience",
+    "ContentStrategyAgent": "content_strategy",
+    "LaunchPlanningAgent": "launch_plan"
+}
+
+# Callback receiving (agent name, field name, value) for each published field
+FieldEventCallback = Callable[[str, str, Any], None]
 
 class AgentOrchestrator:
     """Orchestrates the workflow between different agents in the PersonalBrand.AI system."""
-    
+
     def __init__(self):
+        # Only the agent registry lives on the instance; per-run results are
+        # kept locally so concurrent requests can share one orchestrator
         self.agents: List[BaseAgent] = []
-        self.workflow_results: Dict[str, Any] = {}
-    
+        # Agent groups answered by one completion in combined mode
+        self.combined_groups: List[List[str]] = []
+        self._combined_agents: Optional[List[BaseAgent]] = None
+        # Identical workflows running at the same time share one execution
+        self.inflight = SingleFlight()
+
     def register_agent(self, agent: BaseAgent) -> None:
         """Register a new agent in the orchestrator."""
         self.agents.append(agent)
-    
-    async def execute_workflow(self, user_input: Dict[str, Any]) -> Dict[str, Any]:
+        self._combined_agents = None
+
+    def combine_agents(self, names: List[str]) -> None:
+        """
+        Answer a group of registered agents with one completion in combined mode.
+
+        Raises:
+            ValueError: If an agent is unknown or already grouped, or if
+                merging the group would create a circular dependency
+        """
+        registered = {agent.name for agent in self.agents}
+        grouped = {name for group in self.combined_groups for name in group}
+        for name in names:
+            if name not in registered:
+                raise ValueError(f"Cannot combine unknown agent: {name}")
+            if name in grouped:
+                raise ValueError(f"Agent {name} is already in a combined group")
+
+        self.combined_groups.append(list(names))
+        self._combined_agents = None
+        try:
+            self.get_execution_plan(ExecutionMode.COMBINED)
+        except ValueError:
+            self.combined_groups.pop()
+            self._combined_agents = None
+            raise
+
+    def agents_for_mode(self, mode: Optional[ExecutionMode] = None) -> List[BaseAgent]:
+        """
+        Return the agents to execute in the given mode.
+
+        In combined mode each configured group is replaced by one
+        CombinedAgent, placed where its first member was registered.
+        """
+        if (mode or AGENT_EXECUTION_MODE) != ExecutionMode.COMBINED or not self.combined_groups:
+            return self.agents
+
+        if self._combined_agents is None:
+            by_name = {agent.name: agent for agent in self.agents}
+            group_of = {name: group for group in self.combined_groups for name in group}
+            agents: List[BaseAgent] = []
+            for agent in self.agents:
+                group = group_of.get(agent.name)
+                if group is None:
+                    agents.append(agent)
+                elif agent.name == group[0]:
+                    agents.append(CombinedAgent([by_name[name] for name in group]))
+            self._combined_agents = agents
+        return self._combined_agents
+
+    def get_dependencies(self, mode: Optional[ExecutionMode] = None) -> Dict[str, List[str]]:
+        """
+        Derive the agent dependency graph from the agents' declared fields.
+
+        An agent depends on every registered agent that produces one of its
+        required fields. Fields no agent produces are expected in the user input.
+
+        Args:
+            mode: Execution mode; defaults to AGENT_EXECUTION_MODE
+
+        Returns:
+            Mapping of agent name to the names of the agents it depends on,
+            in registration order
+        """
+        agents = self.agents_for_mode(mode)
+        producers: Dict[str, str] = {}
+        for agent in agents:
+            for field in agent.output_fields:
+                if field in producers:
+                    raise ValueError(
+                        f"Field '{field}' is produced by both {producers[field]} and {agent.name}"
+                    )
+                producers[field] = agent.name
+
+        dependencies: Dict[str, List[str]] = {}
+        for agent in agents:
+            upstream = {
+                producers[field]
+                for field in agent.required_fields
+                if field in producers and producers[field] != agent.name
+            }
+            dependencies[agent.name] = [a.name for a in agents if a.name in upstream]
+        return dependencies
+
+    def get_execution_plan(self, mode: Optional[ExecutionMode] = None) -> Dict[str, Any]:
+        """
+        Compute the execution plan for the registered agents.
+
+        Agents in the same stage have no dependencies on each other and run
+        concurrently; the critical path is the longest dependency chain.
+
+        Args:
+            mode: Execution mode; defaults to AGENT_EXECUTION_MODE
+
+        Returns:
+            Dictionary with the stages, per-agent dependencies and critical path
+        """
+        agents = self.agents_for_mode(mode)
+        dependencies = self.get_dependencies(mode)
+        stage_of: Dict[str, int] = {}
+        remaining = [agent.name for agent in agents]
+
+        while remaining:
+            ready = [
+                name for name in remaining
+                if all(dep in stage_of for dep in dependencies[name])
+            ]
+            if not ready:
+                raise ValueError(f"Circular dependency between agents: {', '.join(remaining)}")
+            for name in ready:
+                stage_of[name] = max((stage_of[dep] + 1 for dep in dependencies[name]), default=0)
+            remaining = [name for name in remaining if name not in stage_of]
+
+        stages: List[List[str]] = [[] for _ in range(max(stage_of.values(), default=-1) + 1)]
+        for agent in agents:
+            stages[stage_of[agent.name]].append(agent.name)
+
+        critical_path: List[str] = []
+        if stages:
+            current = stages[-1][0]
+            while True:
+                critical_path.insert(0, current)
+                upstream = dependencies[current]
+                if not upstream:
+                    break
+                current = max(upstream, key=lambda name: stage_of[name])
+
+        return {
+            "stages": stages,
+            "agents": [
+                {
+                    "name": agent.name,
+                    "stage": stage_of[agent.name],
+                    "depends_on": dependencies[agent.name],
+                    "inputs": list(agent.required_fields),
+                    "outputs": list(agent.output_fields)
+                }
+                for agent in agents
+            ],
+            "critical_path": critical_path
+        }
+
+    async def execute_workflow(
+        self,
+        user_input: Dict[str, Any],
+        on_field: Optional[FieldEventCallback] = None,
+        deadline: Optional[Deadline] = None,
+        previous_states: Optional[Dict[str, Dict[str, Any]]] = None,
+        mode: Optional[ExecutionMode] = None
+    ) -> Dict[str, Any]:
         """
         Execute the personal branding workflow using registered agents.
-        
+
+        Each agent is started as its own task as soon as the fields it reads
+        are available, so independent agents run concurrently. Without
+        on_field or previous_states, a call with the same input as a run
+        already in progress awaits that run instead of starting another.
+
         Args:
             user_input: Dictionary containing the initial user input data
-            
+            on_field: Optional callback receiving (agent name, field, value)
+                as each output field becomes available
+            deadline: Deadline for the whole workflow; defaults to
+                WORKFLOW_DEADLINE_SECONDS from now
+            previous_states: Optional agent states of a previous run whose
+                results are reused where the inputs are unchanged
+            mode: Execution mode; defaults to AGENT_EXECUTION_MODE
+
         Returns:
-            Dictionary containing the final branding strategy report
+            Dictionary containing the final branding strategy report, with
+            sections of skipped agents listed as missing
         """
-        current_context = user_input.copy()
-        
-        for agent in self.agents:
-            if not agent.validate_input(current_context):
-                raise ValueError(f"Invalid input for agent: {agent.name}")
-            
-            # Process data through the agent
-            result = await agent.process(current_context)
-            
-            # Store results and update context for next agent
-            self.workflow_results[agent.name] = result
-            current_context.update(result)
-            
-            # Update agent's context
-            agent.update_context(current_context)
-        
-        return self.generate_final_report()
-    
-    def generate_final_report(self) -> Dict[str, Any]:
-        """Generate the final Personal Brand Strategy Report."""
+        if on_field is not None or previous_states is not None:
+            # Field events and reused results belong to this caller, so the run cannot be shared
+            return await self._execute_workflow(user_input, on_field, deadline, previous_states, mode)
+
+        # Concurrent runs for the same input (double submits, client retries)
+        # await the one already in flight; the shared report must not be mutated
+        return await self.inflight.do(
+            f"{ExecutionMode(mode or AGENT_EXECUTION_MODE).value}:{self.input_key(user_input)}",
+            lambda: self._execute_workflow(user_input, None, deadline, None, mode)
+        )
+
+    @staticmethod
+    def input_key(user_input: Dict[str, Any]) -> str:
+        """Hash the user input, ignoring surrounding whitespace in values."""
+        def normalize(value: Any) -> Any:
+            if isinstance(value, str):
+                return value.strip()
+            if isinstance(value, list):
+                return [normalize(item) for item in value]
+            if isinstance(value, dict):
+                return {key: normalize(item) for key, item in value.items()}
+            return value
+
+        encoded = json.dumps(normalize(user_input), sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def fingerprint(agent: BaseAgent, context: Dict[str, Any]) -> str:
+        """Hash the values of the fields an agent reads from its context."""
+        values = {field: context.get(field) for field in agent.required_fields}
+        encoded = json.dumps(values, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def reusable_result(
+        self,
+        agent: BaseAgent,
+        context: Dict[str, Any],
+        previous_states: Optional[Dict[str, Dict[str, Any]]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Return an agent's result from a previous run if its inputs are unchanged.
+
+        States are recorded per registered agent, so a combined agent is
+        reused only if every member's stored fingerprint still matches; each
+        member reads the stored results of the members before it.
+
+        Args:
+            agent: The agent about to run
+            context: The agent's current context
+            previous_states: Agent states of a previous run, if any
+
+        Returns:
+            The stored result, or None if the agent has to run again
+        """
+        members = agent.members if isinstance(agent, CombinedAgent) else [agent]
+        context = context.copy()
+        result: Dict[str, Any] = {}
+        for member in members:
+            previous = (previous_states or {}).get(member.name)
+            if previous is None or previous.get("fingerprint") != self.fingerprint(member, context):
+                return None
+            context.update(previous["result"])
+            result.update(previous["result"])
+        return result
+
+    def agent_states(self, user_input: Dict[str, Any], report: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """
+        Record each agent's result with a fingerprint of the inputs it read.
+
+        Every field an agent reads is either user input or an upstream output
+        present in the report, so the states are derived after the fact.
+
+        Args:
+            user_input: The input the report was generated from
+            report: The final report, as returned by execute_workflow
+
+        Returns:
+            Mapping of agent name to {"fingerprint", "result"} for every
+            section present in the report
+        """
+        results = {
+            agent.name: report.get(REPORT_SECTIONS.get(agent.name, agent.name))
+            for agent in self.agents
+        }
+        context = user_input.copy()
+        for result in results.values():
+            context.update(result or {})
+
         return {
-            "title": "Personal Brand Strategy Report",
-            "brand_identity": self.workflow_results.get("BrandIdentityAgent", {}),
-            "unique_strengths": self.workflow_results.get("UniqueStrengthsAgent", {}),
-            "target_audience": self.workflow_results.get("TargetAudienceAgent", {}),
-            "content_strategy": self.workflow_results.get("ContentStrategyAgent", {}),
-            "launch_plan": self.workflow_results.get("LaunchPlanningAgent", {})
-        } 
\ No newline at end of file
+            agent.name: {"fingerprint": self.fingerprint(agent, context), "result": results[agent.name]}
+            for agent in self.agents
+            if results[agent.name] is not None
+        }
+
+    async def _execute_workflow(
+        self,
+        user_input: Dict[str, Any],
+        on_field: Optional[FieldEventCallback],
+        deadline: Optional[Deadline],
+        previous_states: Optional[Dict[str, Dict[str, Any]]],
+        mode: Optional[ExecutionMode]
+    ) -> Dict[str, Any]:
+        results: Dict[str, Dict[str, Any]] = {}
+        # Agent tasks are created within this span, so their spans nest under it
+        with span("workflow", mode=ExecutionMode(mode or AGENT_EXECUTION_MODE).value) as workflow_span:
+            async for agent_name, result in self.stream_workflow(
+                user_input,
+                on_field=on_field,
+                deadline=deadline,
+                previous_states=previous_states,
+                mode=mode
+            ):
+                results[agent_name] = result
+            workflow_span.set_attribute("completed_agents", len(results))
+
+        # Merge results in registration order regardless of completion order
+        workflow_results = {
+            agent.name: results[agent.name] for agent in self.agents if agent.name in results
+        }
+
+        return self.generate_final_report(workflow_results)
+
+    async def stream_workflow(
+        self,
+        user_input: Dict[str, Any],
+        on_field: Optional[FieldEventCallback] = None,
+        deadline: Optional[Deadline] = None,
+        previous_states: Optional[Dict[str, Dict[str, Any]]] = None,
+        mode: Optional[ExecutionMode] = None
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Execute the workflow, yielding each agent's result as soon as it finishes.
+
+        Agents wait on individual fields rather than whole upstream agents. When
+        agents stream their completions, a downstream agent can start as soon as
+        the upstream fields it reads have been parsed. Closing the iterator
+        early cancels the agents that are still running.
+
+        Each agent gets AGENT_TIMEOUT_SECONDS, capped by the workflow deadline.
+        An agent that runs out of time or whose LLM calls keep failing with
+        transient errors, and every agent depending on it, is skipped rather
+        than failing the workflow; its result is never yielded.
+
+        When previous_states is given (see agent_states), an agent whose input
+        fields still match its stored fingerprint reuses the stored result
+        instead of calling the LLM. A rerun agent usually changes its outputs,
+        so its dependents rerun as well.
+
+        Args:
+            user_input: Dictionary containing the initial user input data
+            on_field: Optional callback receiving (agent name, field, value)
+                as each output field becomes available
+            deadline: Deadline for the whole workflow; defaults to
+                WORKFLOW_DEADLINE_SECONDS from now
+            previous_states: Optional agent states of a previous run
+            mode: Execution mode; defaults to AGENT_EXECUTION_MODE. In combined
+                mode a group's results are yielded together, per member agent
+
+        Yields:
+            Tuples of (agent name, agent result) in completion order
+        """
+        if deadline is None:
+            deadline = Deadline(WORKFLOW_DEADLINE_SECONDS)
+        workflow_seconds = WORKFLOW_SECONDS.labels(ExecutionMode(mode or AGENT_EXECUTION_MODE).value)
+        agents = self.agents_for_mode(mode)
+        plan = self.get_execution_plan(mode)
+        produced = {field for agent in agents for field in agent.output_fields}
+
+        # Fail before any LLM call if an input can never become available
+        for agent in agents:
+            missing = [
+                field for field in agent.required_fields
+                if field not in user_input and field not in produced
+            ]
+            if missing:
+                raise ValueError(f"Invalid input for agent: {agent.name}")
+
+        loop = asyncio.get_running_loop()
+        field_values: Dict[str, asyncio.Future] = {
+            field: loop.create_future() for field in produced
+        }
+        tasks: Dict[str, asyncio.Task] = {}
+
+        def make_publisher(agent: BaseAgent) -> FieldCallback:
+            def publish(field: str, value: Any) -> None:
+                future = field_values.get(field)
+                if future is None or future.done():
+                    return
+                future.set_result(value)
+                if on_field is not None:
+                    on_field(agent.name, field, value)
+            return publish
+
+        async def run_agent(agent: BaseAgent, stage: int) -> Dict[str, Any]:
+            with span(f"agent {agent.name}", agent=agent.name, stage=stage) as agent_span:
+                upstream_fields = [field for field in agent.required_fields if field in field_values]
+                waiting = time.monotonic()
+                values = await asyncio.gather(*(field_values[field] for field in upstream_fields))
+                agent_span.set_attribute("upstream_wait_ms", round((time.monotonic() - waiting) * 1000, 3))
+
+                # Build the agent's context from the user input and the upstream fields it reads
+                current_context = user_input.copy()
+                current_context.update(zip(upstream_fields, values))
+
+                if not agent.validate_input(current_context):
+                    raise ValueError(f"Invalid input for agent: {agent.name}")
+
+                publish = make_publisher(agent)
+                result = self.reusable_result(agent, current_context, previous_states)
+                if result is not None:
+                    # Inputs unchanged since the previous run
+                    AGENT_RUNS.labels(agent.name, "reused").inc()
+                    agent_span.set_attribute("outcome", "reused")
+                else:
+                    # Process data through the agent within its time budget
+                    agent_deadline = deadline.child(AGENT_TIMEOUT_SECONDS)
+                    started = time.monotonic()
+                    try:
+                        result = await asyncio.wait_for(
+                            agent.process(current_context, on_field=publish, deadline=agent_deadline),
+                            timeout=agent_deadline.remaining()
+                        )
+                    except asyncio.TimeoutError:
+                        AGENT_RUNS.labels(agent.name, "timeout").inc()
+                        agent_span.set_attribute("outcome", "timeout")
+                        raise DeadlineExceeded(f"{agent.name} ran out of time")
+                    except Exception as e:
+                        cause = skippable_cause(e)
+                        if isinstance(cause, DeadlineExceeded):
+                            AGENT_RUNS.labels(agent.name, "timeout").inc()
+                            agent_span.set_attribute("outcome", "timeout")
+                            raise DeadlineExceeded(f"{agent.name} ran out of time") from e
+                        if cause is not None:
+                            # Transient LLM errors that outlasted their retries
+                            AGENT_RUNS.labels(agent.name, "unavailable").inc()
+                            agent_span.set_attribute("outcome", "unavailable")
+                            raise DeadlineExceeded(f"{agent.name} failed: {str(cause)}") from e
+                        AGENT_RUNS.labels(agent.name, "error").inc()
+                        raise
+                    finally:
+                        AGENT_SECONDS.labels(agent.name).observe(time.monotonic() - started)
+                    AGENT_RUNS.labels(agent.name, "success").inc()
+                    agent_span.set_attribute("outcome", "success")
+                
+                # Results come from parsed LLM output; check them once here so
+                # every consumer of the report gets validated sections
+                result = agent.validate_output(result)
+
+                # Publish the fields that were not already streamed
+                for field in agent.output_fields:
+                    if field in result:
+                        publish(field, result[field])
+                    elif not field_values[field].done():
+                        field_values[field].set_exception(
+                            ValueError(f"{agent.name} did not produce field '{field}'")
+                        )
+                return result
+
+        def skip_agent(agent: BaseAgent, reason: DeadlineExceeded) -> None:
+            # Downstream agents waiting on fields that will never arrive are skipped too
+            for field in agent.output_fields:
+                if not field_values[field].done():
+                    field_values[field].set_exception(DeadlineExceeded(str(reason)))
+
+        by_name = {agent.name: agent for agent in agents}
+        for number, stage in enumerate(plan["stages"], start=1):
+            for name in stage:
+                tasks[name] = asyncio.create_task(run_agent(by_name[name], number))
+
+        pending = set(tasks.values())
+        started = time.monotonic()
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for name in [n for n in tasks if tasks[n] in done]:
+                    try:
+                        result = tasks[name].result()
+                    except DeadlineExceeded as e:
+                        logger.warning(f"Skipping {name}: {str(e)}")
+                        skip_agent(by_name[name], e)
+                        continue
+                    for agent_name, agent_result in by_name[name].split_result(result):
+                        yield agent_name, agent_result
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            # Retrieve exceptions of fields nobody awaited
+            for future in field_values.values():
+                if future.done() and not future.cancelled():
+                    future.exception()
+            workflow_seconds.observe(time.monotonic() - started)
+
+    def generate_final_report(self, workflow_results: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Generate the final Personal Brand Strategy Report.
+
+        Sections of agents without a result are left empty and listed under
+        missing_sections.
+        """
+        report: Dict[str, Any] = {"title": "Personal Brand Strategy Report", "missing_sections": []}
+        for agent_name, section in REPORT_SECTIONS.items():
+            if agent_name in workflow_results:
+                report[section] = workflow_results[agent_name]
+            else:
+                report[section] = None
+                report["missing_sections"].append(section)
+        return report
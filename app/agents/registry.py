@@ -0,0 +1,46 @@
+import os
+from typing import Optional
+from openai import AsyncOpenAI
+from .brand_identity import BrandIdentityAgent
+from .unique_strengths import UniqueStrengthsAgent
+from .target_audience import TargetAudienceAgent
+from .content_strategy import ContentStrategyAgent
+from .launch_planning import LaunchPlanningAgent
+from .orchestrator import AgentOrchestrator
+
+# Agent groups answered by one completion in combined mode: groups are
+# separated by commas, agents within a group by "+"
+COMBINED_AGENT_GROUPS = os.getenv(
+    "COMBINED_AGENT_GROUPS",
+    "BrandIdentityAgent+UniqueStrengthsAgent+TargetAudienceAgent"
+)
+
+def create_orchestrator(client: Optional[AsyncOpenAI] = None) -> AgentOrchestrator:
+    """
+    Create an orchestrator with all agents registered.
+
+    Agents are stateless, so the returned orchestrator is built once at
+    application startup and shared by all requests.
+
+    Args:
+        client: OpenAI client for the agents; defaults to the shared pooled client
+
+    Returns:
+        AgentOrchestrator with the five PersonalBrand.AI agents registered
+    """
+    orchestrator = AgentOrchestrator()
+
+    # Registration order fixes the order of sections in the report; the
+    # execution order is derived from each agent's declared inputs and outputs
+    orchestrator.register_agent(BrandIdentityAgent(client))
+    orchestrator.register_agent(UniqueStrengthsAgent(client))
+    orchestrator.register_agent(TargetAudienceAgent(client))
+    orchestrator.register_agent(ContentStrategyAgent(client))
+    orchestrator.register_agent(LaunchPlanningAgent(client))
+
+    for group in COMBINED_AGENT_GROUPS.split(","):
+        names = [name.strip() for name in group.split("+") if name.strip()]
+        if len(names) > 1:
+            orchestrator.combine_agents(names)
+
+    return orchestrator
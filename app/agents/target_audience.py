@@ -1,33 +1,49 @@
-from typing import Dict, List, Any
-from .base import BaseAgent
+from typing import Dict, List, Any, Optional
+from .base import BaseAgent, FieldCallback
+from ..core.deadline import Deadline
+from ..models.output_models import TargetAudience
 from openai import AsyncOpenAI
-import os
 
 class TargetAudienceAgent(BaseAgent):
     """Agent responsible for defining and analyzing target audience."""
     
-    def __init__(self):
+    required_fields = [
+        "branding_goal",
+        "industry_focus",
+        "brand_title",        # From BrandIdentityAgent
+        "unique_strengths",   # From UniqueStrengthsAgent
+    ]
+    output_fields = [
+        "target_audience_profile",
+        "audience_interests"
+    ]
+    system_prompt = "You are an expert audience research analyst who excels at identifying and understanding professional audience segments."
+    output_model = TargetAudience
+    # Example values used for fields missing from the response
+    fallback_output = {
+        "target_audience_profile": (
+            "Junior AI developers, tech recruiters, and early-stage AI startups "
+            "looking to build practical AI solutions and grow their technical teams"
+        ),
+        "audience_interests": [
+            "Learning AI fundamentals and best practices",
+            "Career growth in AI/ML field",
+            "Building practical AI projects",
+            "Technical team development",
+            "Industry networking opportunities"
+        ]
+    }
+    
+    def __init__(self, client: Optional[AsyncOpenAI] = None):
         super().__init__(
             name="TargetAudienceAgent",
-            description="Identifies and analyzes ideal target audience for personal brand"
+            description="Identifies and analyzes ideal target audience for personal brand",
+            client=client
         )
-        self.client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        self.model_name = os.getenv("OPENAI_MODEL_NAME", "gpt-4")
     
-    def validate_input(self, input_data: Dict[str, Any]) -> bool:
-        """Validate required input fields."""
-        required_fields = [
-            "branding_goal",
-            "industry_focus",
-            "brand_title",        # From BrandIdentityAgent
-            "unique_strengths",   # From UniqueStrengthsAgent
-        ]
-        return all(field in input_data for field in required_fields)
-    
-    async def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Process user input to define target audience profile and interests."""
-        
-        prompt = f"""
+    def build_prompt(self, input_data: Dict[str, Any]) -> str:
+        """Build the task prompt from the agent's input fields."""
+        return f"""
         Based on the following personal brand information:
         
         Branding Goal: {input_data['branding_goal']}
@@ -45,34 +61,27 @@ class TargetAudienceAgent(BaseAgent):
         
         Focus on specific, actionable insights that will help create targeted content and messaging.
         """
+    
+    async def process(
+        self,
+        input_data: Dict[str, Any],
+        on_field: Optional[FieldCallback] = None,
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
+        """Process user input to define target audience profile and interests."""
+        
+        prompt = self.build_prompt(input_data)
         
         try:
-            response = await self.client.chat.completions.create(
-                model=self.model_name,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert audience research analyst who excels at identifying and understanding professional audience segments."
-                    },
-                    {"role": "user", "content": prompt}
-                ]
+            result = await self.complete(
+                system_prompt=self.system_prompt,
+                prompt=prompt,
+                on_field=on_field,
+                deadline=deadline
             )
             
-            # In production, add proper JSON parsing
-            # This is a simplified example response structure
-            return {
-                "target_audience_profile": (
-                    "Junior AI developers, tech recruiters, and early-stage AI startups "
-                    "looking to build practical AI solutions and grow their technical teams"
-                ),
-                "audience_interests": [
-                    "Learning AI fundamentals and best practices",
-                    "Career growth in AI/ML field",
-                    "Building practical AI projects",
-                    "Technical team development",
-                    "Industry networking opportunities"
-                ]
-            }
+            # Fields missing from the response fall back to this example structure
+            return self.parse_output(result, fallback=self.fallback_output)
             
         except Exception as e:
-            raise Exception(f"Failed to process target audience analysis: {str(e)}") 
\ No newline at end of file
+            raise Exception(f"Failed to process target audience analysis: {str(e)}") from e
\ No newline at end of file
@@ -1,33 +1,49 @@
-from typing import Dict, List, Any
-from .base import BaseAgent
+from typing import Dict, List, Any, Optional
+from .base import BaseAgent, FieldCallback
+from ..core.deadline import Deadline
+from ..models.output_models import UniqueStrengths
 from openai import AsyncOpenAI
-import os
 
 class UniqueStrengthsAgent(BaseAgent):
     """Agent responsible for identifying user's unique strengths and compelling story."""
     
-    def __init__(self):
+    required_fields = [
+        "basic_identity",
+        "experience_level",
+        "personal_story_highlights",
+        "brand_title"  # From BrandIdentityAgent
+    ]
+    output_fields = [
+        "unique_strengths",
+        "personal_story"
+    ]
+    system_prompt = "You are an expert career coach and personal branding strategist who excels at identifying unique professional strengths and crafting compelling personal narratives."
+    output_model = UniqueStrengths
+    # Example values used for fields missing from the response
+    fallback_output = {
+        "unique_strengths": [
+            "Rapid Prototyping",
+            "Open Source Contributor",
+            "Cross-functional Team Leadership",
+            "Data-Driven Decision Making"
+        ],
+        "personal_story": (
+            "Transitioned from mechanical engineering to AI through self-learning "
+            "Python and competing in Kaggle competitions. Now combines engineering "
+            "precision with AI innovation to build practical solutions."
+        )
+    }
+    
+    def __init__(self, client: Optional[AsyncOpenAI] = None):
         super().__init__(
             name="UniqueStrengthsAgent",
-            description="Identifies and articulates user's unique professional strengths and story"
+            description="Identifies and articulates user's unique professional strengths and story",
+            client=client
         )
-        self.client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        self.model_name = os.getenv("OPENAI_MODEL_NAME", "gpt-4")
     
-    def validate_input(self, input_data: Dict[str, Any]) -> bool:
-        """Validate required input fields."""
-        required_fields = [
-            "basic_identity",
-            "experience_level",
-            "personal_story_highlights",
-            "brand_title"  # From BrandIdentityAgent
-        ]
-        return all(field in input_data for field in required_fields)
-    
-    async def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Process user input to identify unique strengths and craft personal story."""
-        
-        prompt = f"""
+    def build_prompt(self, input_data: Dict[str, Any]) -> str:
+        """Build the task prompt from the agent's input fields."""
+        return f"""
         Based on the following information about a professional:
         
         Current Role/Identity: {input_data['basic_identity']}
@@ -45,34 +61,27 @@ class UniqueStrengthsAgent(BaseAgent):
         
         Make sure the strengths are specific and actionable, and the story is authentic and memorable.
         """
+    
+    async def process(
+        self,
+        input_data: Dict[str, Any],
+        on_field: Optional[FieldCallback] = None,
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
+        """Process user input to identify unique strengths and craft personal story."""
+        
+        prompt = self.build_prompt(input_data)
         
         try:
-            response = await self.client.chat.completions.create(
-                model=self.model_name,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert career coach and personal branding strategist who excels at identifying unique professional strengths and crafting compelling personal narratives."
-                    },
-                    {"role": "user", "content": prompt}
-                ]
+            result = await self.complete(
+                system_prompt=self.system_prompt,
+                prompt=prompt,
+                on_field=on_field,
+                deadline=deadline
             )
             
-            # In production, add proper JSON parsing
-            # This is a simplified example response structure
-            return {
-                "unique_strengths": [
-                    "Rapid Prototyping",
-                    "Open Source Contributor",
-                    "Cross-functional Team Leadership",
-                    "Data-Driven Decision Making"
-                ],
-                "personal_story": (
-                    "Transitioned from mechanical engineering to AI through self-learning "
-                    "Python and competing in Kaggle competitions. Now combines engineering "
-                    "precision with AI innovation to build practical solutions."
-                )
-            }
+            # Fields missing from the response fall back to this example structure
+            return self.parse_output(result, fallback=self.fallback_output)
             
         except Exception as e:
-            raise Exception(f"Failed to process unique strengths analysis: {str(e)}") 
\ No newline at end of file
+            raise Exception(f"Failed to process unique strengths analysis: {str(e)}") from e
\ No newline at end of file
@@ -1,54 +1,84 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends, status
-from typing import Optional
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends, Request, status
+from fastapi.responses import StreamingResponse, JSONResponse
+from typing import Optional, Dict, Any, AsyncIterator
+import os
+import json
+import uuid
+import asyncio
 import logging
 from datetime import datetime, timedelta
 from ..models.input_models import PersonalBrandInput
 from ..models.output_models import PersonalBrandStrategy
-from ..models.user_models import UserCreate, UserLogin, Token, UserInDB
+from ..models.user_models import UserCreate, UserLogin, Token, User, UserInDB
 from ..models.response_models import APIResponse
-from ..agents import (
-    BrandIdentityAgent,
-    UniqueStrengthsAgent,
-    TargetAudienceAgent,
-    ContentStrategyAgent,
-    LaunchPlanningAgent,
-    AgentOrchestrator
+from ..models.workflow_models import ExecutionPlan, ExecutionMode
+from ..models.job_models import Job
+from ..agents import AgentOrchestrator, REPORT_SECTIONS, WORKFLOW_DEADLINE_SECONDS
+from ..core.deadline import Deadline
+from ..core.json_codec import EncodedJSONResponse, success_envelope
+from ..services.storage import (
+    encode_strategy, save_strategy_payload, get_strategy_report, get_strategy_payload,
+    get_strategy_agent_states
 )
-from ..services.storage import save_strategy_report, get_strategy_report
+from ..services.llm_cache import get_llm_cache
+from ..services.rate_limiter import get_rate_limiter
+from ..services.single_flight import get_llm_single_flight
+from ..services.jobs import JobManager, JobQueueFullError
+from ..services.batch import generate_strategies, split_ndjson
 from ..services.auth import (
     get_current_user,
     create_access_token,
-    verify_password,
-    get_password_hash,
+    get_password_hasher,
     ACCESS_TOKEN_EXPIRE_MINUTES
 )
+from ..services.user_repository import get_user_repository, normalize_email, UserAlreadyExistsError
 
 logger = logging.getLogger(__name__)
 
+# Interval between SSE comments sent while no agent has finished, keeping
+# proxies and load balancers from closing idle streams
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+
 router = APIRouter()
 
+def get_orchestrator(request: Request) -> AgentOrchestrator:
+    """Return the orchestrator built once at application startup."""
+    return request.app.state.orchestrator
+
+def get_request_deadline() -> Deadline:
+    """Start the request's workflow deadline."""
+    return Deadline(WORKFLOW_DEADLINE_SECONDS)
+
+def get_job_manager(request: Request) -> JobManager:
+    """Return the job manager started at application startup."""
+    return request.app.state.job_manager
+
 @router.post("/token", response_model=APIResponse[Token])
 async def login_for_access_token(form_data: UserLogin):
     """
     OAuth2 compatible token login, get an access token for future requests.
     """
     try:
-        # TODO: Get user from database
-        # For now, use a mock user
-        user = UserInDB(
-            id="test-user-id",
-            email=form_data.email,
-            full_name="Test User",
-            hashed_password=get_password_hash("test-password"),
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow()
-        )
+        password_hasher = get_password_hasher()
+        users = get_user_repository()
+        user = await users.get_by_email(form_data.email)
+        if user is None:
+            await password_hasher.dummy_verify()
+            return APIResponse(
+                success=False,
+                error="Incorrect email or password"
+            )
         
-        if not verify_password(form_data.password, user.hashed_password):
+        # bcrypt runs in the hashing pool, off the event loop
+        valid, new_hash = await password_hasher.verify_and_update(form_data.password, user.hashed_password)
+        if not valid:
             return APIResponse(
                 success=False,
                 error="Incorrect email or password"
             )
+        if new_hash is not None:
+            # The stored hash used another cost factor; keep the rehashed one
+            await users.update_password_hash(user.id, new_hash)
         
         access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = create_access_token(
@@ -66,11 +96,46 @@ async def login_for_access_token(form_data: UserLogin):
             error=f"Login failed: {str(e)}"
         )
 
+@router.post("/register", response_model=APIResponse[User])
+async def register_user(user_data: UserCreate):
+    """
+    Create a user account that can then log in at /token.
+    """
+    try:
+        now = datetime.utcnow()
+        user = UserInDB(
+            id=str(uuid.uuid4()),
+            email=normalize_email(user_data.email),
+            full_name=user_data.full_name,
+            hashed_password=await get_password_hasher().hash(user_data.password),
+            created_at=now,
+            updated_at=now
+        )
+        await get_user_repository().create(user)
+        return APIResponse(
+            success=True,
+            data=User(**user.model_dump())
+        )
+    except UserAlreadyExistsError:
+        return APIResponse(
+            success=False,
+            error="Email already registered"
+        )
+    except Exception as e:
+        logger.error(f"Registration failed: {str(e)}", exc_info=True)
+        return APIResponse(
+            success=False,
+            error=f"Registration failed: {str(e)}"
+        )
+
 @router.post("/generate-strategy", response_model=APIResponse[PersonalBrandStrategy])
 async def generate_personal_brand_strategy(
     input_data: PersonalBrandInput,
     background_tasks: BackgroundTasks,
-    current_user: UserInDB = Depends(get_current_user)
+    current_user: UserInDB = Depends(get_current_user),
+    orchestrator: AgentOrchestrator = Depends(get_orchestrator),
+    deadline: Deadline = Depends(get_request_deadline),
+    mode: Optional[ExecutionMode] = None
 ):
     """
     Generate a comprehensive personal brand strategy based on user input.
@@ -81,52 +146,39 @@ async def generate_personal_brand_strategy(
     3. Target Audience Definition
     4. Content Strategy Planning
     5. Launch Schedule Creation
+    
+    Sections not finished within the request deadline, or whose LLM calls
+    kept failing, are returned empty and listed in missing_sections. The
+    optional mode query parameter selects multi-call or combined single-call
+    execution (default: AGENT_EXECUTION_MODE).
     """
     try:
         logger.info("Starting personal brand strategy generation")
         
-        # Initialize agents
-        brand_identity_agent = BrandIdentityAgent()
-        unique_strengths_agent = UniqueStrengthsAgent()
-        target_audience_agent = TargetAudienceAgent()
-        content_strategy_agent = ContentStrategyAgent()
-        launch_planning_agent = LaunchPlanningAgent()
-        
-        logger.info("All agents initialized successfully")
-        
-        # Create orchestrator
-        orchestrator = AgentOrchestrator()
-        
-        # Register agents in the correct order
-        orchestrator.register_agent(brand_identity_agent)
-        orchestrator.register_agent(unique_strengths_agent)
-        orchestrator.register_agent(target_audience_agent)
-        orchestrator.register_agent(content_strategy_agent)
-        orchestrator.register_agent(launch_planning_agent)
-        
         logger.info("Starting agent workflow execution")
         
         # Execute the workflow
-        strategy = await orchestrator.execute_workflow(input_data.dict())
+        strategy = await orchestrator.execute_workflow(input_data.dict(), deadline=deadline, mode=mode)
         
         logger.info("Agent workflow completed successfully")
         
-        # Convert the dictionary to our Pydantic model
-        strategy_response = PersonalBrandStrategy(**strategy)
+        # Encode the report once; the response and the stored blob share the bytes
+        strategy_id = str(uuid.uuid4())
+        payload = encode_strategy(strategy, strategy_id)
         
-        # Schedule background task to save the report
+        # Schedule background task to save the report, with the per-agent
+        # results needed to regenerate it incrementally
         background_tasks.add_task(
-            save_strategy_report,
-            strategy=strategy_response,
-            user=current_user
+            save_strategy_payload,
+            payload=payload,
+            user=current_user,
+            strategy_id=strategy_id,
+            agent_states=orchestrator.agent_states(input_data.dict(), strategy)
         )
         
         logger.info("Strategy report scheduled for storage")
         
-        return APIResponse(
-            success=True,
-            data=strategy_response
-        )
+        return EncodedJSONResponse(success_envelope(payload))
         
     except Exception as e:
         logger.error(f"Failed to generate personal brand strategy: {str(e)}", exc_info=True)
@@ -135,6 +187,213 @@ async def generate_personal_brand_strategy(
             error=f"Failed to generate personal brand strategy: {str(e)}"
         )
 
+def format_sse(event: str, data: str) -> str:
+    """Format a single Server-Sent Event."""
+    return f"event: {event}\ndata: {data}\n\n"
+
+@router.post("/generate-strategy/stream")
+async def stream_personal_brand_strategy(
+    input_data: PersonalBrandInput,
+    background_tasks: BackgroundTasks,
+    current_user: UserInDB = Depends(get_current_user),
+    orchestrator: AgentOrchestrator = Depends(get_orchestrator),
+    deadline: Deadline = Depends(get_request_deadline),
+    mode: Optional[ExecutionMode] = None
+):
+    """
+    Generate a personal brand strategy, streaming it as Server-Sent Events.
+    
+    Each report section (brand_identity, unique_strengths, target_audience,
+    content_strategy, launch_plan) is sent as its own event as soon as the
+    agent producing it finishes. Individual fields are sent earlier as "field"
+    events when agents stream their completions. A final "strategy" event
+    carries the complete strategy; failures are reported with an
+    "error" event.
+    
+    The optional mode query parameter selects multi-call or combined
+    single-call execution; in combined mode a group's sections arrive together.
+    """
+    async def event_stream() -> AsyncIterator[str]:
+        # Open the stream immediately so clients get their first byte before any LLM call
+        yield ": stream opened\n\n"
+        
+        events: asyncio.Queue = asyncio.Queue()
+        
+        def publish_field(agent_name: str, field: str, value: Any) -> None:
+            events.put_nowait(format_sse("field", json.dumps({
+                "section": REPORT_SECTIONS.get(agent_name, agent_name),
+                "field": field,
+                "value": value
+            })))
+        
+        async def run_workflow() -> None:
+            results: Dict[str, Any] = {}
+            async for agent_name, result in orchestrator.stream_workflow(
+                input_data.dict(),
+                on_field=publish_field,
+                deadline=deadline,
+                mode=mode
+            ):
+                results[agent_name] = result
+                events.put_nowait(format_sse(REPORT_SECTIONS.get(agent_name, agent_name), json.dumps(result)))
+            
+            report = orchestrator.generate_final_report(results)
+            strategy_id = str(uuid.uuid4())
+            payload = encode_strategy(report, strategy_id)
+            
+            # Saved once the stream has been fully sent
+            background_tasks.add_task(
+                save_strategy_payload,
+                payload=payload,
+                user=current_user,
+                strategy_id=strategy_id,
+                agent_states=orchestrator.agent_states(input_data.dict(), report)
+            )
+            events.put_nowait(format_sse("strategy", payload.decode("utf-8")))
+        
+        workflow = asyncio.create_task(run_workflow())
+        workflow.add_done_callback(lambda _: events.put_nowait(None))
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(events.get(), timeout=SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event is None:
+                    break
+                yield event
+            
+            workflow.result()
+            logger.info("Streamed strategy generation completed successfully")
+            
+        except Exception as e:
+            logger.error(f"Failed to stream personal brand strategy: {str(e)}", exc_info=True)
+            yield format_sse("error", json.dumps({
+                "error": f"Failed to generate personal brand strategy: {str(e)}"
+            }))
+        finally:
+            # Stop the remaining agents if the client disconnected mid-stream
+            if not workflow.done():
+                workflow.cancel()
+                await asyncio.gather(workflow, return_exceptions=True)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/generate-strategy/batch")
+async def generate_personal_brand_strategy_batch(
+    request: Request,
+    current_user: UserInDB = Depends(get_current_user),
+    orchestrator: AgentOrchestrator = Depends(get_orchestrator)
+):
+    """
+    Generate strategies for many inputs in one request.
+    
+    The body is either a JSON array of PersonalBrandInput objects or, with
+    Content-Type application/x-ndjson, one input per line. Results are
+    streamed back as NDJSON BatchItemResult lines as each pipeline finishes;
+    an invalid or failing input only fails its own line.
+    """
+    # The body is read before the response starts: once streaming, the
+    # response owns the receive channel to watch for client disconnects
+    body = await request.body()
+    if request.headers.get("content-type", "").startswith("application/x-ndjson"):
+        # Lines are parsed lazily, each one as its pipeline is started
+        items = split_ndjson(body)
+    else:
+        try:
+            items = json.loads(body)
+        except ValueError as e:
+            return JSONResponse(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                content=APIResponse(success=False, error=f"Invalid batch body: {str(e)}").model_dump()
+            )
+        if not isinstance(items, list):
+            return JSONResponse(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                content=APIResponse(success=False, error="Batch body must be a JSON array").model_dump()
+            )
+    
+    async def result_stream() -> AsyncIterator[str]:
+        count = 0
+        try:
+            async for result in generate_strategies(items, orchestrator, user=current_user):
+                count += 1
+                yield result.model_dump_json() + "\n"
+            logger.info(f"Batch generation completed for {count} inputs")
+        except Exception as e:
+            logger.error(f"Batch generation failed: {str(e)}", exc_info=True)
+            yield json.dumps({"success": False, "error": f"Batch generation failed: {str(e)}"}) + "\n"
+    
+    return StreamingResponse(result_stream(), media_type="application/x-ndjson")
+
+@router.post("/jobs", response_model=APIResponse[Job], status_code=status.HTTP_202_ACCEPTED)
+async def submit_strategy_job(
+    input_data: PersonalBrandInput,
+    current_user: UserInDB = Depends(get_current_user),
+    job_manager: JobManager = Depends(get_job_manager)
+):
+    """
+    Queue a personal brand strategy generation job and return its ID immediately.
+    
+    Poll GET /jobs/{job_id} for progress and the final strategy. When the
+    queue is full the request is rejected with 429 and a Retry-After header.
+    """
+    try:
+        job = await job_manager.submit(input_data, current_user)
+        logger.info(f"Queued strategy generation job {job.job_id}")
+        return APIResponse(
+            success=True,
+            data=job
+        )
+    except JobQueueFullError as e:
+        logger.warning("Rejected strategy generation job: queue is full")
+        return JSONResponse(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            headers={"Retry-After": str(e.retry_after)},
+            content=APIResponse(
+                success=False,
+                error="Too many queued jobs, please retry later"
+            ).model_dump()
+        )
+    except Exception as e:
+        logger.error(f"Failed to queue strategy generation job: {str(e)}", exc_info=True)
+        return APIResponse(
+            success=False,
+            error=f"Failed to queue strategy generation job: {str(e)}"
+        )
+
+@router.get("/jobs/{job_id}", response_model=APIResponse[Job])
+async def get_strategy_job(
+    job_id: str,
+    current_user: UserInDB = Depends(get_current_user),
+    job_manager: JobManager = Depends(get_job_manager)
+):
+    """
+    Retrieve a job's status, the sections completed so far and the final strategy.
+    """
+    try:
+        job = await job_manager.get(job_id)
+        if job is None or job.user_id != current_user.id:
+            return APIResponse(
+                success=False,
+                error=f"No job found with ID: {job_id}"
+            )
+        return APIResponse(
+            success=True,
+            data=job
+        )
+    except Exception as e:
+        logger.error(f"Failed to retrieve job: {str(e)}", exc_info=True)
+        return APIResponse(
+            success=False,
+            error=f"Failed to retrieve job: {str(e)}"
+        )
+
 @router.get("/strategy/{strategy_id}", response_model=APIResponse[PersonalBrandStrategy])
 async def get_strategy(
     strategy_id: str,
@@ -145,14 +404,110 @@ async def get_strategy(
     """
     try:
         logger.info(f"Attempting to retrieve strategy with ID: {strategy_id}")
-        strategy = await get_strategy_report(strategy_id, current_user)
+        # The stored document is sent as is, without decoding and re-encoding it
+        payload = await get_strategy_payload(strategy_id, current_user)
+        return EncodedJSONResponse(success_envelope(payload))
+    except Exception as e:
+        logger.error(f"Failed to retrieve strategy: {str(e)}", exc_info=True)
+        return APIResponse(
+            success=False,
+            error=f"Failed to retrieve strategy: {str(e)}"
+        ) 
+
+@router.post("/strategy/{strategy_id}/regenerate", response_model=APIResponse[PersonalBrandStrategy])
+async def regenerate_strategy(
+    strategy_id: str,
+    input_data: PersonalBrandInput,
+    current_user: UserInDB = Depends(get_current_user),
+    orchestrator: AgentOrchestrator = Depends(get_orchestrator),
+    deadline: Deadline = Depends(get_request_deadline),
+    mode: Optional[ExecutionMode] = None
+):
+    """
+    Regenerate a previously generated strategy from an edited input.
+    
+    Only the agents whose input fields changed, and the agents depending on
+    their outputs, are run again; the other sections are reused from storage.
+    The result is saved as a new version of the same strategy. The optional
+    mode query parameter selects the execution mode, as for /generate-strategy.
+    """
+    try:
+        previous_states = await get_strategy_agent_states(strategy_id, current_user)
+        if previous_states is None:
+            # Strategies saved without agent states are regenerated in full
+            await get_strategy_report(strategy_id, current_user)
+            previous_states = {}
+        
+        strategy = await orchestrator.execute_workflow(
+            input_data.dict(),
+            deadline=deadline,
+            previous_states=previous_states,
+            mode=mode
+        )
+        agent_states = orchestrator.agent_states(input_data.dict(), strategy)
+        rerun = [
+            name for name, state in agent_states.items()
+            if previous_states.get(name, {}).get("fingerprint") != state["fingerprint"]
+        ]
+        logger.info(f"Regenerated strategy {strategy_id}, rerunning: {', '.join(rerun) or 'none'}")
+        
+        payload = encode_strategy(strategy, strategy_id)
+        await save_strategy_payload(
+            payload=payload,
+            user=current_user,
+            strategy_id=strategy_id,
+            agent_states=agent_states
+        )
+        
+        return EncodedJSONResponse(success_envelope(payload))
+    except Exception as e:
+        logger.error(f"Failed to regenerate strategy: {str(e)}", exc_info=True)
+        return APIResponse(
+            success=False,
+            error=f"Failed to regenerate strategy: {str(e)}"
+        )
+
+@router.get("/execution-plan", response_model=APIResponse[ExecutionPlan])
+async def get_execution_plan(
+    current_user: UserInDB = Depends(get_current_user),
+    orchestrator: AgentOrchestrator = Depends(get_orchestrator),
+    mode: Optional[ExecutionMode] = None
+):
+    """
+    Return the agent execution plan, showing which stages run concurrently
+    in the given execution mode.
+    """
+    try:
+        plan = orchestrator.get_execution_plan(mode)
         return APIResponse(
             success=True,
-            data=strategy
+            data=ExecutionPlan(**plan)
         )
     except Exception as e:
-        logger.error(f"Failed to retrieve strategy: {str(e)}", exc_info=True)
+        logger.error(f"Failed to compute execution plan: {str(e)}", exc_info=True)
         return APIResponse(
             success=False,
-            error=f"Failed to retrieve strategy: {str(e)}"
-        ) 
\ No newline at end of file
+            error=f"Failed to compute execution plan: {str(e)}"
+        )
+
+@router.get("/llm/stats", response_model=APIResponse[Dict[str, Any]])
+async def get_llm_stats(
+    current_user: UserInDB = Depends(get_current_user),
+    orchestrator: AgentOrchestrator = Depends(get_orchestrator)
+):
+    """
+    Return LLM call statistics: response cache hits and misses, the rate
+    limiter's current limits, remaining budgets and queue depth, and how
+    many identical LLM calls and workflows were coalesced.
+    """
+    return APIResponse(
+        success=True,
+        data={
+            "cache": get_llm_cache().stats(),
+            "rate_limiter": get_rate_limiter().snapshot(),
+            "coalescing": {
+                "llm_calls": get_llm_single_flight().stats(),
+                "workflows": orchestrator.inflight.stats()
+            }
+        }
+    )
\ No newline at end of file
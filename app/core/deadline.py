@@ -0,0 +1,23 @@
+import time
+from typing import Optional
+
+class DeadlineExceeded(Exception):
+    """Raised when work does not finish before its deadline."""
+
+class Deadline:
+    """A point in time by which a request, or a part of it, must finish."""
+
+    def __init__(self, seconds: float, expires_at: Optional[float] = None):
+        self.expires_at = expires_at if expires_at is not None else time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline, never negative."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() == 0.0
+
+    def child(self, seconds: float) -> "Deadline":
+        """Return a deadline `seconds` from now, capped at this deadline."""
+        return Deadline(0, expires_at=min(self.expires_at, time.monotonic() + seconds))
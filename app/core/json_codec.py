@@ -0,0 +1,35 @@
+import json
+from typing import Any, Union
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+# Name of the JSON library in use, reported for diagnostics
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+def dumps(obj: Any) -> bytes:
+    """Encode an object as compact UTF-8 JSON, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decode JSON, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def success_envelope(data: bytes) -> bytes:
+    """Wrap already-encoded JSON in the APIResponse format without re-encoding it."""
+    return b'{"success":true,"data":' + data + b',"error":null}'
+
+class EncodedJSONResponse(Response):
+    """JSON response whose body was encoded ahead of time, sent as is."""
+
+    media_type = "application/json"
+
+    def render(self, content: bytes) -> bytes:
+        return content
@@ -0,0 +1,114 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+class IncrementalJSONParser:
+    """
+    Incremental parser for a JSON object arriving in chunks.
+
+    Each top-level field is returned by feed() as soon as its value closes,
+    without waiting for the rest of the object. Text before the opening brace
+    (such as a markdown code fence) and after the closing brace is ignored.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._started = False
+        self.finished = False
+        # Position of the current top-level key and value
+        self._expecting = "key"
+        self._key_start: Optional[int] = None
+        self._key: Optional[str] = None
+        self._value_start: Optional[int] = None
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """
+        Add a chunk of text and return the fields completed by it.
+
+        Args:
+            chunk: Next piece of the streamed JSON text
+
+        Returns:
+            List of (field name, parsed value) pairs, in document order
+        """
+        self._buffer += chunk
+        fields: List[Tuple[str, Any]] = []
+
+        while self._pos < len(self._buffer) and not self.finished:
+            i = self._pos
+            c = self._buffer[i]
+            self._pos += 1
+
+            if not self._started:
+                if c == "{":
+                    self._started = True
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._expecting == "value":
+                        self._emit(i + 1, fields)
+                continue
+
+            if c == '"':
+                self._in_string = True
+                if self._depth == 1:
+                    if self._expecting == "key":
+                        self._key_start = i
+                    elif self._value_start is None:
+                        self._value_start = i
+            elif c in "{[":
+                if self._depth == 1 and self._value_start is None:
+                    self._value_start = i
+                self._depth += 1
+            elif c in "}]":
+                self._depth -= 1
+                if self._depth == 1:
+                    self._emit(i + 1, fields)
+                elif self._depth == 0:
+                    self._emit(i, fields)
+                    self.finished = True
+            elif self._depth == 1:
+                if c == ":" and self._expecting == "key" and self._key_start is not None:
+                    self._key = json.loads(self._buffer[self._key_start:i].strip())
+                    self._expecting = "value"
+                    self._value_start = None
+                elif c == ",":
+                    self._emit(i, fields)
+                    self._expecting = "key"
+                    self._key_start = None
+                elif not c.isspace() and self._expecting == "value" and self._value_start is None:
+                    # Start of a number, true, false or null
+                    self._value_start = i
+
+        return fields
+
+    def _emit(self, end: int, fields: List[Tuple[str, Any]]) -> None:
+        """Parse the pending top-level value ending at `end`, if there is one."""
+        if self._expecting != "value" or self._value_start is None:
+            return
+        raw = self._buffer[self._value_start:end]
+        self._value_start = None
+        self._expecting = "done"
+        try:
+            fields.append((self._key, json.loads(raw)))
+        except ValueError:
+            pass
+
+def parse_json_object(content: str) -> Dict[str, Any]:
+    """
+    Parse the top-level fields of a JSON object embedded in LLM output.
+
+    Malformed or truncated fields are skipped rather than failing the whole parse.
+    """
+    parser = IncrementalJSONParser()
+    return dict(parser.feed(content or ""))
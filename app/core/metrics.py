@@ -0,0 +1,304 @@
+import os
+import time
+import functools
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+# Prices used to estimate LLM cost, in US dollars per 1000 tokens
+LLM_PROMPT_COST_PER_1K_TOKENS = float(os.getenv("LLM_PROMPT_COST_PER_1K_TOKENS", "0.03"))
+LLM_COMPLETION_COST_PER_1K_TOKENS = float(os.getenv("LLM_COMPLETION_COST_PER_1K_TOKENS", "0.06"))
+
+# Content type of the Prometheus text exposition format
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Latency buckets in seconds, from fast storage calls to slow completions
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+T = TypeVar("T")
+
+class CounterChild:
+    """One labelled series of a counter."""
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+class HistogramChild:
+    """One labelled series of a histogram."""
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        # One slot per bucket plus +Inf; made cumulative only when rendered
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+class Metric(ABC):
+    """
+    A named metric with a fixed set of label names.
+
+    Series are plain attributes updated without locks: the app runs on one
+    event loop, and a rare lost update from a worker thread is acceptable
+    for monitoring. Hot paths should keep the child returned by labels()
+    instead of looking it up on every update.
+    """
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+
+    @abstractmethod
+    def _new_child(self) -> Any:
+        """Create the object holding one labelled series."""
+        pass
+
+    def labels(self, *values: str) -> Any:
+        """Return the series for the given label values, creating it on first use."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _label_text(self, values: Tuple[str, ...], extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in list(self._children.items()):
+            lines.extend(self._render_child(values, child))
+        return lines
+
+    @abstractmethod
+    def _render_child(self, values: Tuple[str, ...], child: Any) -> List[str]:
+        """Render one labelled series as exposition lines."""
+        pass
+
+class Counter(Metric):
+    """Monotonically increasing total, such as requests or tokens."""
+
+    kind = "counter"
+
+    def _new_child(self) -> CounterChild:
+        return CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increment the unlabelled series."""
+        self.labels().inc(amount)
+
+    def _render_child(self, values: Tuple[str, ...], child: CounterChild) -> List[str]:
+        return [f"{self.name}{self._label_text(values)} {_format(child.value)}"]
+
+class Histogram(Metric):
+    """Distribution of observed values, such as latencies."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> HistogramChild:
+        return HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        """Record a value in the unlabelled series."""
+        self.labels().observe(value)
+
+    def _render_child(self, values: Tuple[str, ...], child: HistogramChild) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else _format(bound)
+            bucket_labels = self._label_text(values, 'le="' + le + '"')
+            lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+        lines.append(f"{self.name}_sum{self._label_text(values)} {_format(child.sum)}")
+        lines.append(f"{self.name}_count{self._label_text(values)} {child.count}")
+        return lines
+
+class MetricsRegistry:
+    """Collection of metrics rendered together in Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+def instrument(
+    histogram: Histogram,
+    errors: Counter,
+    operation: str,
+    failed: Optional[Callable[[Any], bool]] = None
+) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """
+    Decorate an async function to time it and count its failures.
+
+    Args:
+        histogram: Latency histogram labelled by operation
+        errors: Error counter labelled by operation and error type
+        operation: Label value for this function
+        failed: Optional check marking a returned result as a failure, for
+            functions reporting errors in their result instead of raising
+    """
+    seconds = histogram.labels(operation)
+
+    def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            started = time.perf_counter()
+            try:
+                result = await func(*args, **kwargs)
+            except Exception as e:
+                errors.labels(operation, type(e).__name__).inc()
+                raise
+            finally:
+                seconds.observe(time.perf_counter() - started)
+            if failed is not None and failed(result):
+                errors.labels(operation, "failed").inc()
+            return result
+        return wrapper
+    return decorator
+
+REGISTRY = MetricsRegistry()
+
+# Workflow and agents
+WORKFLOW_SECONDS = REGISTRY.histogram(
+    "workflow_duration_seconds", "Duration of agent workflows", ["mode"]
+)
+AGENT_SECONDS = REGISTRY.histogram(
+    "agent_duration_seconds", "Duration of agent runs, including retries", ["agent"]
+)
+AGENT_RUNS = REGISTRY.counter(
+    "agent_runs_total", "Agent runs by outcome (success, reused, timeout, unavailable, error)", ["agent", "outcome"]
+)
+LAUNCH_PLAN_OUTLINE_WEEKS = REGISTRY.counter(
+    "launch_plan_outline_weeks_total", "Sharded launch plan weeks filled in from the outline"
+)
+
+# LLM calls
+LLM_SECONDS = REGISTRY.histogram(
+    "llm_request_duration_seconds", "Duration of individual chat completion calls", ["agent"]
+)
+LLM_PROMPT_TOKENS = REGISTRY.counter(
+    "llm_prompt_tokens_total", "Prompt tokens used by chat completions", ["agent"]
+)
+LLM_COMPLETION_TOKENS = REGISTRY.counter(
+    "llm_completion_tokens_total", "Completion tokens used by chat completions", ["agent"]
+)
+LLM_COST = REGISTRY.counter(
+    "llm_cost_usd_total", "Estimated cost of chat completions in US dollars", ["agent"]
+)
+LLM_ERRORS = REGISTRY.counter(
+    "llm_errors_total", "Failed chat completion calls by error type", ["agent", "error"]
+)
+LLM_CACHE = REGISTRY.counter(
+    "llm_cache_requests_total", "LLM response cache lookups by result (hit, miss)", ["agent", "result"]
+)
+LLM_RETRIES = REGISTRY.counter(
+    "llm_retries_total", "Chat completion calls retried after a transient error", ["agent"]
+)
+LLM_HEDGES = REGISTRY.counter(
+    "llm_hedges_total", "Hedged second chat completion calls sent", ["agent"]
+)
+
+# Storage and search
+STORAGE_SECONDS = REGISTRY.histogram(
+    "storage_operation_duration_seconds", "Duration of blob storage operations", ["operation"]
+)
+STORAGE_ERRORS = REGISTRY.counter(
+    "storage_errors_total", "Failed blob storage operations by error type", ["operation", "error"]
+)
+STRATEGY_CACHE = REGISTRY.counter(
+    "strategy_cache_requests_total",
+    "Strategy cache lookups by result (hit, revalidated by ETag, miss)",
+    ["result"]
+)
+SEARCH_SECONDS = REGISTRY.histogram(
+    "search_operation_duration_seconds", "Duration of Azure Search operations", ["operation"]
+)
+SEARCH_ERRORS = REGISTRY.counter(
+    "search_errors_total", "Failed Azure Search operations by error type", ["operation", "error"]
+)
+
+class LLMMetrics:
+    """An agent's LLM metric series, looked up once so each call updates them directly."""
+
+    def __init__(self, agent: str):
+        self.agent = agent
+        self.seconds = LLM_SECONDS.labels(agent)
+        self.prompt_tokens = LLM_PROMPT_TOKENS.labels(agent)
+        self.completion_tokens = LLM_COMPLETION_TOKENS.labels(agent)
+        self.cost = LLM_COST.labels(agent)
+        self.cache_hits = LLM_CACHE.labels(agent, "hit")
+        self.cache_misses = LLM_CACHE.labels(agent, "miss")
+        self.retries = LLM_RETRIES.labels(agent)
+        self.hedges = LLM_HEDGES.labels(agent)
+
+    def record_usage(self, prompt_tokens: int, completion_tokens: int) -> None:
+        self.prompt_tokens.inc(prompt_tokens)
+        self.completion_tokens.inc(completion_tokens)
+        self.cost.inc(
+            (prompt_tokens * LLM_PROMPT_COST_PER_1K_TOKENS
+             + completion_tokens * LLM_COMPLETION_COST_PER_1K_TOKENS) / 1000
+        )
+
+    def record_error(self, error: BaseException) -> None:
+        LLM_ERRORS.labels(self.agent, type(error).__name__).inc()
+
+def render_metrics() -> str:
+    """Render all application metrics in the Prometheus text format."""
+    return REGISTRY.render()
@@ -0,0 +1,89 @@
+from typing import Optional, Tuple
+
+# Streamed responses are sent to the client as produced, never wrapped
+STREAMING_MEDIA_TYPES = (b"text/event-stream", b"application/x-ndjson")
+
+# Start of a body already in our standard format, as rendered from APIResponse
+ENVELOPE_PREFIX = b'{"success":'
+
+class ResponseWrapperMiddleware:
+    """
+    ASGI middleware wrapping successful JSON responses in our standard format.
+    
+    Responses already in the APIResponse format, errors, streamed responses
+    and non-JSON bodies pass through untouched. Other JSON bodies are
+    wrapped by writing the envelope around the encoded body as it is sent,
+    so nothing is decoded, re-encoded or buffered beyond the first bytes.
+    """
+    
+    def __init__(self, app, exclude_paths: Tuple[str, ...] = ()):
+        self.app = app
+        self.exclude_paths = exclude_paths
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+        
+        start_message = None
+        head = b""
+        wrapping: Optional[bool] = None
+        
+        async def send_wrapped(message):
+            nonlocal start_message, head, wrapping
+            if wrapping is False:
+                await send(message)
+                return
+            
+            if message["type"] == "http.response.start":
+                headers = dict(message.get("headers", []))
+                content_type = headers.get(b"content-type", b"")
+                # Only successful responses are wrapped; errors keep their status and headers
+                if (
+                    message["status"] >= 400
+                    or message["status"] in (204, 304)
+                    or not content_type.startswith(b"application/json")
+                    or content_type.startswith(STREAMING_MEDIA_TYPES)
+                ):
+                    wrapping = False
+                    await send(message)
+                    return
+                # Hold the headers until the body shows whether it is already wrapped
+                start_message = message
+                return
+            
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            
+            more_body = message.get("more_body", False)
+            body = message.get("body", b"")
+            if wrapping is None:
+                head += body
+                if len(head) < len(ENVELOPE_PREFIX) and more_body:
+                    return
+                wrapping = not head.startswith(ENVELOPE_PREFIX)
+                if wrapping:
+                    prefix = b'{"success":true,"data":' + (head or b"null")
+                    headers = [
+                        (name, value) for name, value in start_message.get("headers", [])
+                        if name.lower() != b"content-length"
+                    ]
+                    if not more_body:
+                        body = prefix + b',"error":null}'
+                        headers.append((b"content-length", str(len(body)).encode("latin-1")))
+                    start_message = dict(start_message, headers=headers)
+                else:
+                    prefix = head
+                await send(start_message)
+                if more_body:
+                    await send({"type": "http.response.body", "body": prefix, "more_body": True})
+                else:
+                    await send({"type": "http.response.body", "body": body if wrapping else prefix})
+                return
+            
+            if not more_body:
+                body += b',"error":null}'
+            await send({"type": "http.response.body", "body": body, "more_body": more_body})
+        
+        await self.app(scope, receive, send_wrapped)
@@ -0,0 +1,246 @@
+import os
+import re
+import json
+import time
+import uuid
+import queue
+import random
+import logging
+import functools
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+# Record traces of requests and background jobs
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+# Fraction of traces recorded; unsampled traces cost a context lookup per span
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "1.0"))
+# File receiving one JSON trace per line
+TRACE_FILE = os.getenv("TRACE_FILE", "traces.jsonl")
+
+# Client-supplied trace ids accepted from the X-Trace-Id header
+TRACE_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]{8,64}")
+
+T = TypeVar("T")
+
+class Span:
+    """A timed operation within a trace, with attributes and an optional error."""
+
+    __slots__ = ("trace", "span_id", "parent_id", "name", "attributes", "start", "end", "error")
+
+    def __init__(self, trace: "Trace", name: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.trace = trace
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.start = time.time()
+        self.end: Optional[float] = None
+        self.error: Optional[str] = None
+
+    @property
+    def trace_id(self) -> str:
+        return self.trace.trace_id
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": round(((self.end or time.time()) - self.start) * 1000, 3),
+            "attributes": self.attributes,
+            "error": self.error
+        }
+
+class _NoopSpan:
+    """Stand-in for spans of unsampled traces; records nothing."""
+
+    trace_id: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+NOOP_SPAN = _NoopSpan()
+
+class Trace:
+    """The spans of one request or job, exported together once the root span ends."""
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.spans: List[Span] = []
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"trace_id": self.trace_id, "spans": [span.to_dict() for span in self.spans]}
+
+class JSONFileExporter:
+    """
+    Appends each finished trace to a file as one line of JSON.
+
+    Traces are serialized and written by a background thread, so exporting
+    never blocks the event loop; traces arriving while the queue is full
+    are dropped.
+    """
+
+    def __init__(self, path: str, max_queued: int = 1000):
+        self.path = path
+        self.dropped = 0
+        self._queue: "queue.Queue[Trace]" = queue.Queue(maxsize=max_queued)
+        self._thread = threading.Thread(target=self._write_loop, name="trace-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, trace: Trace) -> None:
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def _write_loop(self) -> None:
+        while True:
+            trace = self._queue.get()
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(trace.to_dict(), default=str) + "\n")
+            except OSError as e:
+                logger.warning(f"Failed to export trace {trace.trace_id}: {str(e)}")
+
+class Tracer:
+    """
+    Creates spans nested through a context variable.
+
+    The current span follows the async call chain, including into tasks
+    created while it is active, so spans opened anywhere below a request's
+    root span join its trace. Whether a trace is recorded is decided once,
+    at its root span.
+    """
+
+    def __init__(
+        self,
+        exporter: Optional[JSONFileExporter] = None,
+        sample_rate: float = TRACE_SAMPLE_RATE,
+        enabled: bool = TRACING_ENABLED
+    ):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.enabled = enabled and exporter is not None
+        self._current: ContextVar[Any] = ContextVar("current_span", default=None)
+
+    def current_span(self) -> Any:
+        """Return the active span, or a no-op span outside sampled traces."""
+        return self._current.get() or NOOP_SPAN
+
+    @contextmanager
+    def span(self, name: str, trace_id: Optional[str] = None, **attributes: Any) -> Iterator[Any]:
+        """
+        Time the enclosed block as a span of the current trace.
+
+        Outside any trace, the span starts a new trace (with `trace_id` if
+        given) subject to sampling. Exceptions are recorded on the span and
+        re-raised.
+        """
+        parent = self._current.get()
+        if parent is NOOP_SPAN or (parent is None and not self._sample()):
+            # Keep the unsampled decision for the spans nested below
+            token = self._current.set(NOOP_SPAN)
+            try:
+                yield NOOP_SPAN
+            finally:
+                self._current.reset(token)
+            return
+
+        trace = parent.trace if parent is not None else Trace(trace_id or uuid.uuid4().hex)
+        span = Span(trace, name, parent.span_id if parent is not None else None, attributes)
+        trace.spans.append(span)
+        token = self._current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {str(e)}"
+            raise
+        finally:
+            span.end = time.time()
+            self._current.reset(token)
+            if parent is None:
+                self.exporter.export(trace)
+
+    def _sample(self) -> bool:
+        return self.enabled and (self.sample_rate >= 1.0 or random.random() < self.sample_rate)
+
+_tracer: Optional[Tracer] = None
+
+def get_tracer() -> Tracer:
+    """Return the process-wide tracer, configured from the environment."""
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer(JSONFileExporter(TRACE_FILE) if TRACING_ENABLED else None)
+    return _tracer
+
+def span(name: str, **attributes: Any):
+    """Open a span of the current trace on the process-wide tracer."""
+    return get_tracer().span(name, **attributes)
+
+def current_span() -> Any:
+    """Return the active span of the process-wide tracer."""
+    return get_tracer().current_span()
+
+def traced(name: str) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """Decorate an async function to run in a span on the process-wide tracer."""
+    def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            if not get_tracer().enabled:
+                return await func(*args, **kwargs)
+            with span(name):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+class TracingMiddleware:
+    """
+    ASGI middleware running each HTTP request in the root span of a trace.
+
+    The trace id is taken from the X-Trace-Id request header when present
+    and returned in the X-Trace-Id response header. The span also covers
+    background tasks run after the response; response_ms marks when the
+    response was sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        trace_id = headers.get(b"x-trace-id", b"").decode("latin-1")
+        if not TRACE_ID_PATTERN.fullmatch(trace_id):
+            trace_id = None
+        with get_tracer().span(
+            f"{scope['method']} {scope['path']}",
+            trace_id=trace_id,
+            method=scope["method"],
+            path=scope["path"]
+        ) as root:
+            started = time.monotonic()
+
+            async def send_with_trace(message):
+                if message["type"] == "http.response.start":
+                    root.set_attribute("status_code", message["status"])
+                    if root.trace_id is not None:
+                        message.setdefault("headers", [])
+                        message["headers"] = list(message["headers"]) + [
+                            (b"x-trace-id", root.trace_id.encode("latin-1"))
+                        ]
+                elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                    root.set_attribute("response_ms", round((time.monotonic() - started) * 1000, 3))
+                await send(message)
+
+            await self.app(scope, receive, send_with_trace)
@@ -1,53 +1,29 @@
-from fastapi import FastAPI, Request, status
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 from .api.routes import router as api_router
+from .agents import create_orchestrator
 from .core.exception_handlers import validation_exception_handler, general_exception_handler
-from .models.response_models import APIResponse
+from .services.llm_client import get_llm_client, close_llm_client
+from .services.auth import close_password_hasher
+from .services.user_repository import close_user_repository
+from .services.storage import close_storage_service
+from .services.storage_backends import STORAGE_BACKEND
+from .services.job_store import create_job_store
+from .services.jobs import JobManager
 import os
 import logging
-import sys
-from starlette.middleware.base import BaseHTTPMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response
+from .core.logging_config import configure_logging
+from .core.metrics import METRICS_CONTENT_TYPE, render_metrics
+from .core.middleware import ResponseWrapperMiddleware
+from .core.tracing import TracingMiddleware
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler('app.log')
-    ]
-)
+# Configure logging; records are written to stdout and the log file by a background thread
+configure_logging()
 
 logger = logging.getLogger(__name__)
 
-class ResponseWrapperMiddleware(BaseHTTPMiddleware):
-    """Middleware to wrap all successful responses in our standard format."""
-    
-    async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
-        
-        # If the response is already a JSONResponse, don't wrap it again
-        if isinstance(response, JSONResponse):
-            return response
-            
-        # Get the response body
-        body = b""
-        async for chunk in response.body_iterator:
-            body += chunk
-        
-        # Wrap the response in our standard format
-        wrapped_response = APIResponse(
-            success=True,
-            data=body.decode() if body else None
-        )
-        
-        return JSONResponse(
-            status_code=response.status_code,
-            content=wrapped_response.model_dump()
-        )
-
 app = FastAPI(
     title="PersonalBrand.AI API",
     description="AI-powered personal brand strategy generation API",
@@ -63,8 +39,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Add response wrapper middleware
-app.add_middleware(ResponseWrapperMiddleware)
+# Add response wrapper middleware; the OpenAPI schema is served as is for the docs
+app.add_middleware(ResponseWrapperMiddleware, exclude_paths=(app.openapi_url,))
+
+# Outermost, so each request's trace covers the other middleware and its background tasks
+app.add_middleware(TracingMiddleware)
 
 # Add exception handlers
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
@@ -88,14 +67,17 @@ async def root():
         "redoc": "/redoc"
     }
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Agent, LLM, storage and search metrics in the Prometheus text format."""
+    return Response(content=render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
 @app.on_event("startup")
 async def startup_event():
     """Validate environment variables on startup."""
-    required_vars = [
-        "OPENAI_API_KEY",
-        "AZURE_STORAGE_CONNECTION_STRING",
-        "AZURE_STORAGE_CONTAINER_NAME"
-    ]
+    required_vars = ["OPENAI_API_KEY"]
+    if STORAGE_BACKEND == "azure":
+        required_vars += ["AZURE_STORAGE_CONNECTION_STRING", "AZURE_STORAGE_CONTAINER_NAME"]
     
     missing_vars = [var for var in required_vars if not os.getenv(var)]
     if missing_vars:
@@ -103,6 +85,24 @@ async def startup_event():
         raise ValueError(f"Missing required environment variables: {', '.join(missing_vars)}")
     
     logger.info("All required environment variables are present")
+    
+    # Build the stateless agents once; every request shares them and the
+    # pooled LLM client
+    app.state.orchestrator = create_orchestrator(get_llm_client())
+    logger.info("Agent orchestrator initialized")
+    
+    app.state.job_manager = JobManager(app.state.orchestrator, create_job_store())
+    await app.state.job_manager.start()
+    logger.info(f"Job manager started with {app.state.job_manager.workers} workers")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the job workers, release the shared LLM and storage connection pools, stop the hashing threads and close the user repository."""
+    await app.state.job_manager.stop()
+    await close_llm_client()
+    await close_storage_service()
+    close_password_hasher()
+    await close_user_repository()
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,11 @@
+from typing import Optional
+from pydantic import BaseModel, Field
+from .output_models import PersonalBrandStrategy
+
+class BatchItemResult(BaseModel):
+    """Result of one input in a batch generation request."""
+    index: int = Field(..., description="Position of the input in the batch")
+    success: bool = Field(..., description="Whether the strategy was generated")
+    data: Optional[PersonalBrandStrategy] = Field(None, description="Generated strategy")
+    strategy_id: Optional[str] = Field(None, description="Storage ID of the saved strategy")
+    error: Optional[str] = Field(None, description="Failure reason for this input")
@@ -0,0 +1,26 @@
+from typing import Optional, Dict, Any
+from enum import Enum
+from datetime import datetime
+from pydantic import BaseModel, Field
+from .output_models import PersonalBrandStrategy
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+class Job(BaseModel):
+    """Asynchronous strategy generation job."""
+    job_id: str = Field(..., description="Unique job identifier")
+    user_id: str = Field(..., description="ID of the user who submitted the job")
+    status: JobStatus = Field(..., description="Current job status")
+    created_at: datetime = Field(..., description="Submission time")
+    updated_at: datetime = Field(..., description="Time of the last status or result update")
+    partial_results: Dict[str, Any] = Field(
+        default_factory=dict,
+        description="Report sections completed so far, keyed by section name"
+    )
+    strategy: Optional[PersonalBrandStrategy] = Field(None, description="Final strategy once the job succeeds")
+    strategy_id: Optional[str] = Field(None, description="Storage ID of the saved strategy")
+    error: Optional[str] = Field(None, description="Failure reason if the job failed")
@@ -1,4 +1,4 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from pydantic import BaseModel, Field
 
 class BrandIdentity(BaseModel):
@@ -33,6 +33,10 @@ class WeeklyPlan(BaseModel):
     """Weekly content plan."""
     week_number: int = Field(..., description="Week number in the launch schedule")
     content: List[ContentPiece] = Field(..., description="Content pieces for the week")
+    from_outline: bool = Field(
+        False,
+        description="Whether the week was filled in from the plan outline because the LLM did not plan it"
+    )
 
 class LaunchPlan(BaseModel):
     """Launch plan and schedule."""
@@ -40,11 +44,16 @@ class LaunchPlan(BaseModel):
 
 class PersonalBrandStrategy(BaseModel):
     """Complete personal brand strategy."""
-    brand_identity: BrandIdentity = Field(..., description="Brand identity recommendations")
-    unique_strengths: UniqueStrengths = Field(..., description="Unique strengths analysis")
-    target_audience: TargetAudience = Field(..., description="Target audience analysis")
-    content_strategy: ContentStrategy = Field(..., description="Content strategy recommendations")
-    launch_plan: LaunchPlan = Field(..., description="Launch plan and schedule")
+    strategy_id: Optional[str] = Field(None, description="ID under which the strategy is stored")
+    brand_identity: Optional[BrandIdentity] = Field(None, description="Brand identity recommendations")
+    unique_strengths: Optional[UniqueStrengths] = Field(None, description="Unique strengths analysis")
+    target_audience: Optional[TargetAudience] = Field(None, description="Target audience analysis")
+    content_strategy: Optional[ContentStrategy] = Field(None, description="Content strategy recommendations")
+    launch_plan: Optional[LaunchPlan] = Field(None, description="Launch plan and schedule")
+    missing_sections: List[str] = Field(
+        default_factory=list,
+        description="Sections left empty because their agents ran out of time or the LLM was unavailable"
+    )
     
     class Config:
         json_schema_extra = {
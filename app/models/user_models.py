@@ -16,6 +16,11 @@ class UserLogin(BaseModel):
     email: EmailStr
     password: str
 
+class User(UserBase):
+    """Public user model."""
+    id: str
+    created_at: datetime
+
 class UserInDB(UserBase):
     """User model for database storage."""
     id: str
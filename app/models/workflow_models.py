@@ -0,0 +1,22 @@
+from enum import Enum
+from typing import List
+from pydantic import BaseModel, Field
+
+class ExecutionMode(str, Enum):
+    """How the orchestrator runs the agents."""
+    MULTI = "multi"          # One completion per agent
+    COMBINED = "combined"    # Configured agent groups share one completion
+
+class AgentPlanEntry(BaseModel):
+    """Scheduling details for a single agent."""
+    name: str = Field(..., description="Agent name")
+    stage: int = Field(..., description="Stage index; agents in the same stage run concurrently")
+    depends_on: List[str] = Field(..., description="Agents whose outputs this agent reads")
+    inputs: List[str] = Field(..., description="Context fields the agent reads")
+    outputs: List[str] = Field(..., description="Context fields the agent produces")
+
+class ExecutionPlan(BaseModel):
+    """Execution plan computed from the agents' declared inputs and outputs."""
+    stages: List[List[str]] = Field(..., description="Agent names grouped by stage, in execution order")
+    agents: List[AgentPlanEntry] = Field(..., description="Per-agent scheduling details")
+    critical_path: List[str] = Field(..., description="Longest dependency chain bounding end-to-end latency")
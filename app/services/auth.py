@@ -1,30 +1,152 @@
 import os
+import time
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from ..core.tracing import span
 from ..models.user_models import TokenData, UserInDB
+from .user_repository import get_user_repository
 
 # Configuration
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key-here")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# Verified tokens kept so repeat requests skip signature verification
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "10000"))
+
+# bcrypt cost factor; stored hashes with another cost are rehashed on login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# Threads running bcrypt, which releases the GIL; logins beyond this wait their turn
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
 
 # Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS
+)
 
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    """Verify a password against its hash; blocks, so use PasswordHasher in async code."""
+    with span("auth.verify_password"):
+        return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    """Hash a password."""
-    return pwd_context.hash(password)
+    """Hash a password; blocks, so use PasswordHasher in async code."""
+    with span("auth.hash_password"):
+        return pwd_context.hash(password)
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a bounded thread pool so hashing never blocks the event loop.
+    
+    A bcrypt run takes hundreds of milliseconds at the default cost; on the
+    event loop it would stall every other in-flight request for that long.
+    """
+    
+    def __init__(self, context: CryptContext = pwd_context, workers: int = PASSWORD_HASH_WORKERS):
+        self.context = context
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+    
+    async def hash(self, password: str) -> str:
+        """Hash a password at the configured cost."""
+        with span("auth.hash_password"):
+            return await asyncio.get_running_loop().run_in_executor(self._executor, self.context.hash, password)
+    
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password against its hash."""
+        with span("auth.verify_password"):
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, self.context.verify, plain_password, hashed_password
+            )
+    
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a password and rehash it if its hash uses another cost factor.
+        
+        Returns:
+            Tuple[bool, Optional[str]]: Whether the password matches, and the
+            new hash to store in place of the old one, if any
+        """
+        with span("auth.verify_password") as current:
+            valid, new_hash = await asyncio.get_running_loop().run_in_executor(
+                self._executor, self.context.verify_and_update, plain_password, hashed_password
+            )
+            current.set_attribute("rehashed", new_hash is not None)
+            return valid, new_hash
+    
+    async def dummy_verify(self) -> None:
+        """Spend a verification's time for an unknown user, so response times don't reveal which emails exist."""
+        with span("auth.verify_password"):
+            await asyncio.get_running_loop().run_in_executor(self._executor, self.context.dummy_verify)
+    
+    def shutdown(self) -> None:
+        """Stop the worker threads once queued hashes are done."""
+        self._executor.shutdown(wait=True)
+
+_password_hasher: Optional[PasswordHasher] = None
+
+def get_password_hasher() -> PasswordHasher:
+    """Return the process-wide password hasher, creating it on first use."""
+    global _password_hasher
+    if _password_hasher is None:
+        _password_hasher = PasswordHasher()
+    return _password_hasher
+
+def close_password_hasher() -> None:
+    """Stop the password hashing threads."""
+    global _password_hasher
+    if _password_hasher is not None:
+        _password_hasher.shutdown()
+        _password_hasher = None
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU cache of tokens whose signature has been verified.
+    
+    Entries expire at the token's own `exp`, so a cached token is never
+    accepted past the time decoding it would have failed.
+    """
+    
+    def __init__(self, max_entries: int = TOKEN_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, TokenData]]" = OrderedDict()
+    
+    def get(self, token: str) -> Optional[TokenData]:
+        entry = self._entries.get(token)
+        if entry is None:
+            return None
+        expires_at, token_data = entry
+        if expires_at <= time.time():
+            del self._entries[token]
+            return None
+        self._entries.move_to_end(token)
+        return token_data
+    
+    def set(self, token: str, token_data: TokenData, expires_at: float) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[token] = (expires_at, token_data)
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+token_cache = VerifiedTokenCache()
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a new JWT access token."""
@@ -44,23 +166,22 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> UserInDB:
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        user_id: str = payload.get("user_id")
-        if email is None or user_id is None:
+    token_data = token_cache.get(token)
+    if token_data is None:
+        try:
+            with span("auth.decode_token"):
+                payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            email: str = payload.get("sub")
+            user_id: str = payload.get("user_id")
+            if email is None or user_id is None:
+                raise credentials_exception
+            token_data = TokenData(email=email, user_id=user_id)
+        except JWTError:
             raise credentials_exception
-        token_data = TokenData(email=email, user_id=user_id)
-    except JWTError:
-        raise credentials_exception
+        if payload.get("exp") is not None:
+            token_cache.set(token, token_data, float(payload["exp"]))
     
-    # TODO: Get user from database
-    # For now, return a mock user
-    return UserInDB(
-        id=token_data.user_id,
-        email=token_data.email,
-        full_name="Test User",
-        hashed_password="hashed_password",
-        created_at=datetime.utcnow(),
-        updated_at=datetime.utcnow()
-    ) 
\ No newline at end of file
+    user = await get_user_repository().get_by_id(token_data.user_id)
+    if user is None:
+        raise credentials_exception
+    return user
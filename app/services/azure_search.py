@@ -11,9 +11,15 @@ from azure.search.documents.indexes.models import (
 )
 from azure.core.exceptions import AzureError
 from dotenv import load_dotenv
+from ..core.metrics import SEARCH_ERRORS, SEARCH_SECONDS, instrument
+from ..core.tracing import traced
 
 load_dotenv()
 
+def _failed(result: Dict[str, Any]) -> bool:
+    """Operations report errors in their result rather than raising."""
+    return result.get("status") == "error"
+
 class AzureSearchService:
     def __init__(self):
         """Initialize Azure Search service with credentials from environment variables."""
@@ -35,6 +41,8 @@ class AzureSearchService:
             credential=self.credential
         )
 
+    @instrument(SEARCH_SECONDS, SEARCH_ERRORS, "test_connection", failed=_failed)
+    @traced("search.test_connection")
     async def test_connection(self) -> Dict[str, Any]:
         """
         Test connection to Azure Search service.
@@ -61,6 +69,8 @@ class AzureSearchService:
                 "error": str(e)
             }
 
+    @instrument(SEARCH_SECONDS, SEARCH_ERRORS, "create_index", failed=_failed)
+    @traced("search.create_index")
     async def create_index(self) -> Dict[str, Any]:
         """
         Create search index with predefined schema.
@@ -98,6 +108,8 @@ class AzureSearchService:
                 "error": str(e)
             }
 
+    @instrument(SEARCH_SECONDS, SEARCH_ERRORS, "upload_documents", failed=_failed)
+    @traced("search.upload_documents")
     async def upload_documents(self, documents: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Upload documents to the search index.
@@ -125,6 +137,8 @@ class AzureSearchService:
                 "error": str(e)
             }
 
+    @instrument(SEARCH_SECONDS, SEARCH_ERRORS, "search", failed=_failed)
+    @traced("search.search")
     async def search(self, query: str, filter: Optional[str] = None) -> Dict[str, Any]:
         """
         Search documents in the index.
@@ -0,0 +1,129 @@
+import os
+import json
+import asyncio
+import logging
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, Optional, Set, Union
+from ..agents import AgentOrchestrator
+from ..models.batch_models import BatchItemResult
+from ..models.input_models import PersonalBrandInput
+from ..models.output_models import PersonalBrandStrategy
+from ..models.user_models import UserInDB
+from .storage import save_strategy_report
+
+logger = logging.getLogger(__name__)
+
+# Maximum pipelines of one batch running at a time; LLM calls are further
+# bounded process-wide by the LLM rate limiter
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "10"))
+
+# A batch item: a validated input, a dict of input fields or one raw JSON line
+BatchItem = Union[PersonalBrandInput, dict, str, bytes]
+
+def _parse_item(item: BatchItem) -> PersonalBrandInput:
+    if isinstance(item, PersonalBrandInput):
+        return item
+    if isinstance(item, (str, bytes)):
+        item = json.loads(item)
+    return PersonalBrandInput.model_validate(item)
+
+async def _iterate(items: Union[Iterable[BatchItem], AsyncIterable[BatchItem]]) -> AsyncIterator[BatchItem]:
+    if hasattr(items, "__aiter__"):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+def split_ndjson(body: bytes) -> Iterator[bytes]:
+    """Lazily yield the non-empty lines of an NDJSON document."""
+    start = 0
+    while start < len(body):
+        end = body.find(b"\n", start)
+        if end == -1:
+            end = len(body)
+        line = body[start:end]
+        if line.strip():
+            yield line
+        start = end + 1
+
+async def generate_strategies(
+    items: Union[Iterable[BatchItem], AsyncIterable[BatchItem]],
+    orchestrator: AgentOrchestrator,
+    user: Optional[UserInDB] = None,
+    max_concurrency: int = BATCH_MAX_CONCURRENCY
+) -> AsyncIterator[BatchItemResult]:
+    """
+    Generate strategies for many inputs, yielding each result as it finishes.
+
+    Inputs are consumed lazily, so at most max_concurrency pipelines (and
+    their inputs) are held in memory at once. A failing input produces an
+    unsuccessful result for that item only.
+
+    Args:
+        items: Inputs as models, dicts or raw JSON lines, sync or async iterable
+        orchestrator: The shared agent orchestrator
+        user: If given, each generated strategy is saved for this user
+        max_concurrency: Maximum pipelines running at the same time
+
+    Yields:
+        BatchItemResult for every input, in completion order
+    """
+    results: asyncio.Queue = asyncio.Queue()
+    slots = asyncio.Semaphore(max_concurrency)
+    running: Set[asyncio.Task] = set()
+    done_marker = object()
+
+    async def run_item(index: int, item: BatchItem) -> BatchItemResult:
+        try:
+            input_data = _parse_item(item)
+            report = await orchestrator.execute_workflow(input_data.dict())
+            strategy = PersonalBrandStrategy(**report)
+        except Exception as e:
+            logger.warning(f"Batch item {index} failed: {str(e)}")
+            return BatchItemResult(index=index, success=False, error=str(e))
+        finally:
+            slots.release()
+
+        strategy_id = None
+        if user is not None:
+            try:
+                strategy_id = await save_strategy_report(
+                    strategy=strategy,
+                    user=user,
+                    agent_states=orchestrator.agent_states(input_data.dict(), report)
+                )
+                strategy.strategy_id = strategy_id
+            except Exception as e:
+                logger.error(f"Failed to save strategy for batch item {index}: {str(e)}", exc_info=True)
+        return BatchItemResult(index=index, success=True, data=strategy, strategy_id=strategy_id)
+
+    async def feed() -> int:
+        count = 0
+        async for item in _iterate(items):
+            await slots.acquire()
+            task = asyncio.create_task(run_item(count, item))
+            running.add(task)
+            task.add_done_callback(running.discard)
+            task.add_done_callback(lambda t: results.put_nowait(t) if not t.cancelled() else None)
+            count += 1
+        return count
+
+    feeder = asyncio.create_task(feed())
+    feeder.add_done_callback(lambda _: results.put_nowait(done_marker))
+
+    total: Optional[int] = None
+    yielded = 0
+    try:
+        while total is None or yielded < total:
+            finished = await results.get()
+            if finished is done_marker:
+                # Raises if reading the inputs failed
+                total = feeder.result()
+                continue
+            yielded += 1
+            yield finished.result()
+    finally:
+        feeder.cancel()
+        for task in list(running):
+            task.cancel()
+        await asyncio.gather(feeder, *running, return_exceptions=True)
@@ -0,0 +1,177 @@
+import os
+import asyncio
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, List, Optional
+from ..models.job_models import Job, JobStatus
+
+# Job store configuration
+JOB_STORE = os.getenv("JOB_STORE", "memory")
+JOB_SQLITE_PATH = os.getenv("JOB_SQLITE_PATH", "jobs.db")
+
+# Statuses of jobs that will not change again, and of jobs still to finish
+FINISHED_STATUSES = (JobStatus.SUCCEEDED, JobStatus.FAILED)
+UNFINISHED_STATUSES = (JobStatus.QUEUED, JobStatus.RUNNING)
+
+def _fail(job: Job, error: str) -> Job:
+    job.status = JobStatus.FAILED
+    job.error = error
+    job.updated_at = datetime.utcnow()
+    return job
+
+class JobStore(ABC):
+    """Persistence interface for asynchronous generation jobs."""
+
+    @abstractmethod
+    async def save(self, job: Job) -> None:
+        """Insert or replace a job."""
+        pass
+
+    @abstractmethod
+    async def get(self, job_id: str) -> Optional[Job]:
+        """Return a job by ID, or None if it does not exist."""
+        pass
+
+    @abstractmethod
+    async def delete(self, job_id: str) -> None:
+        """Delete a job if it exists."""
+        pass
+
+    @abstractmethod
+    async def delete_finished_before(self, cutoff: datetime) -> int:
+        """Delete finished jobs last updated before `cutoff`; returns how many were deleted."""
+        pass
+
+    @abstractmethod
+    async def fail_unfinished_before(self, cutoff: datetime, error: str) -> int:
+        """Mark queued and running jobs last updated before `cutoff` as failed; returns how many were."""
+        pass
+
+    async def close(self) -> None:
+        """Release any resources held by the store."""
+        pass
+
+class InMemoryJobStore(JobStore):
+    """Job store kept in process memory; jobs are lost on restart."""
+
+    def __init__(self):
+        self._jobs: Dict[str, Job] = {}
+
+    async def save(self, job: Job) -> None:
+        self._jobs[job.job_id] = job.model_copy(deep=True)
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        return job.model_copy(deep=True) if job is not None else None
+
+    async def delete(self, job_id: str) -> None:
+        self._jobs.pop(job_id, None)
+
+    async def delete_finished_before(self, cutoff: datetime) -> int:
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.status in FINISHED_STATUSES and job.updated_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+        return len(expired)
+
+    async def fail_unfinished_before(self, cutoff: datetime, error: str) -> int:
+        stale = [
+            job for job in self._jobs.values()
+            if job.status in UNFINISHED_STATUSES and job.updated_at < cutoff
+        ]
+        for job in stale:
+            _fail(job, error)
+        return len(stale)
+
+class SQLiteJobStore(JobStore):
+    """Job store backed by a local SQLite database."""
+
+    def __init__(self, path: str = JOB_SQLITE_PATH):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    user_id TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    data TEXT NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_user_id ON jobs (user_id)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_updated_at ON jobs (updated_at)")
+
+    def _save(self, job: Job) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (job_id, user_id, status, updated_at, data) VALUES (?, ?, ?, ?, ?)",
+                (job.job_id, job.user_id, job.status.value, job.updated_at.isoformat(), job.model_dump_json())
+            )
+
+    def _get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return Job.model_validate_json(row[0]) if row else None
+
+    def _delete(self, job_id: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+
+    def _delete_finished_before(self, cutoff: datetime) -> int:
+        statuses = [status.value for status in FINISHED_STATUSES]
+        with self._lock, self._conn:
+            # ISO timestamps compare correctly as strings
+            cursor = self._conn.execute(
+                f"DELETE FROM jobs WHERE status IN ({', '.join('?' for _ in statuses)}) AND updated_at < ?",
+                (*statuses, cutoff.isoformat())
+            )
+        return cursor.rowcount
+
+    def _fail_unfinished_before(self, cutoff: datetime, error: str) -> int:
+        statuses = [status.value for status in UNFINISHED_STATUSES]
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                f"SELECT data FROM jobs WHERE status IN ({', '.join('?' for _ in statuses)}) AND updated_at < ?",
+                (*statuses, cutoff.isoformat())
+            ).fetchall()
+            jobs: List[Job] = [_fail(Job.model_validate_json(row[0]), error) for row in rows]
+            self._conn.executemany(
+                "UPDATE jobs SET status = ?, updated_at = ?, data = ? WHERE job_id = ?",
+                [(job.status.value, job.updated_at.isoformat(), job.model_dump_json(), job.job_id) for job in jobs]
+            )
+        return len(jobs)
+
+    async def save(self, job: Job) -> None:
+        await asyncio.to_thread(self._save, job)
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        return await asyncio.to_thread(self._get, job_id)
+
+    async def delete(self, job_id: str) -> None:
+        await asyncio.to_thread(self._delete, job_id)
+
+    async def delete_finished_before(self, cutoff: datetime) -> int:
+        return await asyncio.to_thread(self._delete_finished_before, cutoff)
+
+    async def fail_unfinished_before(self, cutoff: datetime, error: str) -> int:
+        return await asyncio.to_thread(self._fail_unfinished_before, cutoff, error)
+
+    async def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+def create_job_store() -> JobStore:
+    """Create the job store selected by the JOB_STORE environment variable."""
+    if JOB_STORE == "memory":
+        return InMemoryJobStore()
+    if JOB_STORE == "sqlite":
+        return SQLiteJobStore(JOB_SQLITE_PATH)
+    raise ValueError(f"Unknown job store: {JOB_STORE}")
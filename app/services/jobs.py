@@ -0,0 +1,197 @@
+import os
+import math
+import uuid
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from ..agents import AgentOrchestrator, REPORT_SECTIONS
+from ..core.tracing import span
+from ..models.input_models import PersonalBrandInput
+from ..models.job_models import Job, JobStatus
+from ..models.output_models import PersonalBrandStrategy
+from ..models.user_models import UserInDB
+from .job_store import JobStore
+from .storage import save_strategy_report
+
+logger = logging.getLogger(__name__)
+
+# Worker pool configuration
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "100"))
+# Retry-After hint used until a job has completed and durations are known
+JOB_DEFAULT_RETRY_AFTER_SECONDS = int(os.getenv("JOB_DEFAULT_RETRY_AFTER_SECONDS", "30"))
+# Finished jobs are kept for polling this long, then deleted from the job store
+JOB_RESULT_TTL_SECONDS = float(os.getenv("JOB_RESULT_TTL_SECONDS", "86400"))
+JOB_CLEANUP_INTERVAL_SECONDS = float(os.getenv("JOB_CLEANUP_INTERVAL_SECONDS", "300"))
+# Queued or running jobs not updated for this long are marked failed
+JOB_STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", "3600"))
+
+class JobQueueFullError(Exception):
+    """Raised when the job queue has no room for another job."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Job queue is full")
+        self.retry_after = retry_after
+
+class JobManager:
+    """
+    Runs strategy generation jobs on a bounded queue with a fixed pool of workers.
+
+    Jobs are persisted in a JobStore, including the report sections completed
+    so far, so clients can poll for progress and the final strategy.
+    Finished jobs are deleted from the store once they are older than the
+    result TTL. The queue itself lives in memory, so jobs left queued or
+    running by a previous process are marked failed on start, and jobs
+    that stop making progress are marked failed once they are stale.
+    """
+
+    def __init__(
+        self,
+        orchestrator: AgentOrchestrator,
+        store: JobStore,
+        workers: int = JOB_WORKERS,
+        queue_size: int = JOB_QUEUE_SIZE,
+        result_ttl_seconds: float = JOB_RESULT_TTL_SECONDS
+    ):
+        self.orchestrator = orchestrator
+        self.store = store
+        self.workers = workers
+        self.result_ttl_seconds = result_ttl_seconds
+        self._queue: "asyncio.Queue[Tuple[Job, PersonalBrandInput, UserInDB]]" = asyncio.Queue(maxsize=queue_size)
+        self._tasks: List[asyncio.Task] = []
+        # Moving average of job duration, used for the Retry-After hint
+        self._avg_duration: Optional[float] = None
+
+    async def start(self) -> None:
+        """Fail the jobs a previous process left unfinished, then start the worker pool and the cleanup."""
+        interrupted = await self.store.fail_unfinished_before(datetime.utcnow(), "Job was interrupted by a restart")
+        if interrupted:
+            logger.warning(f"Marked {interrupted} jobs interrupted by a restart as failed")
+        for index in range(self.workers):
+            self._tasks.append(asyncio.create_task(self._worker(index)))
+        self._tasks.append(asyncio.create_task(self._cleanup()))
+
+    async def stop(self) -> None:
+        """Stop the workers and close the job store."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self.store.close()
+
+    def retry_after(self) -> int:
+        """Estimate the seconds until queue capacity frees up."""
+        if self._avg_duration is None:
+            return JOB_DEFAULT_RETRY_AFTER_SECONDS
+        return max(1, math.ceil(self._avg_duration * self._queue.qsize() / self.workers))
+
+    async def submit(self, input_data: PersonalBrandInput, user: UserInDB) -> Job:
+        """
+        Enqueue a strategy generation job.
+
+        Args:
+            input_data: The user's strategy input
+            user: The user submitting the job
+
+        Returns:
+            The queued job
+
+        Raises:
+            JobQueueFullError: If the queue is at capacity
+        """
+        if self._queue.full():
+            raise JobQueueFullError(self.retry_after())
+
+        now = datetime.utcnow()
+        job = Job(
+            job_id=str(uuid.uuid4()),
+            user_id=user.id,
+            status=JobStatus.QUEUED,
+            created_at=now,
+            updated_at=now
+        )
+        await self.store.save(job)
+        try:
+            self._queue.put_nowait((job, input_data, user))
+        except asyncio.QueueFull:
+            # Concurrent submits filled the queue while the job was being saved
+            await self.store.delete(job.job_id)
+            raise JobQueueFullError(self.retry_after())
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        """Return a job by ID."""
+        return await self.store.get(job_id)
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job, input_data, user = await self._queue.get()
+            try:
+                stored = await self.store.get(job.job_id)
+                if stored is None or stored.status != JobStatus.QUEUED:
+                    # Failed as stale while waiting in the queue, or already cleaned up
+                    continue
+                # Each job is traced on its own, apart from the request that submitted it
+                with span("job", job_id=job.job_id):
+                    await self._run_job(job, input_data, user)
+            except Exception as e:
+                logger.error(f"Job worker {index} failed to record job {job.job_id}: {str(e)}", exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    async def _cleanup(self) -> None:
+        while True:
+            await asyncio.sleep(JOB_CLEANUP_INTERVAL_SECONDS)
+            try:
+                now = datetime.utcnow()
+                stale = await self.store.fail_unfinished_before(
+                    now - timedelta(seconds=JOB_STALE_SECONDS), "Job made no progress and was abandoned"
+                )
+                if stale:
+                    logger.warning(f"Marked {stale} jobs without progress for {JOB_STALE_SECONDS:g}s as failed")
+                deleted = await self.store.delete_finished_before(now - timedelta(seconds=self.result_ttl_seconds))
+                if deleted:
+                    logger.info(f"Deleted {deleted} finished jobs older than {self.result_ttl_seconds:g}s")
+            except Exception as e:
+                logger.error(f"Failed to delete finished jobs: {str(e)}", exc_info=True)
+
+    async def _run_job(self, job: Job, input_data: PersonalBrandInput, user: UserInDB) -> None:
+        started = asyncio.get_running_loop().time()
+        job.status = JobStatus.RUNNING
+        job.updated_at = datetime.utcnow()
+        await self.store.save(job)
+
+        try:
+            results = {}
+            async for agent_name, result in self.orchestrator.stream_workflow(input_data.dict()):
+                results[agent_name] = result
+                job.partial_results[REPORT_SECTIONS.get(agent_name, agent_name)] = result
+                job.updated_at = datetime.utcnow()
+                await self.store.save(job)
+
+            report = self.orchestrator.generate_final_report(results)
+            job.strategy = PersonalBrandStrategy(**report)
+            job.status = JobStatus.SUCCEEDED
+        except Exception as e:
+            logger.error(f"Job {job.job_id} failed: {str(e)}", exc_info=True)
+            job.status = JobStatus.FAILED
+            job.error = f"Failed to generate personal brand strategy: {str(e)}"
+
+        if job.strategy is not None:
+            # A storage failure does not fail the job; the strategy is still returned
+            try:
+                job.strategy_id = await save_strategy_report(
+                    strategy=job.strategy,
+                    user=user,
+                    agent_states=self.orchestrator.agent_states(input_data.dict(), report)
+                )
+                job.strategy.strategy_id = job.strategy_id
+            except Exception as e:
+                logger.error(f"Failed to save strategy for job {job.job_id}: {str(e)}", exc_info=True)
+
+        job.updated_at = datetime.utcnow()
+        await self.store.save(job)
+
+        duration = asyncio.get_running_loop().time() - started
+        self._avg_duration = duration if self._avg_duration is None else 0.8 * self._avg_duration + 0.2 * duration
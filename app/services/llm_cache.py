@@ -0,0 +1,226 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Cache configuration
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024"))
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", ".cache/llm")
+LLM_CACHE_MAX_DISK_BYTES = int(os.getenv("LLM_CACHE_MAX_DISK_BYTES", str(256 * 1024 * 1024)))
+
+def normalize_prompt(content: str) -> str:
+    """Strip indentation and surrounding blank lines so formatting-only differences share a key."""
+    return "\n".join(line.strip() for line in content.strip().splitlines())
+
+class MemoryCacheTier:
+    """Bounded in-memory LRU tier."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str, expires_at: float) -> None:
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class DiskCacheTier:
+    """
+    Persistent tier storing one JSON file per entry.
+
+    The total size is bounded by evicting the least recently written files.
+    Methods block on file I/O and are meant to be run in a worker thread.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # key -> (mtime, size); built from the directory on first use
+        self._index: Optional[Dict[str, Tuple[float, int]]] = None
+        self._total_bytes = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _load_index(self) -> None:
+        if self._index is not None:
+            return
+        self._index = {}
+        self._total_bytes = 0
+        if self.directory.exists():
+            for path in self.directory.glob("*/*.json"):
+                stat = path.stat()
+                self._index[path.stem] = (stat.st_mtime, stat.st_size)
+                self._total_bytes += stat.st_size
+
+    def _remove(self, key: str) -> None:
+        _, size = self._index.pop(key, (0, 0))
+        self._total_bytes -= size
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def get(self, key: str) -> Optional[Tuple[float, str]]:
+        with self._lock:
+            self._load_index()
+            if key not in self._index:
+                return None
+            try:
+                entry = json.loads(self._path(key).read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                self._remove(key)
+                return None
+            if entry["expires_at"] < time.time():
+                self._remove(key)
+                return None
+            return entry["expires_at"], entry["value"]
+
+    def set(self, key: str, value: str, expires_at: float) -> None:
+        data = json.dumps({"expires_at": expires_at, "value": value}).encode("utf-8")
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            self._load_index()
+            if key in self._index:
+                self._remove(key)
+            path = self._path(key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+            self._index[key] = (time.time(), len(data))
+            self._total_bytes += len(data)
+
+            if self._total_bytes > self.max_bytes:
+                for old_key, _ in sorted(self._index.items(), key=lambda item: item[1][0]):
+                    if self._total_bytes <= self.max_bytes:
+                        break
+                    self._remove(old_key)
+
+    def size_bytes(self) -> int:
+        return self._total_bytes
+
+class LLMCache:
+    """
+    Two-tier cache for chat completion responses.
+
+    Lookups check the in-memory LRU first and fall back to the on-disk tier,
+    promoting disk hits into memory. Entries expire after the configured TTL.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = LLM_CACHE_TTL_SECONDS,
+        cache_dir: Optional[str] = LLM_CACHE_DIR,
+        max_disk_bytes: int = LLM_CACHE_MAX_DISK_BYTES,
+        enabled: bool = LLM_CACHE_ENABLED
+    ):
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self.memory = MemoryCacheTier(max_entries)
+        self.disk = DiskCacheTier(cache_dir, max_disk_bytes) if cache_dir else None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model: str, messages: List[Dict[str, str]], params: Dict[str, Any]) -> str:
+        """Hash the model, normalized messages and sampling parameters into a cache key."""
+        payload = {
+            "model": model,
+            "messages": [
+                {"role": message["role"], "content": normalize_prompt(message["content"])}
+                for message in messages
+            ],
+            "params": params
+        }
+        encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[str]:
+        """Return the cached response for a key, or None on a miss."""
+        if not self.enabled:
+            return None
+
+        value = self.memory.get(key)
+        if value is not None:
+            self.memory_hits += 1
+            return value
+
+        if self.disk is not None:
+            try:
+                entry = await asyncio.to_thread(self.disk.get, key)
+            except OSError as e:
+                # The disk tier is an optimization; a failing disk is a miss
+                logger.warning(f"LLM cache disk read failed: {str(e)}")
+                entry = None
+            if entry is not None:
+                expires_at, value = entry
+                self.memory.set(key, value, expires_at)
+                self.disk_hits += 1
+                return value
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: str) -> None:
+        """Store a response in both tiers; the disk tier is skipped if writing to it fails."""
+        if not self.enabled:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        self.memory.set(key, value, expires_at)
+        if self.disk is not None:
+            try:
+                await asyncio.to_thread(self.disk.set, key, value, expires_at)
+            except OSError as e:
+                logger.warning(f"LLM cache disk write failed: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and tier sizes."""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "memory_entries": len(self.memory),
+            "disk_bytes": self.disk.size_bytes() if self.disk is not None else 0
+        }
+
+_cache: Optional[LLMCache] = None
+
+def get_llm_cache() -> LLMCache:
+    """Return the process-wide LLM response cache, creating it on first use."""
+    global _cache
+    if _cache is None:
+        _cache = LLMCache()
+    return _cache
@@ -0,0 +1,44 @@
+import os
+from typing import Optional
+import httpx
+from openai import AsyncOpenAI
+
+# Connection pool configuration shared by every LLM call in the process
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "20"))
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(
+    os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", str(OPENAI_MAX_CONNECTIONS))
+)
+OPENAI_KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "60"))
+
+_client: Optional[AsyncOpenAI] = None
+
+def get_llm_client() -> AsyncOpenAI:
+    """
+    Return the process-wide OpenAI client, creating it on first use.
+
+    All agents share this client so that requests reuse one keep-alive
+    connection pool instead of opening new connections per agent.
+    """
+    global _client
+    if _client is None:
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY
+            )
+        )
+        _client = AsyncOpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            http_client=http_client,
+            # Transient errors are retried by the callers within their deadlines
+            max_retries=0
+        )
+    return _client
+
+async def close_llm_client() -> None:
+    """Close the shared client and its connection pool."""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
\ No newline at end of file
@@ -1,18 +1,19 @@
 import os
-import openai
 from typing import Dict, Any, Optional
+from .llm_client import get_llm_client
+from .rate_limiter import get_rate_limiter, estimate_tokens
 
 class OpenAIService:
     def __init__(self):
-        """Initialize OpenAI service with API key"""
-        openai.api_key = os.getenv("OPENAI_API_KEY")
+        """Initialize OpenAI service with the shared pooled client"""
+        self.client = get_llm_client()
         self.model = os.getenv("OPENAI_MODEL_NAME", "gpt-4")
 
     async def test_connection(self) -> Dict[str, Any]:
         """Test connection to OpenAI API"""
         try:
             # Make a simple test request
-            response = await openai.ChatCompletion.acreate(
+            response = await self.client.chat.completions.create(
                 model=self.model,
                 messages=[{"role": "user", "content": "Test connection"}],
                 max_tokens=5
@@ -36,12 +37,16 @@ class OpenAIService:
     ) -> Dict[str, Any]:
         """Generate completion using OpenAI API"""
         try:
-            response = await openai.ChatCompletion.acreate(
-                model=model or self.model,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=max_tokens,
-                temperature=temperature
-            )
+            messages = [{"role": "user", "content": prompt}]
+            async with get_rate_limiter().limit(estimate_tokens(messages, max_tokens)) as permit:
+                response = await self.client.chat.completions.create(
+                    model=model or self.model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature
+                )
+                if response.usage is not None:
+                    permit.record_usage(response.usage.total_tokens)
             
             return {
                 "status": "success",
@@ -0,0 +1,224 @@
+import os
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+from openai import RateLimitError
+
+# Provider budgets, per minute
+LLM_RPM_LIMIT = int(os.getenv("LLM_RPM_LIMIT", "500"))
+LLM_TPM_LIMIT = int(os.getenv("LLM_TPM_LIMIT", "150000"))
+# Bounds for the adaptive number of LLM calls in flight across the process
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+LLM_MIN_CONCURRENCY = int(os.getenv("LLM_MIN_CONCURRENCY", "1"))
+# Back off when a call takes this many times longer than the latency baseline
+LLM_LATENCY_BACKOFF_FACTOR = float(os.getenv("LLM_LATENCY_BACKOFF_FACTOR", "2.0"))
+# Completion tokens assumed when a call does not set max_tokens
+LLM_EXPECTED_COMPLETION_TOKENS = int(os.getenv("LLM_EXPECTED_COMPLETION_TOKENS", "600"))
+
+# Outcomes of a call, reported when its permit is released
+OUTCOME_SUCCESS = "success"
+OUTCOME_THROTTLED = "throttled"
+OUTCOME_ERROR = "error"
+OUTCOME_CANCELLED = "cancelled"
+
+def count_tokens(text: str) -> int:
+    """Roughly count the tokens in a text (about 4 characters per token)."""
+    return len(text or "") // 4
+
+def estimate_prompt_tokens(messages: List[Dict[str, str]]) -> int:
+    """Roughly count the prompt tokens of chat messages, including per-message overhead."""
+    return sum(count_tokens(message["content"]) + 4 for message in messages)
+
+def estimate_tokens(messages: List[Dict[str, str]], max_tokens: Optional[int] = None) -> int:
+    """Estimate the tokens a chat completion will consume before making the call."""
+    return estimate_prompt_tokens(messages) + (max_tokens or LLM_EXPECTED_COMPLETION_TOKENS)
+
+class TokenBucket:
+    """Token bucket refilled continuously at `capacity` per minute."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self._rate = capacity / 60.0
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def delay(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (0 if they are now)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self._rate
+
+    def take(self, amount: float) -> None:
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+    def adjust(self, amount: float) -> None:
+        """Return (positive) or charge (negative) tokens after the fact."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+class LLMPermit:
+    """Permission to make one LLM call; report the actual usage through it."""
+
+    def __init__(self, estimated_tokens: int):
+        self.estimated_tokens = estimated_tokens
+        self.actual_tokens: Optional[int] = None
+
+    def record_usage(self, total_tokens: Optional[int]) -> None:
+        self.actual_tokens = total_tokens
+
+class LLMRateLimiter:
+    """
+    Process-wide limiter for LLM calls.
+
+    Calls are admitted when both the requests-per-minute and tokens-per-minute
+    buckets have room and the number of calls in flight is under the adaptive
+    concurrency limit. The limit grows additively while calls succeed at normal
+    latency and is halved on rate-limit errors or latency spikes (AIMD).
+    Calls that fail otherwise or are cancelled (such as hedge losers) only
+    give back their slot; their latency says nothing about the provider.
+    """
+
+    def __init__(
+        self,
+        rpm_limit: int = LLM_RPM_LIMIT,
+        tpm_limit: int = LLM_TPM_LIMIT,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        min_concurrency: int = LLM_MIN_CONCURRENCY,
+        latency_backoff_factor: float = LLM_LATENCY_BACKOFF_FACTOR
+    ):
+        self.requests = TokenBucket(rpm_limit)
+        self.tokens = TokenBucket(tpm_limit)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.latency_backoff_factor = latency_backoff_factor
+        self.concurrency_limit = float(max_concurrency)
+        self.in_flight = 0
+        self.queue_depth = 0
+        self.throttled = 0
+        self.backoffs = 0
+        self._latency_baseline: Optional[float] = None
+        self._last_backoff = 0.0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self, estimated_tokens: int) -> LLMPermit:
+        """Wait until a call with the given token estimate may be made."""
+        self.queue_depth += 1
+        try:
+            async with self._condition:
+                while True:
+                    if self.in_flight < int(self.concurrency_limit):
+                        delay = max(self.requests.delay(1), self.tokens.delay(estimated_tokens))
+                        if delay == 0:
+                            self.requests.take(1)
+                            self.tokens.take(estimated_tokens)
+                            self.in_flight += 1
+                            return LLMPermit(estimated_tokens)
+                        timeout = delay
+                    else:
+                        timeout = None
+                    try:
+                        await asyncio.wait_for(self._condition.wait(), timeout=timeout)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            self.queue_depth -= 1
+
+    async def release(self, permit: LLMPermit, latency: float, outcome: str) -> None:
+        """
+        Finish a call, reconcile its token usage and adjust the concurrency limit.
+
+        `outcome` is one of OUTCOME_SUCCESS, OUTCOME_THROTTLED, OUTCOME_ERROR
+        or OUTCOME_CANCELLED. Only successful and throttled calls adjust the
+        limit, and only successful ones feed the latency baseline.
+        """
+        async with self._condition:
+            self.in_flight -= 1
+            if permit.actual_tokens is not None:
+                self.tokens.adjust(permit.estimated_tokens - permit.actual_tokens)
+
+            spike = (
+                outcome == OUTCOME_SUCCESS
+                and self._latency_baseline is not None
+                and latency > self._latency_baseline * self.latency_backoff_factor
+            )
+            if outcome == OUTCOME_THROTTLED:
+                self.throttled += 1
+            if outcome == OUTCOME_THROTTLED or spike:
+                self._back_off(latency)
+            elif outcome == OUTCOME_SUCCESS:
+                # Additive increase: about +1 per limit's worth of successful calls
+                self.concurrency_limit = min(
+                    self.max_concurrency,
+                    self.concurrency_limit + 1.0 / max(self.concurrency_limit, 1.0)
+                )
+                self._latency_baseline = (
+                    latency if self._latency_baseline is None
+                    else 0.9 * self._latency_baseline + 0.1 * latency
+                )
+            self._condition.notify_all()
+
+    def _back_off(self, latency: float) -> None:
+        # Calls already in flight when the limit was cut report the same
+        # congestion; only back off once per observed latency window
+        now = time.monotonic()
+        if now - self._last_backoff < (self._latency_baseline or latency):
+            return
+        self._last_backoff = now
+        self.backoffs += 1
+        self.concurrency_limit = max(self.min_concurrency, self.concurrency_limit / 2)
+
+    @asynccontextmanager
+    async def limit(self, estimated_tokens: int) -> AsyncIterator[LLMPermit]:
+        """
+        Context manager wrapping one LLM call.
+
+        Rate-limit errors raised inside the block count as throttling; other
+        errors and cancellation leave the concurrency limit unchanged.
+        """
+        permit = await self.acquire(estimated_tokens)
+        started = time.monotonic()
+        outcome = OUTCOME_ERROR
+        try:
+            yield permit
+            outcome = OUTCOME_SUCCESS
+        except RateLimitError:
+            outcome = OUTCOME_THROTTLED
+            raise
+        except asyncio.CancelledError:
+            outcome = OUTCOME_CANCELLED
+            raise
+        finally:
+            await self.release(permit, time.monotonic() - started, outcome)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the current limits, budgets and queue depth."""
+        return {
+            "rpm_limit": self.requests.capacity,
+            "tpm_limit": self.tokens.capacity,
+            "requests_available": int(self.requests.tokens),
+            "tokens_available": int(self.tokens.tokens),
+            "concurrency_limit": int(self.concurrency_limit),
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "latency_baseline_seconds": self._latency_baseline,
+            "throttled": self.throttled,
+            "backoffs": self.backoffs
+        }
+
+_limiter: Optional[LLMRateLimiter] = None
+
+def get_rate_limiter() -> LLMRateLimiter:
+    """Return the process-wide LLM rate limiter, creating it on first use."""
+    global _limiter
+    if _limiter is None:
+        _limiter = LLMRateLimiter()
+    return _limiter
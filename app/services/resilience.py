@@ -0,0 +1,97 @@
+import os
+import random
+import asyncio
+from collections import deque
+from typing import Awaitable, Callable, Deque, Optional, TypeVar
+from openai import APIConnectionError, InternalServerError, RateLimitError
+from ..core.deadline import Deadline
+
+# Retries of transient LLM errors, with full-jitter exponential backoff
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_RETRY_BASE_SECONDS = float(os.getenv("LLM_RETRY_BASE_SECONDS", "0.5"))
+# Send a second, hedged completion when the first is slower than the p95 latency
+LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE_ENABLED", "false").lower() == "true"
+# Latency samples needed before the p95 is trusted for hedging
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+
+# Errors worth retrying: timeouts and connection failures, 429s and 5xx responses
+TRANSIENT_ERRORS = (APIConnectionError, RateLimitError, InternalServerError)
+
+T = TypeVar("T")
+
+class LatencyTracker:
+    """Sliding window of call latencies for percentile estimates."""
+
+    def __init__(self, window: int = 200):
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, quantile: float, min_samples: int = 1) -> Optional[float]:
+        """Return the latency at the given quantile, or None with too few samples."""
+        if len(self._samples) < max(min_samples, 1):
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(quantile * len(ordered)))]
+
+async def call_with_retries(
+    call: Callable[[], Awaitable[T]],
+    deadline: Optional[Deadline] = None,
+    max_retries: int = LLM_MAX_RETRIES,
+    base_delay: float = LLM_RETRY_BASE_SECONDS,
+    on_retry: Optional[Callable[[BaseException], None]] = None
+) -> T:
+    """
+    Run `call`, retrying transient errors with jittered exponential backoff.
+
+    A retry is only attempted if its backoff ends before the deadline;
+    otherwise the last error is raised. `on_retry` is called with the error
+    before each retry.
+    """
+    attempt = 0
+    while True:
+        try:
+            return await call()
+        except TRANSIENT_ERRORS as e:
+            if attempt >= max_retries:
+                raise
+            delay = random.uniform(0, base_delay * 2 ** attempt)
+            if deadline is not None and delay >= deadline.remaining():
+                raise
+            if on_retry is not None:
+                on_retry(e)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+async def hedged(
+    call: Callable[[], Awaitable[T]],
+    hedge_after: Optional[float],
+    on_hedge: Optional[Callable[[], None]] = None
+) -> T:
+    """
+    Run `call`, starting a second copy if the first has not finished after
+    `hedge_after` seconds. The first successful result wins and the other
+    copy is cancelled; if both fail, the last error is raised. `on_hedge` is
+    called when the second copy starts.
+    """
+    tasks = {asyncio.ensure_future(call())}
+    try:
+        if hedge_after is not None:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+            if not done:
+                if on_hedge is not None:
+                    on_hedge()
+                tasks.add(asyncio.ensure_future(call()))
+
+        error: Optional[BaseException] = None
+        while tasks:
+            done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            succeeded = [task for task in done if task.exception() is None]
+            if succeeded:
+                return succeeded[0].result()
+            error = next(iter(done)).exception()
+        raise error
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,73 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+class _Flight:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one execution.
+
+    The first caller for a key starts the call; callers arriving while it is
+    in flight await the same result (or exception) instead of starting their
+    own. The shared call is cancelled only once every caller has gone away.
+    """
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run `call`, or join the in-flight call with the same key.
+
+        Args:
+            key: Identity of the call; equal keys must mean equal results
+            call: Function starting the call, invoked only by the first caller
+
+        Returns:
+            The shared result, which callers must not mutate
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(call()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+            self.executed += 1
+        else:
+            self.coalesced += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+
+    def _forget(self, key: str, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not flight.task.cancelled():
+            # Mark the exception as retrieved even if every caller left
+            flight.task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        """Return how many calls were executed, coalesced and are in flight."""
+        return {
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._flights)
+        }
+
+_llm_calls: Optional[SingleFlight] = None
+
+def get_llm_single_flight() -> SingleFlight:
+    """Return the process-wide coalescer for identical LLM calls."""
+    global _llm_calls
+    if _llm_calls is None:
+        _llm_calls = SingleFlight()
+    return _llm_calls
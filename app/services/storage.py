@@ -1,59 +1,191 @@
 import os
-import json
+import time
 import uuid
+from collections import OrderedDict
 from datetime import datetime
-from azure.storage.blob import BlobServiceClient
+from typing import Any, Dict, Optional, Tuple
+from ..core.json_codec import dumps, loads
+from ..core.metrics import STORAGE_ERRORS, STORAGE_SECONDS, STRATEGY_CACHE, instrument
+from ..core.tracing import traced
 from ..models.output_models import PersonalBrandStrategy
 from ..models.user_models import UserInDB
+from .storage_backends import (
+    BLOB_ABSENT, PreconditionFailedError, StorageBackend, StoredBlob, create_storage_backend
+)
+from .storage_codecs import CODEC_METADATA_KEY, decode_blob, get_write_codec
+
+# In-process cache of the latest version of recently read strategies
+STRATEGY_CACHE_MAX_ENTRIES = int(os.getenv("STRATEGY_CACHE_MAX_ENTRIES", "1024"))
+# Cached strategies are served without asking storage for this long; after
+# that each read revalidates the entry by ETag (0: revalidate on every read)
+STRATEGY_CACHE_REVALIDATE_SECONDS = float(os.getenv("STRATEGY_CACHE_REVALIDATE_SECONDS", "0"))
+
+# Metadata key holding the version a latest copy was written from
+VERSION_METADATA_KEY = "strategy_version"
+
+class CachedStrategy:
+    """The latest version of a strategy as stored, and its model once decoded."""
+    __slots__ = ("etag", "payload", "version", "strategy", "checked_at")
+    
+    def __init__(self, etag: str, payload: bytes, version: str = ""):
+        self.etag = etag
+        self.payload = payload
+        self.version = version
+        self.strategy: Optional[PersonalBrandStrategy] = None
+        self.checked_at = time.monotonic()
+
+class StrategyCache:
+    """Bounded LRU of CachedStrategy entries keyed by user and strategy ID."""
+    
+    def __init__(self, max_entries: int = STRATEGY_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], CachedStrategy]" = OrderedDict()
+    
+    def get(self, key: Tuple[str, str]) -> Optional[CachedStrategy]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+    
+    def set(self, key: Tuple[str, str], entry: CachedStrategy) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def __len__(self) -> int:
+        return len(self._entries)
 
 class StorageService:
-    """Service for managing strategy report storage in Azure Blob Storage."""
+    """
+    Service for managing strategy report storage on a storage backend.
     
-    def __init__(self):
-        connection_string = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
-        container_name = os.getenv("AZURE_STORAGE_CONTAINER_NAME")
-        
-        if not connection_string or not container_name:
-            raise ValueError("Azure Storage configuration is missing")
-        
-        self.blob_service_client = BlobServiceClient.from_connection_string(connection_string)
-        self.container_client = self.blob_service_client.get_container_client(container_name)
+    Every save writes a timestamped version under the strategy's directory
+    and the same document to a "latest" blob at a fixed name, so a read is
+    a single GET instead of a listing plus a download. The latest blob
+    records its version and is only replaced by a newer one, with an
+    ETag-conditional write, so concurrent saves cannot leave it pointing
+    at an older version. Reads go through a
+    StrategyCache revalidated with conditional GETs: an unchanged strategy
+    costs one round trip with no body and is not decoded again.
+    
+    Documents are written with the STORAGE_CODEC codec, recorded in each
+    blob's metadata; blob names stay the same whatever the codec, and blobs
+    in every format are read side by side.
+    """
+    
+    def __init__(self, backend: StorageBackend, cache: Optional[StrategyCache] = None):
+        self.backend = backend
+        self.cache = cache if cache is not None else StrategyCache()
+        self.codec = get_write_codec()
     
-    async def save_strategy(self, strategy: PersonalBrandStrategy, user: UserInDB) -> str:
+    async def _put(
+        self,
+        blob_name: str,
+        document: bytes,
+        version: Optional[str] = None,
+        if_match: Optional[str] = None
+    ) -> str:
+        """Write a JSON document with the configured codec; returns the blob's ETag."""
+        metadata = {CODEC_METADATA_KEY: self.codec.name}
+        if version is not None:
+            metadata[VERSION_METADATA_KEY] = version
+        return await self.backend.put(blob_name, self.codec.encode(document), metadata=metadata, if_match=if_match)
+    
+    @staticmethod
+    def _decode(blob: StoredBlob) -> bytes:
+        """Return the JSON document held by a downloaded blob."""
+        return decode_blob(blob.data, blob.metadata)
+    
+    @staticmethod
+    def _latest_blob_name(strategy_id: str, user: UserInDB) -> str:
+        # Kept outside the strategy's directory, which holds only report versions
+        return f"users/{user.id}/latest_strategies/{strategy_id}.json"
+    
+    async def save_strategy(
+        self,
+        strategy: PersonalBrandStrategy,
+        user: UserInDB,
+        strategy_id: Optional[str] = None
+    ) -> str:
         """
-        Save a strategy report to Azure Blob Storage.
+        Save a strategy report to storage.
         
         Args:
             strategy: The strategy report to save
             user: The user who owns the strategy
+            strategy_id: Existing ID to save a new version under; a new ID is
+                generated if omitted
             
         Returns:
             str: The unique ID of the saved strategy
         """
-        try:
-            # Generate unique ID for the strategy
-            strategy_id = str(uuid.uuid4())
-            timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+        # Generate unique ID for the strategy
+        strategy_id = strategy_id or str(uuid.uuid4())
+        
+        strategy_dict = strategy.model_dump()
+        strategy_dict["strategy_id"] = strategy_id
+        return await self.save_strategy_payload(dumps(strategy_dict), user, strategy_id)
+    
+    @instrument(STORAGE_SECONDS, STORAGE_ERRORS, "save_strategy")
+    @traced("storage.save_strategy")
+    async def save_strategy_payload(self, payload: bytes, user: UserInDB, strategy_id: str) -> str:
+        """
+        Save an encoded strategy report (see encode_strategy) as is.
+        
+        Args:
+            payload: The strategy document as JSON bytes
+            user: The user who owns the strategy
+            strategy_id: The ID the document was encoded with
             
-            # Create blob name with user ID and timestamp
-            blob_name = f"users/{user.id}/strategies/{strategy_id}/{timestamp}_strategy.json"
+        Returns:
+            str: The ID of the saved strategy
+        """
+        try:
+            # Microseconds keep versions in order and a random suffix keeps
+            # versions saved at the same instant from overwriting each other
+            version = f"{datetime.utcnow().strftime('%Y%m%d_%H%M%S_%f')}_{uuid.uuid4().hex[:8]}"
             
-            # Convert strategy to JSON using Pydantic v2 syntax
-            strategy_dict = strategy.model_dump()  # New Pydantic v2 method
-            strategy_json = json.dumps(strategy_dict, indent=2)
+            # Create blob name with user ID and version
+            blob_name = f"users/{user.id}/strategies/{strategy_id}/{version}_strategy.json"
             
-            # Upload to blob storage
-            blob_client = self.container_client.get_blob_client(blob_name)
-            blob_client.upload_blob(strategy_json, overwrite=True)
+            await self._put(blob_name, payload)
+            await self._replace_latest(strategy_id, user, payload, version)
             
             return strategy_id
             
         except Exception as e:
             raise Exception(f"Failed to save strategy to storage: {str(e)}")
     
+    async def _replace_latest(self, strategy_id: str, user: UserInDB, payload: bytes, version: str) -> None:
+        """Write the latest copy of a strategy, unless a newer version already is the latest."""
+        latest_blob_name = self._latest_blob_name(strategy_id, user)
+        while True:
+            current = await self.backend.get_blob(latest_blob_name)
+            if current is not None and current.metadata.get(VERSION_METADATA_KEY, "") >= version:
+                # A concurrent save of a newer version got there first
+                return
+            try:
+                etag = await self._put(
+                    latest_blob_name, payload, version,
+                    if_match=current.etag if current is not None else BLOB_ABSENT
+                )
+            except PreconditionFailedError:
+                # Replaced since it was read; compare against the new one
+                continue
+            break
+        
+        # Saves finishing out of order must not cache the older version
+        key = (user.id, strategy_id)
+        cached = self.cache.get(key)
+        if cached is None or cached.version < version:
+            self.cache.set(key, CachedStrategy(etag, payload, version))
+    
     async def get_strategy(self, strategy_id: str, user: UserInDB) -> PersonalBrandStrategy:
         """
-        Retrieve a strategy report from Azure Blob Storage.
+        Retrieve a strategy report from storage.
         
         Args:
             strategy_id: The unique ID of the strategy to retrieve
@@ -62,35 +194,183 @@ class StorageService:
         Returns:
             PersonalBrandStrategy: The retrieved strategy report
         """
+        entry = await self._get_latest(strategy_id, user)
+        if entry.strategy is None:
+            strategy_dict = loads(entry.payload)
+            strategy_dict["strategy_id"] = strategy_id
+            entry.strategy = PersonalBrandStrategy.model_validate(strategy_dict)
+        # The cached model is shared by later reads
+        return entry.strategy.model_copy(deep=True)
+    
+    async def get_strategy_payload(self, strategy_id: str, user: UserInDB) -> bytes:
+        """
+        Retrieve the latest version of a strategy report as stored JSON bytes.
+        
+        Args:
+            strategy_id: The unique ID of the strategy to retrieve
+            user: The user who owns the strategy
+            
+        Returns:
+            bytes: The stored strategy document
+        """
+        return (await self._get_latest(strategy_id, user)).payload
+    
+    @instrument(STORAGE_SECONDS, STORAGE_ERRORS, "get_strategy")
+    @traced("storage.get_strategy")
+    async def _get_latest(self, strategy_id: str, user: UserInDB) -> CachedStrategy:
+        """Return the latest version of a strategy from the cache, revalidated against storage."""
         try:
-            # List all blobs in the user's strategy directory
-            prefix = f"users/{user.id}/strategies/{strategy_id}/"
-            blobs = list(self.container_client.list_blobs(name_starts_with=prefix))
+            key = (user.id, strategy_id)
+            entry = self.cache.get(key)
+            if entry is not None and time.monotonic() - entry.checked_at < STRATEGY_CACHE_REVALIDATE_SECONDS:
+                STRATEGY_CACHE.labels("hit").inc()
+                return entry
+            
+            latest_blob_name = self._latest_blob_name(strategy_id, user)
+            blob = await self.backend.get_blob(latest_blob_name, if_none_match=entry.etag if entry else None)
+            if blob is None:
+                # Saved before latest copies were written; find the newest version
+                # and write its latest copy, so the next read is a single GET
+                version, payload = await self._get_newest_version(strategy_id, user)
+                try:
+                    etag = await self._put(latest_blob_name, payload, version, if_match=BLOB_ABSENT)
+                    entry = CachedStrategy(etag, payload, version)
+                except PreconditionFailedError:
+                    # A concurrent save wrote the latest copy; read that instead
+                    blob = await self.backend.get_blob(latest_blob_name)
+                    entry = CachedStrategy(blob.etag, self._decode(blob), blob.metadata.get(VERSION_METADATA_KEY, ""))
+                STRATEGY_CACHE.labels("miss").inc()
+            elif blob.data is None:
+                entry.checked_at = time.monotonic()
+                STRATEGY_CACHE.labels("revalidated").inc()
+            else:
+                entry = CachedStrategy(blob.etag, self._decode(blob), blob.metadata.get(VERSION_METADATA_KEY, ""))
+                STRATEGY_CACHE.labels("miss").inc()
             
-            if not blobs:
-                raise ValueError(f"No strategy found with ID: {strategy_id}")
+            self.cache.set(key, entry)
+            return entry
             
-            # Get the latest version (assuming timestamp in name)
-            latest_blob = max(blobs, key=lambda b: b.name)
+        except Exception as e:
+            raise Exception(f"Failed to retrieve strategy from storage: {str(e)}")
+    
+    async def _get_newest_version(self, strategy_id: str, user: UserInDB) -> Tuple[str, bytes]:
+        # List all blobs in the user's strategy directory
+        prefix = f"users/{user.id}/strategies/{strategy_id}/"
+        blob_names = await self.backend.list(prefix)
+        
+        if not blob_names:
+            raise ValueError(f"No strategy found with ID: {strategy_id}")
+        
+        # Get the latest version (assuming timestamp in name)
+        newest = max(blob_names)
+        blob = await self.backend.get_blob(newest)
+        if blob is None:
+            raise ValueError(f"No strategy found with ID: {strategy_id}")
+        return newest[len(prefix):].removesuffix("_strategy.json"), self._decode(blob)
+    
+    @instrument(STORAGE_SECONDS, STORAGE_ERRORS, "save_agent_states")
+    @traced("storage.save_agent_states")
+    async def save_agent_states(self, strategy_id: str, user: UserInDB, agent_states: Dict[str, Any]) -> None:
+        """
+        Save the per-agent results behind a strategy for incremental regeneration.
+        
+        Args:
+            strategy_id: The ID of the strategy the results belong to
+            user: The user who owns the strategy
+            agent_states: Each agent's result with a fingerprint of its inputs
+        """
+        try:
+            # Kept outside the strategy's directory, which holds only report versions
+            blob_name = f"users/{user.id}/agent_states/{strategy_id}.json"
+            await self._put(blob_name, dumps(agent_states))
             
-            # Download the blob
-            blob_client = self.container_client.get_blob_client(latest_blob.name)
-            strategy_json = blob_client.download_blob().readall()
+        except Exception as e:
+            raise Exception(f"Failed to save agent states to storage: {str(e)}")
+    
+    @instrument(STORAGE_SECONDS, STORAGE_ERRORS, "get_agent_states")
+    @traced("storage.get_agent_states")
+    async def get_agent_states(self, strategy_id: str, user: UserInDB) -> Optional[Dict[str, Any]]:
+        """
+        Retrieve the per-agent results behind a strategy.
+        
+        Args:
+            strategy_id: The ID of the strategy
+            user: The user who owns the strategy
             
-            # Parse JSON and convert to PersonalBrandStrategy using Pydantic v2 syntax
-            strategy_dict = json.loads(strategy_json)
-            return PersonalBrandStrategy.model_validate(strategy_dict)
+        Returns:
+            The saved agent states, or None if none were saved for the strategy
+        """
+        try:
+            blob_name = f"users/{user.id}/agent_states/{strategy_id}.json"
+            blob = await self.backend.get_blob(blob_name)
+            return loads(self._decode(blob)) if blob is not None else None
             
         except Exception as e:
-            raise Exception(f"Failed to retrieve strategy from storage: {str(e)}")
+            raise Exception(f"Failed to retrieve agent states from storage: {str(e)}")
+
+def encode_strategy(report: Dict[str, Any], strategy_id: str) -> bytes:
+    """
+    Encode a workflow report as a strategy document, once, for both the
+    response and storage.
+    
+    The orchestrator validates every section against its agent's output
+    model, so the report is encoded directly instead of being validated into
+    PersonalBrandStrategy and dumped again.
+    """
+    document = {"strategy_id": strategy_id}
+    for field in PersonalBrandStrategy.model_fields:
+        if field != "strategy_id":
+            document[field] = report.get(field)
+    return dumps(document)
+
+_storage_service: Optional[StorageService] = None
 
-# Create singleton instance
-storage_service = StorageService()
+def get_storage_service() -> StorageService:
+    """Return the process-wide storage service on the configured backend, creating it on first use."""
+    global _storage_service
+    if _storage_service is None:
+        _storage_service = StorageService(create_storage_backend())
+    return _storage_service
 
-async def save_strategy_report(strategy: PersonalBrandStrategy, user: UserInDB) -> str:
-    """Helper function to save strategy report."""
-    return await storage_service.save_strategy(strategy, user)
+async def close_storage_service() -> None:
+    """Close the process-wide storage service's backend and its connections."""
+    global _storage_service
+    if _storage_service is not None:
+        await _storage_service.backend.close()
+        _storage_service = None
+
+async def save_strategy_report(
+    strategy: PersonalBrandStrategy,
+    user: UserInDB,
+    strategy_id: Optional[str] = None,
+    agent_states: Optional[Dict[str, Any]] = None
+) -> str:
+    """Helper function to save strategy report, and its agent states if given."""
+    strategy_id = await get_storage_service().save_strategy(strategy, user, strategy_id)
+    if agent_states is not None:
+        await get_storage_service().save_agent_states(strategy_id, user, agent_states)
+    return strategy_id
+
+async def save_strategy_payload(
+    payload: bytes,
+    user: UserInDB,
+    strategy_id: str,
+    agent_states: Optional[Dict[str, Any]] = None
+) -> str:
+    """Helper function to save an encoded strategy report, and its agent states if given."""
+    await get_storage_service().save_strategy_payload(payload, user, strategy_id)
+    if agent_states is not None:
+        await get_storage_service().save_agent_states(strategy_id, user, agent_states)
+    return strategy_id
 
 async def get_strategy_report(strategy_id: str, user: UserInDB) -> PersonalBrandStrategy:
     """Helper function to retrieve strategy report."""
-    return await storage_service.get_strategy(strategy_id, user) 
\ No newline at end of file
+    return await get_storage_service().get_strategy(strategy_id, user)
+
+async def get_strategy_payload(strategy_id: str, user: UserInDB) -> bytes:
+    """Helper function to retrieve a strategy report as stored JSON bytes."""
+    return await get_storage_service().get_strategy_payload(strategy_id, user)
+
+async def get_strategy_agent_states(strategy_id: str, user: UserInDB) -> Optional[Dict[str, Any]]:
+    """Helper function to retrieve the agent states behind a strategy."""
+    return await get_storage_service().get_agent_states(strategy_id, user)
\ No newline at end of file
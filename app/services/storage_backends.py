@@ -0,0 +1,297 @@
+import os
+import json
+import uuid
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# Storage backend: azure (Blob Storage), local (files under STORAGE_LOCAL_DIR) or memory
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "azure")
+STORAGE_LOCAL_DIR = os.getenv("STORAGE_LOCAL_DIR", ".storage")
+# Connection pool shared by every Blob Storage call in the process
+AZURE_STORAGE_MAX_CONNECTIONS = int(os.getenv("AZURE_STORAGE_MAX_CONNECTIONS", "20"))
+
+# `if_match` value for a write that only creates a blob that does not exist yet
+BLOB_ABSENT = ""
+
+class PreconditionFailedError(Exception):
+    """A conditional write found the blob changed since its ETag was read."""
+    pass
+
+class StoredBlob(NamedTuple):
+    """A blob's contents, ETag and metadata; data is None when the ETag still matched."""
+    data: Optional[bytes]
+    etag: str
+    metadata: Dict[str, str] = {}
+
+class StorageBackend(ABC):
+    """Blob persistence interface: named byte strings with hierarchical, '/'-separated names."""
+
+    @abstractmethod
+    async def put(
+        self,
+        name: str,
+        data: bytes,
+        metadata: Optional[Dict[str, str]] = None,
+        if_match: Optional[str] = None
+    ) -> str:
+        """
+        Write a blob with optional string metadata, replacing any existing one; returns its new ETag.
+
+        With `if_match`, the blob is only replaced if its ETag still equals
+        it, or with BLOB_ABSENT only created if it does not exist yet;
+        otherwise PreconditionFailedError is raised.
+        """
+        pass
+
+    @abstractmethod
+    async def get_blob(self, name: str, if_none_match: Optional[str] = None) -> Optional[StoredBlob]:
+        """
+        Return a blob with its ETag, or None if it does not exist.
+
+        If the blob's ETag equals `if_none_match`, its contents are not
+        transferred and the result's data is None.
+        """
+        pass
+
+    async def get(self, name: str) -> Optional[bytes]:
+        """Return a blob's contents, or None if it does not exist."""
+        blob = await self.get_blob(name)
+        return blob.data if blob is not None else None
+
+    @abstractmethod
+    async def list(self, prefix: str) -> List[str]:
+        """Return the names of the blobs starting with `prefix`."""
+        pass
+
+    async def close(self) -> None:
+        """Release any resources held by the backend."""
+        pass
+
+class InMemoryStorageBackend(StorageBackend):
+    """Blobs kept in process memory; lost on restart. For tests and benchmarks."""
+
+    def __init__(self):
+        self._blobs: Dict[str, Tuple[bytes, str, Dict[str, str]]] = {}
+
+    async def put(
+        self,
+        name: str,
+        data: bytes,
+        metadata: Optional[Dict[str, str]] = None,
+        if_match: Optional[str] = None
+    ) -> str:
+        if if_match is not None:
+            entry = self._blobs.get(name)
+            if (entry[1] if entry is not None else BLOB_ABSENT) != if_match:
+                raise PreconditionFailedError(f"Blob {name} changed")
+        etag = uuid.uuid4().hex
+        self._blobs[name] = (bytes(data), etag, dict(metadata or {}))
+        return etag
+
+    async def get_blob(self, name: str, if_none_match: Optional[str] = None) -> Optional[StoredBlob]:
+        entry = self._blobs.get(name)
+        if entry is None:
+            return None
+        data, etag, metadata = entry
+        if etag == if_none_match:
+            return StoredBlob(None, etag)
+        return StoredBlob(data, etag, dict(metadata))
+
+    async def list(self, prefix: str) -> List[str]:
+        return [name for name in self._blobs if name.startswith(prefix)]
+
+class LocalFileStorageBackend(StorageBackend):
+    """
+    Blobs stored as files under a local directory, for development without
+    network access.
+
+    File I/O runs in worker threads so it never blocks the event loop.
+    Writes go to a temporary file that replaces the target, so readers
+    never see a partial blob. Metadata is kept in a hidden JSON file next
+    to the blob. Conditional writes are only atomic within this process.
+    """
+
+    def __init__(self, directory: str = STORAGE_LOCAL_DIR):
+        self.directory = Path(directory)
+        self._write_lock = threading.Lock()
+
+    def _path(self, name: str) -> Path:
+        path = (self.directory / name).resolve()
+        if not path.is_relative_to(self.directory.resolve()):
+            raise ValueError(f"Invalid blob name: {name}")
+        return path
+
+    @staticmethod
+    def _etag(stat: os.stat_result) -> str:
+        return f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
+    @staticmethod
+    def _metadata_path(path: Path) -> Path:
+        return path.with_name(f".{path.name}.metadata.json")
+
+    def _put(self, name: str, data: bytes, metadata: Optional[Dict[str, str]], if_match: Optional[str]) -> str:
+        if if_match is None:
+            return self._write(name, data, metadata)
+        with self._write_lock:
+            try:
+                etag = self._etag(self._path(name).stat())
+            except FileNotFoundError:
+                etag = BLOB_ABSENT
+            if etag != if_match:
+                raise PreconditionFailedError(f"Blob {name} changed")
+            return self._write(name, data, metadata)
+
+    def _write(self, name: str, data: bytes, metadata: Optional[Dict[str, str]]) -> str:
+        path = self._path(name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Written first, so a reader of the new blob finds its metadata
+        metadata_path = self._metadata_path(path)
+        if metadata:
+            tmp_metadata_path = metadata_path.with_name(f"{metadata_path.name}.tmp")
+            tmp_metadata_path.write_text(json.dumps(metadata), encoding="utf-8")
+            os.replace(tmp_metadata_path, metadata_path)
+        elif metadata_path.exists():
+            metadata_path.unlink()
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        tmp_path.write_bytes(data)
+        etag = self._etag(tmp_path.stat())
+        os.replace(tmp_path, path)
+        return etag
+
+    def _get_blob(self, name: str, if_none_match: Optional[str]) -> Optional[StoredBlob]:
+        path = self._path(name)
+        try:
+            etag = self._etag(path.stat())
+            if etag == if_none_match:
+                return StoredBlob(None, etag)
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        try:
+            metadata = json.loads(self._metadata_path(path).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            metadata = {}
+        return StoredBlob(data, etag, metadata)
+
+    def _list(self, prefix: str) -> List[str]:
+        # Only walk the deepest directory the prefix names
+        directory = self.directory / prefix.rsplit("/", 1)[0] if "/" in prefix else self.directory
+        if not directory.is_dir():
+            return []
+        names = []
+        for path in directory.rglob("*"):
+            if path.is_file() and not path.name.startswith("."):
+                name = path.relative_to(self.directory).as_posix()
+                if name.startswith(prefix):
+                    names.append(name)
+        return names
+
+    async def put(
+        self,
+        name: str,
+        data: bytes,
+        metadata: Optional[Dict[str, str]] = None,
+        if_match: Optional[str] = None
+    ) -> str:
+        return await asyncio.to_thread(self._put, name, data, metadata, if_match)
+
+    async def get_blob(self, name: str, if_none_match: Optional[str] = None) -> Optional[StoredBlob]:
+        return await asyncio.to_thread(self._get_blob, name, if_none_match)
+
+    async def list(self, prefix: str) -> List[str]:
+        return await asyncio.to_thread(self._list, prefix)
+
+class AzureBlobStorageBackend(StorageBackend):
+    """
+    Blobs in an Azure Blob Storage container, through the SDK's async client.
+
+    One client, and with it one aiohttp connection pool, is shared by every
+    call. It is created on first use, inside the running event loop.
+    """
+
+    def __init__(self, connection_string: str, container_name: str, max_connections: int = AZURE_STORAGE_MAX_CONNECTIONS):
+        self.connection_string = connection_string
+        self.container_name = container_name
+        self.max_connections = max_connections
+        self._service_client = None
+        self._container_client = None
+
+    def _container(self):
+        if self._container_client is None:
+            # Imported here so the local and memory backends work without aiohttp
+            import aiohttp
+            from azure.core.pipeline.transport import AioHttpTransport
+            from azure.storage.blob.aio import BlobServiceClient
+
+            session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.max_connections))
+            self._service_client = BlobServiceClient.from_connection_string(
+                self.connection_string,
+                transport=AioHttpTransport(session=session, session_owner=True)
+            )
+            self._container_client = self._service_client.get_container_client(self.container_name)
+        return self._container_client
+
+    async def put(
+        self,
+        name: str,
+        data: bytes,
+        metadata: Optional[Dict[str, str]] = None,
+        if_match: Optional[str] = None
+    ) -> str:
+        from azure.core import MatchConditions
+        from azure.core.exceptions import ResourceExistsError, ResourceModifiedError
+
+        if if_match == BLOB_ABSENT:
+            conditions = {"overwrite": False}
+        elif if_match is not None:
+            conditions = {"overwrite": True, "etag": if_match, "match_condition": MatchConditions.IfNotModified}
+        else:
+            conditions = {"overwrite": True}
+        try:
+            result = await self._container().get_blob_client(name).upload_blob(data, metadata=metadata, **conditions)
+        except (ResourceExistsError, ResourceModifiedError) as e:
+            raise PreconditionFailedError(f"Blob {name} changed") from e
+        return result["etag"]
+
+    async def get_blob(self, name: str, if_none_match: Optional[str] = None) -> Optional[StoredBlob]:
+        from azure.core import MatchConditions
+        from azure.core.exceptions import HttpResponseError, ResourceNotFoundError
+
+        conditions = {"etag": if_none_match, "match_condition": MatchConditions.IfModified} if if_none_match else {}
+        try:
+            downloader = await self._container().download_blob(name, **conditions)
+            data = await downloader.readall()
+            return StoredBlob(data, downloader.properties.etag, dict(downloader.properties.metadata or {}))
+        except ResourceNotFoundError:
+            return None
+        except HttpResponseError as e:
+            # The storage SDK reports 304 Not Modified as a plain HttpResponseError
+            if e.status_code == 304:
+                return StoredBlob(None, if_none_match)
+            raise
+
+    async def list(self, prefix: str) -> List[str]:
+        return [blob.name async for blob in self._container().list_blobs(name_starts_with=prefix)]
+
+    async def close(self) -> None:
+        if self._service_client is not None:
+            await self._service_client.close()
+            self._service_client = None
+            self._container_client = None
+
+def create_storage_backend() -> StorageBackend:
+    """Create the storage backend selected by the STORAGE_BACKEND environment variable."""
+    if STORAGE_BACKEND == "azure":
+        connection_string = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
+        container_name = os.getenv("AZURE_STORAGE_CONTAINER_NAME")
+        if not connection_string or not container_name:
+            raise ValueError("Azure Storage configuration is missing")
+        return AzureBlobStorageBackend(connection_string, container_name)
+    if STORAGE_BACKEND == "local":
+        return LocalFileStorageBackend(STORAGE_LOCAL_DIR)
+    if STORAGE_BACKEND == "memory":
+        return InMemoryStorageBackend()
+    raise ValueError(f"Unknown storage backend: {STORAGE_BACKEND}")
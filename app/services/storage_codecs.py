@@ -0,0 +1,186 @@
+import os
+import gzip
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+
+# Codec for newly written blobs: json (compact, uncompressed), gzip or zstd
+STORAGE_CODEC = os.getenv("STORAGE_CODEC", "json")
+STORAGE_GZIP_LEVEL = int(os.getenv("STORAGE_GZIP_LEVEL", "6"))
+STORAGE_ZSTD_LEVEL = int(os.getenv("STORAGE_ZSTD_LEVEL", "3"))
+# Optional zstd dictionary trained on stored strategies (see
+# benchmarks/storage_codec_bench.py --save-dictionary); blobs written with a
+# dictionary can only be read while that dictionary is configured
+STORAGE_ZSTD_DICTIONARY = os.getenv("STORAGE_ZSTD_DICTIONARY", "")
+
+# Blob metadata key recording the codec a blob was written with; zstd blobs
+# written with a dictionary record its ID as "zstd:<dictionary ID>"
+CODEC_METADATA_KEY = "codec"
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+class StorageCodec(ABC):
+    """Encoding of the JSON documents written to storage."""
+
+    name = ""
+
+    @abstractmethod
+    def encode(self, data: bytes) -> bytes:
+        pass
+
+    @abstractmethod
+    def decode(self, data: bytes) -> bytes:
+        pass
+
+class JSONCodec(StorageCodec):
+    """Documents stored as they are."""
+
+    name = "json"
+
+    def encode(self, data: bytes) -> bytes:
+        return data
+
+    def decode(self, data: bytes) -> bytes:
+        return data
+
+class GzipCodec(StorageCodec):
+    """gzip compression, readable with standard tools."""
+
+    name = "gzip"
+
+    def __init__(self, level: int = STORAGE_GZIP_LEVEL):
+        self.level = level
+
+    def encode(self, data: bytes) -> bytes:
+        # mtime=0 keeps the output deterministic for identical documents
+        return gzip.compress(data, compresslevel=self.level, mtime=0)
+
+    def decode(self, data: bytes) -> bytes:
+        return gzip.decompress(data)
+
+class ZstdCodec(StorageCodec):
+    """
+    zstd compression, optionally with a dictionary trained on strategies.
+
+    Strategy documents are a few kilobytes of similar JSON; a shared
+    dictionary lets each one be compressed against the structure and
+    phrasing they all have in common. A codec with a dictionary is named
+    after its ID, so each blob records the dictionary needed to read it.
+    """
+
+    name = "zstd"
+
+    def __init__(self, level: int = STORAGE_ZSTD_LEVEL, dictionary: Optional[bytes] = None):
+        if zstandard is None:
+            raise ValueError("The zstd storage codec requires the zstandard package")
+        self.level = level
+        self.dictionary = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        if self.dictionary is not None:
+            self.name = f"zstd:{self.dictionary.dict_id()}"
+            # Digest the dictionary once instead of for every blob
+            self.dictionary.precompute_compress(level=level)
+        # Compressor objects are not thread-safe, and are cheap to create per blob
+        self._params = {"level": level, "dict_data": self.dictionary} if self.dictionary else {"level": level}
+
+    def encode(self, data: bytes) -> bytes:
+        return zstandard.ZstdCompressor(**self._params).compress(data)
+
+    def decode(self, data: bytes) -> bytes:
+        if self.dictionary is not None:
+            return zstandard.ZstdDecompressor(dict_data=self.dictionary).decompress(data)
+        return zstandard.ZstdDecompressor().decompress(data)
+
+def train_zstd_dictionary(samples: List[bytes], size: int = 16 * 1024) -> bytes:
+    """Train a zstd dictionary of at most `size` bytes on sample documents."""
+    if zstandard is None:
+        raise ValueError("Training a zstd dictionary requires the zstandard package")
+    return zstandard.train_dictionary(size, samples).as_bytes()
+
+def _load_zstd_dictionary() -> Optional[bytes]:
+    if not STORAGE_ZSTD_DICTIONARY:
+        return None
+    with open(STORAGE_ZSTD_DICTIONARY, "rb") as f:
+        return f.read()
+
+_codecs: Dict[str, StorageCodec] = {}
+# zstd codec with the configured dictionary; loaded on first use
+_dictionary_codec: Optional[StorageCodec] = None
+_dictionary_loaded = False
+
+def _get_dictionary_codec() -> Optional[StorageCodec]:
+    """Return the zstd codec with the configured dictionary, or None without one."""
+    global _dictionary_codec, _dictionary_loaded
+    if not _dictionary_loaded:
+        dictionary = _load_zstd_dictionary()
+        _dictionary_codec = ZstdCodec(dictionary=dictionary) if dictionary else None
+        _dictionary_loaded = True
+    return _dictionary_codec
+
+def get_codec(name: str) -> StorageCodec:
+    """
+    Return the codec with the given name, configured from the environment.
+
+    Raises:
+        ValueError: If the codec is unknown, or names a zstd dictionary
+            other than the one configured in STORAGE_ZSTD_DICTIONARY
+    """
+    codec = _codecs.get(name)
+    if codec is None:
+        if name == "json":
+            codec = JSONCodec()
+        elif name == "gzip":
+            codec = GzipCodec()
+        elif name == "zstd":
+            codec = ZstdCodec()
+        elif name.startswith("zstd:"):
+            codec = _get_dictionary_codec()
+            if codec is None or codec.name != name:
+                raise ValueError(
+                    f"Blob was compressed with zstd dictionary {name[len('zstd:'):]}, which is not "
+                    f"the dictionary configured in STORAGE_ZSTD_DICTIONARY"
+                )
+        else:
+            raise ValueError(f"Unknown storage codec: {name}")
+        _codecs[name] = codec
+    return codec
+
+def get_write_codec() -> StorageCodec:
+    """
+    Return the codec new blobs are written with, selected by STORAGE_CODEC;
+    zstd uses the configured dictionary if there is one.
+    """
+    if STORAGE_CODEC == "zstd":
+        return _get_dictionary_codec() or get_codec("zstd")
+    return get_codec(STORAGE_CODEC)
+
+def detect_codec(data: bytes) -> str:
+    """Name the codec of a blob without metadata from its leading bytes."""
+    if data.startswith(_GZIP_MAGIC):
+        return "gzip"
+    if data.startswith(_ZSTD_MAGIC):
+        return "zstd"
+    return "json"
+
+def decode_blob(data: bytes, metadata: Optional[Dict[str, str]] = None) -> bytes:
+    """
+    Decode a stored blob to its JSON document.
+
+    The codec is taken from the blob's metadata; blobs written before codecs
+    were recorded are recognized by their leading bytes, so blobs in any
+    format can be read side by side. zstd blobs recorded without a
+    dictionary ID are checked for one in their frame header.
+
+    Raises:
+        ValueError: If the blob needs a zstd dictionary that is not configured
+    """
+    name = (metadata or {}).get(CODEC_METADATA_KEY) or detect_codec(data)
+    if name == "zstd" and zstandard is not None:
+        dict_id = zstandard.get_frame_parameters(data).dict_id
+        if dict_id:
+            name = f"zstd:{dict_id}"
+    return get_codec(name).decode(data)
@@ -0,0 +1,238 @@
+import os
+import time
+import asyncio
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from ..models.user_models import UserInDB
+
+# User repository configuration
+USER_REPOSITORY = os.getenv("USER_REPOSITORY", "sqlite")
+USER_SQLITE_PATH = os.getenv("USER_SQLITE_PATH", "users.db")
+# Read-through cache of users looked up by ID on every authenticated request
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "300"))
+
+class UserAlreadyExistsError(Exception):
+    """Raised when creating a user whose email is already registered."""
+    pass
+
+def normalize_email(email: str) -> str:
+    """Emails are matched case-insensitively."""
+    return email.strip().lower()
+
+class UserRepository(ABC):
+    """Persistence interface for user accounts."""
+
+    @abstractmethod
+    async def get_by_id(self, user_id: str) -> Optional[UserInDB]:
+        """Return a user by ID, or None if it does not exist."""
+        pass
+
+    @abstractmethod
+    async def get_by_email(self, email: str) -> Optional[UserInDB]:
+        """Return a user by email, or None if it does not exist."""
+        pass
+
+    @abstractmethod
+    async def create(self, user: UserInDB) -> None:
+        """Insert a new user; raises UserAlreadyExistsError if the email is taken."""
+        pass
+
+    @abstractmethod
+    async def update_password_hash(self, user_id: str, hashed_password: str) -> None:
+        """Replace a user's password hash."""
+        pass
+
+    async def close(self) -> None:
+        """Release any resources held by the repository."""
+        pass
+
+class InMemoryUserRepository(UserRepository):
+    """User repository kept in process memory; users are lost on restart."""
+
+    def __init__(self):
+        self._users: Dict[str, UserInDB] = {}
+        self._ids_by_email: Dict[str, str] = {}
+
+    async def get_by_id(self, user_id: str) -> Optional[UserInDB]:
+        user = self._users.get(user_id)
+        return user.model_copy() if user is not None else None
+
+    async def get_by_email(self, email: str) -> Optional[UserInDB]:
+        user_id = self._ids_by_email.get(normalize_email(email))
+        return await self.get_by_id(user_id) if user_id is not None else None
+
+    async def create(self, user: UserInDB) -> None:
+        email = normalize_email(user.email)
+        if email in self._ids_by_email:
+            raise UserAlreadyExistsError(f"User {email} already exists")
+        self._users[user.id] = user.model_copy(update={"email": email})
+        self._ids_by_email[email] = user.id
+
+    async def update_password_hash(self, user_id: str, hashed_password: str) -> None:
+        user = self._users.get(user_id)
+        if user is not None:
+            self._users[user_id] = user.model_copy(
+                update={"hashed_password": hashed_password, "updated_at": datetime.utcnow()}
+            )
+
+class SQLiteUserRepository(UserRepository):
+    """User repository backed by a local SQLite database, indexed by ID and email."""
+
+    _COLUMNS = "id, email, full_name, hashed_password, created_at, updated_at"
+
+    def __init__(self, path: str = USER_SQLITE_PATH):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS users (
+                    id TEXT PRIMARY KEY,
+                    email TEXT NOT NULL,
+                    full_name TEXT NOT NULL,
+                    hashed_password TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_users_email ON users (email)")
+
+    @staticmethod
+    def _to_user(row: Optional[Tuple[str, ...]]) -> Optional[UserInDB]:
+        if row is None:
+            return None
+        user_id, email, full_name, hashed_password, created_at, updated_at = row
+        return UserInDB(
+            id=user_id,
+            email=email,
+            full_name=full_name,
+            hashed_password=hashed_password,
+            created_at=datetime.fromisoformat(created_at),
+            updated_at=datetime.fromisoformat(updated_at)
+        )
+
+    def _get(self, column: str, value: str) -> Optional[UserInDB]:
+        with self._lock:
+            row = self._conn.execute(f"SELECT {self._COLUMNS} FROM users WHERE {column} = ?", (value,)).fetchone()
+        return self._to_user(row)
+
+    def _create(self, user: UserInDB) -> None:
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    f"INSERT INTO users ({self._COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)",
+                    (user.id, normalize_email(user.email), user.full_name, user.hashed_password,
+                     user.created_at.isoformat(), user.updated_at.isoformat())
+                )
+        except sqlite3.IntegrityError:
+            raise UserAlreadyExistsError(f"User {normalize_email(user.email)} already exists")
+
+    def _update_password_hash(self, user_id: str, hashed_password: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE users SET hashed_password = ?, updated_at = ? WHERE id = ?",
+                (hashed_password, datetime.utcnow().isoformat(), user_id)
+            )
+
+    async def get_by_id(self, user_id: str) -> Optional[UserInDB]:
+        return await asyncio.to_thread(self._get, "id", user_id)
+
+    async def get_by_email(self, email: str) -> Optional[UserInDB]:
+        return await asyncio.to_thread(self._get, "email", normalize_email(email))
+
+    async def create(self, user: UserInDB) -> None:
+        await asyncio.to_thread(self._create, user)
+
+    async def update_password_hash(self, user_id: str, hashed_password: str) -> None:
+        await asyncio.to_thread(self._update_password_hash, user_id, hashed_password)
+
+    async def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+class CachedUserRepository(UserRepository):
+    """
+    Read-through LRU cache of users by ID in front of another repository.
+
+    get_current_user looks the user up on every authenticated request;
+    cached entries serve those lookups without a database round trip.
+    Writes through this repository invalidate the entry; changes made by
+    other processes show up once it expires.
+    """
+
+    def __init__(
+        self,
+        repository: UserRepository,
+        max_entries: int = USER_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = USER_CACHE_TTL_SECONDS
+    ):
+        self.repository = repository
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, UserInDB]]" = OrderedDict()
+
+    async def get_by_id(self, user_id: str) -> Optional[UserInDB]:
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            expires_at, user = entry
+            if expires_at >= time.monotonic():
+                self._entries.move_to_end(user_id)
+                return user.model_copy()
+            del self._entries[user_id]
+
+        user = await self.repository.get_by_id(user_id)
+        if user is not None and self.max_entries > 0:
+            self._entries[user_id] = (time.monotonic() + self.ttl_seconds, user)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return user.model_copy()
+        return user
+
+    async def get_by_email(self, email: str) -> Optional[UserInDB]:
+        # Logins read the current password hash
+        return await self.repository.get_by_email(email)
+
+    async def create(self, user: UserInDB) -> None:
+        await self.repository.create(user)
+
+    async def update_password_hash(self, user_id: str, hashed_password: str) -> None:
+        await self.repository.update_password_hash(user_id, hashed_password)
+        self._entries.pop(user_id, None)
+
+    async def close(self) -> None:
+        self._entries.clear()
+        await self.repository.close()
+
+def create_user_repository() -> UserRepository:
+    """Create the user repository selected by the USER_REPOSITORY environment variable, with its cache."""
+    if USER_REPOSITORY == "memory":
+        repository: UserRepository = InMemoryUserRepository()
+    elif USER_REPOSITORY == "sqlite":
+        repository = SQLiteUserRepository(USER_SQLITE_PATH)
+    else:
+        raise ValueError(f"Unknown user repository: {USER_REPOSITORY}")
+    return CachedUserRepository(repository)
+
+_user_repository: Optional[UserRepository] = None
+
+def get_user_repository() -> UserRepository:
+    """Return the process-wide user repository, creating it on first use."""
+    global _user_repository
+    if _user_repository is None:
+        _user_repository = create_user_repository()
+    return _user_repository
+
+async def close_user_repository() -> None:
+    """Close the process-wide user repository."""
+    global _user_repository
+    if _user_repository is not None:
+        await _user_repository.close()
+        _user_repository = None
@@ -0,0 +1,340 @@
+"""
+End-to-end load test of the API against the mock LLM server.
+
+Starts benchmarks/mock_llm_server.py and the app (unless --url points at a
+running one), registers the benchmark user, then drives login, strategy
+generation and strategy retrieval at each concurrency level. Reports
+requests per second, latency percentiles per endpoint and peak app
+memory, and writes the results as JSON so runs can be compared across
+commits.
+
+The app it starts keeps users and strategies in memory
+(--storage-backend memory), so no Azure account is needed; pass
+--storage-backend azure to include Blob Storage, with its settings taken
+from the environment.
+
+Usage:
+    python benchmarks/load_test.py --concurrency 1,4,16 --requests 50
+    python benchmarks/load_test.py --compare benchmarks/results/old.json
+"""
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import subprocess
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+USER_INPUT = {
+    "basic_identity": "AI Developer and Technical Writer",
+    "branding_goal": "Build thought leadership in applied machine learning",
+    "style_tone": "professional",
+    "content_format_preference": ["long_form", "tutorial"],
+    "preferred_platforms": ["LinkedIn", "Medium"],
+    "target_language": "english",
+    "experience_level": "intermediate",
+    "industry_focus": "AI/Machine Learning",
+    "personal_story_highlights": "Transitioned from backend engineering into AI",
+    "custom_keywords": ["MLOps", "LLMs"]
+}
+
+def percentile(samples: List[float], quantile: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(quantile * len(ordered)))]
+
+def summarize(samples: List[float], errors: int) -> Dict[str, Any]:
+    def ms(value: Optional[float]) -> Optional[float]:
+        return round(value * 1000, 2) if value is not None else None
+    return {
+        "count": len(samples),
+        "errors": errors,
+        "mean_ms": ms(sum(samples) / len(samples)) if samples else None,
+        "p50_ms": ms(percentile(samples, 0.50)),
+        "p95_ms": ms(percentile(samples, 0.95)),
+        "p99_ms": ms(percentile(samples, 0.99))
+    }
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def rss_mb(pid: int) -> Optional[float]:
+    """Resident memory of a process in MB, read from /proc (Linux only)."""
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def unwrap(body: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the route's APIResponse, decoding it if the response wrapper nested it as a string."""
+    data = body.get("data")
+    if isinstance(data, str) and body.get("success"):
+        nested = json.loads(data)
+        if isinstance(nested, dict) and "success" in nested:
+            return nested
+    return body
+
+async def wait_until_up(url: str, timeout: float = 30.0) -> None:
+    async with httpx.AsyncClient() as client:
+        expires = time.monotonic() + timeout
+        while time.monotonic() < expires:
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+async def register_user(base_url: str, args: argparse.Namespace) -> None:
+    """Create the benchmark user; an already registered one is reused."""
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout) as client:
+        response = await client.post("/api/v1/register", json={
+            "email": args.email, "password": args.password, "full_name": "Benchmark User"
+        })
+        body = unwrap(response.json())
+        if not body.get("success") and body.get("error") != "Email already registered":
+            raise RuntimeError(f"Could not register {args.email}: {body.get('error')}")
+
+class Recorder:
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+
+    def record(self, endpoint: str, seconds: float, ok: bool) -> None:
+        self.samples.setdefault(endpoint, [])
+        self.errors.setdefault(endpoint, 0)
+        if ok:
+            self.samples[endpoint].append(seconds)
+        else:
+            self.errors[endpoint] += 1
+
+    def summary(self) -> Dict[str, Any]:
+        return {endpoint: summarize(samples, self.errors[endpoint]) for endpoint, samples in self.samples.items()}
+
+async def timed(recorder: Recorder, endpoint: str, request) -> Optional[Any]:
+    start = time.perf_counter()
+    try:
+        response = await request
+        body = unwrap(response.json())
+        ok = response.status_code == 200 and body.get("success", False)
+    except (httpx.HTTPError, ValueError):
+        ok, body = False, None
+    recorder.record(endpoint, time.perf_counter() - start, ok)
+    return body["data"] if ok else None
+
+async def run_iteration(client: httpx.AsyncClient, recorder: Recorder, number: int, args: argparse.Namespace) -> bool:
+    """Log in, generate a strategy and read it back."""
+    token = await timed(recorder, "token", client.post(
+        "/api/v1/token", json={"email": args.email, "password": args.password}
+    ))
+    if token is None:
+        return False
+    headers = {"Authorization": f"Bearer {token['access_token']}"}
+
+    # A unique input per iteration, so neither caching nor coalescing skews the numbers
+    user_input = dict(USER_INPUT, personal_story_highlights=f"{USER_INPUT['personal_story_highlights']} (run {number})")
+    params = {"mode": args.mode} if args.mode else None
+    strategy = await timed(recorder, "generate", client.post(
+        "/api/v1/generate-strategy", json=user_input, headers=headers, params=params
+    ))
+    if strategy is None:
+        return False
+
+    # The report is saved in the background after the response; give it a moment
+    for _ in range(args.get_retries + 1):
+        fetched = await timed(recorder, "get", client.get(f"/api/v1/strategy/{strategy['strategy_id']}", headers=headers))
+        if fetched is not None:
+            return True
+        await asyncio.sleep(0.1)
+    return False
+
+async def run_level(base_url: str, concurrency: int, args: argparse.Namespace, app_pid: Optional[int]) -> Dict[str, Any]:
+    recorder = Recorder()
+    counter = iter(range(args.requests))
+    completed = 0
+    peak_rss = rss_mb(app_pid) if app_pid else None
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        nonlocal completed
+        for number in counter:
+            if await run_iteration(client, recorder, concurrency * 100000 + number, args):
+                completed += 1
+
+    async def sample_memory() -> None:
+        nonlocal peak_rss
+        while True:
+            current = rss_mb(app_pid)
+            if current is not None:
+                peak_rss = max(peak_rss or 0.0, current)
+            await asyncio.sleep(0.1)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        sampler = asyncio.create_task(sample_memory()) if app_pid else None
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        if sampler:
+            sampler.cancel()
+
+    requests = sum(len(samples) + recorder.errors[endpoint] for endpoint, samples in recorder.samples.items())
+    return {
+        "concurrency": concurrency,
+        "iterations": args.requests,
+        "completed": completed,
+        "elapsed_s": round(elapsed, 3),
+        "iterations_per_s": round(completed / elapsed, 3),
+        "requests_per_s": round(requests / elapsed, 3),
+        "endpoints": recorder.summary(),
+        "peak_rss_mb": round(peak_rss, 1) if peak_rss is not None else None
+    }
+
+def start_servers(args: argparse.Namespace) -> Dict[str, Any]:
+    """Start the mock LLM server and the app; return their processes and the app URL."""
+    mock_port, app_port = free_port(), free_port()
+    mock = subprocess.Popen([
+        sys.executable, os.path.join(ROOT, "benchmarks", "mock_llm_server.py"),
+        "--port", str(mock_port),
+        "--latency-ms", str(args.latency_ms),
+        "--latency-dist", args.latency_dist,
+        "--error-rate", str(args.error_rate),
+        "--seed", str(args.seed)
+    ])
+    env = dict(
+        os.environ,
+        OPENAI_BASE_URL=f"http://127.0.0.1:{mock_port}/v1",
+        OPENAI_API_KEY="mock",
+        LLM_CACHE_ENABLED="false",
+        USER_REPOSITORY="memory",
+        STORAGE_BACKEND=args.storage_backend
+    )
+    app = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(app_port), "--log-level", "warning"],
+        cwd=ROOT, env=env
+    )
+    return {
+        "processes": [app, mock],
+        "mock_url": f"http://127.0.0.1:{mock_port}/v1/chat/completions",
+        "app_url": f"http://127.0.0.1:{app_port}",
+        "app_pid": app.pid
+    }
+
+def compare(previous_path: str, current: Dict[str, Any]) -> None:
+    """Print latency and throughput changes against an earlier result file."""
+    with open(previous_path) as f:
+        previous = json.load(f)
+    print(f"\nCompared with {previous['commit']} ({previous['timestamp']}):")
+    earlier = {level["concurrency"]: level for level in previous["levels"]}
+    for level in current["levels"]:
+        before = earlier.get(level["concurrency"])
+        if before is None:
+            continue
+        print(f"  concurrency {level['concurrency']}: "
+              f"{before['requests_per_s']} -> {level['requests_per_s']} req/s")
+        for endpoint, stats in level["endpoints"].items():
+            old = before["endpoints"].get(endpoint)
+            if old and old["p95_ms"] and stats["p95_ms"]:
+                change = (stats["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100
+                print(f"    {endpoint:<8} p95 {old['p95_ms']} -> {stats['p95_ms']} ms ({change:+.1f}%)")
+
+def print_level(level: Dict[str, Any]) -> None:
+    print(f"concurrency {level['concurrency']}: {level['requests_per_s']} req/s, "
+          f"{level['completed']}/{level['iterations']} iterations, peak RSS {level['peak_rss_mb']} MB")
+    for endpoint, stats in level["endpoints"].items():
+        print(f"  {endpoint:<8} n={stats['count']:<5} errors={stats['errors']:<4} "
+              f"p50={stats['p50_ms']}ms p95={stats['p95_ms']}ms p99={stats['p99_ms']}ms")
+
+async def main(args: argparse.Namespace) -> Dict[str, Any]:
+    servers = None
+    base_url, app_pid = args.url, args.pid
+    if base_url is None:
+        servers = start_servers(args)
+        base_url, app_pid = servers["app_url"], servers["app_pid"]
+    try:
+        await wait_until_up(f"{base_url}/")
+        await register_user(base_url, args)
+        levels = []
+        for concurrency in args.concurrency:
+            level = await run_level(base_url, concurrency, args, app_pid)
+            print_level(level)
+            levels.append(level)
+    finally:
+        if servers:
+            for process in servers["processes"]:
+                process.terminate()
+                process.wait()
+
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "config": {
+            "url": args.url,
+            "requests": args.requests,
+            "mode": args.mode,
+            "storage_backend": args.storage_backend if args.url is None else None,
+            "latency_ms": args.latency_ms,
+            "latency_dist": args.latency_dist,
+            "error_rate": args.error_rate,
+            "seed": args.seed
+        },
+        "levels": levels
+    }
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="End-to-end API load test against the mock LLM server")
+    parser.add_argument("--url", help="Benchmark an already running app instead of starting one")
+    parser.add_argument("--pid", type=int, help="Process id of the app given by --url, for memory sampling")
+    parser.add_argument("--concurrency", default="1,4,16",
+                        type=lambda value: [int(level) for level in value.split(",")])
+    parser.add_argument("--requests", type=int, default=50, help="Iterations per concurrency level")
+    parser.add_argument("--mode", choices=["multi", "combined"], help="Agent execution mode")
+    parser.add_argument("--storage-backend", choices=["memory", "local", "azure"], default="memory",
+                        help="Storage backend of the app the test starts")
+    parser.add_argument("--email", default="bench@example.com", help="Benchmark user, registered if needed")
+    parser.add_argument("--password", default="test-password")
+    parser.add_argument("--timeout", type=float, default=180.0)
+    parser.add_argument("--get-retries", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--latency-dist", choices=["fixed", "uniform", "lognormal"], default="lognormal")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/<commit>-<time>.json)")
+    parser.add_argument("--compare", help="Earlier result file to compare against")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = asyncio.run(main(args))
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{results['commit']}-{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        compare(args.compare, results)
@@ -0,0 +1,193 @@
+"""
+Event-loop latency under concurrent logins.
+
+Runs logins concurrently on one event loop while a probe coroutine wakes
+every --probe-ms and records how late it was woken: the stall every other
+in-flight request would see. Two login paths are compared:
+
+    inline  the former /token handler: bcrypt hash plus verify called
+            synchronously in the coroutine
+    pool    the current handler: PasswordHasher.verify_and_update in the
+            bounded hashing pool
+
+Reports login latency, logins per second and probe lag per concurrency
+level, and writes the results as JSON so runs can be compared across
+commits.
+
+Usage:
+    python benchmarks/login_bench.py --concurrency 1,4,16 --logins 32
+    python benchmarks/login_bench.py --compare benchmarks/results/login-old.json
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import warnings
+import subprocess
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+from passlib.context import CryptContext
+from app.services.auth import BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS, PasswordHasher
+
+# passlib warns while reading the bcrypt 4 version; unrelated to the measurements
+warnings.filterwarnings("ignore")
+
+PASSWORD = "test-password"
+
+def percentile(samples: List[float], quantile: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(quantile * len(ordered)))]
+
+def ms(value: Optional[float]) -> Optional[float]:
+    return round(value * 1000, 2) if value is not None else None
+
+async def probe(interval: float, lags: List[float], stop: asyncio.Event) -> None:
+    """Sleep for `interval` repeatedly, recording how much later than asked each wake-up came."""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, time.perf_counter() - started - interval))
+
+async def run_level(
+    login: Callable[[], Awaitable[bool]],
+    concurrency: int,
+    logins: int,
+    probe_interval: float
+) -> Dict[str, Any]:
+    latencies: List[float] = []
+    lags: List[float] = []
+    remaining = iter(range(logins))
+    stop = asyncio.Event()
+
+    async def worker() -> None:
+        for _ in remaining:
+            started = time.perf_counter()
+            if not await login():
+                raise RuntimeError("Login rejected a valid password")
+            latencies.append(time.perf_counter() - started)
+
+    probe_task = asyncio.create_task(probe(probe_interval, lags, stop))
+    # Let the probe start before the logins do
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe_task
+
+    return {
+        "concurrency": concurrency,
+        "logins_per_second": round(len(latencies) / elapsed, 2),
+        "login_p50_ms": ms(percentile(latencies, 0.50)),
+        "login_p95_ms": ms(percentile(latencies, 0.95)),
+        "loop_lag_p50_ms": ms(percentile(lags, 0.50)),
+        "loop_lag_p99_ms": ms(percentile(lags, 0.99)),
+        "loop_lag_max_ms": ms(max(lags) if lags else None)
+    }
+
+async def main(args: argparse.Namespace) -> Dict[str, Any]:
+    context = CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__rounds=args.rounds,
+        bcrypt__min_rounds=args.rounds,
+        bcrypt__max_rounds=args.rounds
+    )
+    hasher = PasswordHasher(context, workers=args.workers)
+    stored_hash = await hasher.hash(PASSWORD)
+
+    async def inline_login() -> bool:
+        hashed = context.hash(PASSWORD)
+        return context.verify(PASSWORD, hashed)
+
+    async def pool_login() -> bool:
+        valid, _ = await hasher.verify_and_update(PASSWORD, stored_hash)
+        return valid
+
+    paths = {"inline": inline_login, "pool": pool_login}
+    levels = [int(level) for level in args.concurrency.split(",")]
+    results: Dict[str, List[Dict[str, Any]]] = {}
+    try:
+        for name, login in paths.items():
+            results[name] = []
+            for concurrency in levels:
+                level = await run_level(login, concurrency, args.logins, args.probe_ms / 1000)
+                results[name].append(level)
+                print(f"{name:<7} c={concurrency:<3} {level['logins_per_second']:>7} logins/s  "
+                      f"login p50 {level['login_p50_ms']} ms p95 {level['login_p95_ms']} ms  "
+                      f"loop lag p50 {level['loop_lag_p50_ms']} ms p99 {level['loop_lag_p99_ms']} ms "
+                      f"max {level['loop_lag_max_ms']} ms")
+    finally:
+        hasher.shutdown()
+    return results
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def compare(previous_path: str, current: Dict[str, Any]) -> None:
+    """Print per-level loop lag and throughput changes against an earlier result file."""
+    with open(previous_path) as f:
+        previous = json.load(f)
+    print(f"\nCompared with {previous['commit']} ({previous['timestamp']}):")
+    for name, levels in current["paths"].items():
+        old_levels = {level["concurrency"]: level for level in previous["paths"].get(name, [])}
+        for level in levels:
+            old = old_levels.get(level["concurrency"])
+            if not old:
+                continue
+            print(f"  {name:<7} c={level['concurrency']:<3} logins/s {old['logins_per_second']} -> "
+                  f"{level['logins_per_second']}  loop lag p99 {old['loop_lag_p99_ms']} -> "
+                  f"{level['loop_lag_p99_ms']} ms")
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Event-loop latency under concurrent logins")
+    parser.add_argument("--concurrency", default="1,4,16", help="Comma-separated concurrent login counts")
+    parser.add_argument("--logins", type=int, default=32, help="Logins per concurrency level")
+    parser.add_argument("--rounds", type=int, default=BCRYPT_ROUNDS, help="bcrypt cost factor")
+    parser.add_argument("--workers", type=int, default=PASSWORD_HASH_WORKERS, help="Hashing pool threads")
+    parser.add_argument("--probe-ms", type=float, default=5.0, help="Probe wake-up interval")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/login-<commit>-<time>.json)")
+    parser.add_argument("--compare", help="Earlier result file to compare against")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    paths = asyncio.run(main(args))
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "config": {
+            "logins": args.logins,
+            "rounds": args.rounds,
+            "workers": args.workers,
+            "probe_ms": args.probe_ms,
+            "cpus": os.cpu_count(),
+            "python": sys.version.split()[0]
+        },
+        "paths": paths
+    }
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"login-{results['commit']}-{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        compare(args.compare, results)
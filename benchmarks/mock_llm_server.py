@@ -0,0 +1,202 @@
+"""
+Deterministic OpenAI-compatible stand-in for benchmarking without real completions.
+
+Serves POST /v1/chat/completions (plain and streaming) with canned agent
+responses, configurable latency distribution and error rate. Identical
+prompts always get identical responses.
+
+Point the app at it with OPENAI_BASE_URL=http://127.0.0.1:8100/v1.
+
+Usage:
+    python benchmarks/mock_llm_server.py --port 8100 --latency-ms 800 --latency-dist lognormal
+"""
+import re
+import json
+import time
+import random
+import asyncio
+import hashlib
+import argparse
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+@dataclass
+class MockConfig:
+    latency_ms: float = 500.0
+    # fixed, uniform (latency_ms +/- jitter_ms) or lognormal (median latency_ms)
+    latency_dist: str = "fixed"
+    jitter_ms: float = 200.0
+    sigma: float = 0.5
+    error_rate: float = 0.0
+    error_status: int = 429
+    chunk_chars: int = 16
+    seed: int = 0
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:8]
+
+def _launch_schedule(tag: str, first: int, last: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "week_number": week,
+            "content": [
+                {"content_type": "Article", "topic": f"Week {week} deep dive {tag}", "platform": "LinkedIn"},
+                {"content_type": "Thread", "topic": f"Week {week} highlights {tag}", "platform": "Twitter"}
+            ]
+        }
+        for week in range(first, last + 1)
+    ]
+
+def agent_response(messages: List[Dict[str, str]]) -> Dict[str, Any]:
+    """Build the canned JSON answer for an agent's prompt."""
+    system = messages[0]["content"] if messages else ""
+    prompt = messages[-1]["content"] if messages else ""
+    tag = _digest(system + prompt)
+
+    sections = {
+        "brand_identity": {
+            "brand_title": f"AI Developer and Tech Educator {tag}",
+            "brand_slogan": "Building AI, Inspiring Minds",
+            "core_values": ["Innovation", "Authenticity", "Growth"]
+        },
+        "unique_strengths": {
+            "unique_strengths": ["Rapid Prototyping", "Open Source Contributor", "Technical Writing"],
+            "personal_story": f"Moved from engineering into AI through self-study ({tag})."
+        },
+        "target_audience": {
+            "target_audience_profile": f"Junior AI developers and tech leads ({tag})",
+            "audience_interests": ["AI fundamentals", "Career growth", "MLOps"]
+        },
+        "content_strategy": {
+            "recommended_platforms": ["LinkedIn", "Medium", "YouTube"],
+            "content_themes": ["Project Showcases", "Tutorials", "Industry Trends"],
+            "content_formats": ["Blog Posts", "Videos", "Threads"]
+        }
+    }
+
+    if "team of personal branding experts" in system:
+        # Combined mode: every section in one object
+        return {field: value for section in sections.values() for field, value in section.items()}
+    if "calendar strategist" in system:
+        weeks = re.search(r"Only plan weeks (\d+) to (\d+)", prompt)
+        first, last = (int(weeks.group(1)), int(weeks.group(2))) if weeks else (1, 12)
+        return {"launch_schedule": _launch_schedule(tag, first, last)}
+    if "career coach" in system:
+        return sections["unique_strengths"]
+    if "audience research" in system:
+        return sections["target_audience"]
+    if "content strategist" in system:
+        return sections["content_strategy"]
+    if "personal branding expert" in system:
+        return sections["brand_identity"]
+    return {"text": f"Mock completion {tag}"}
+
+def create_app(config: MockConfig) -> FastAPI:
+    """Create the mock server application."""
+    app = FastAPI(title="Mock LLM server")
+    rng = random.Random(config.seed)
+
+    def sample_latency() -> float:
+        if config.latency_dist == "uniform":
+            latency = rng.uniform(config.latency_ms - config.jitter_ms, config.latency_ms + config.jitter_ms)
+        elif config.latency_dist == "lognormal":
+            latency = rng.lognormvariate(0, config.sigma) * config.latency_ms
+        else:
+            latency = config.latency_ms
+        return max(0.0, latency) / 1000
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        messages = body.get("messages", [])
+        model = body.get("model", "mock")
+        latency = sample_latency()
+
+        if rng.random() < config.error_rate:
+            await asyncio.sleep(latency / 10)
+            return JSONResponse(
+                status_code=config.error_status,
+                content={"error": {"message": "Mock error", "type": "mock_error", "code": config.error_status}},
+                headers={"retry-after": "1"} if config.error_status == 429 else None
+            )
+
+        content = json.dumps(agent_response(messages))
+        completion_id = f"chatcmpl-{_digest(content)}"
+        created = int(time.time())
+        prompt_tokens = sum(len(message.get("content", "")) for message in messages) // 4
+        completion_tokens = len(content) // 4
+
+        if body.get("stream"):
+            chunks = [content[i:i + config.chunk_chars] for i in range(0, len(content), config.chunk_chars)]
+
+            async def stream() -> AsyncIterator[str]:
+                for chunk in chunks:
+                    await asyncio.sleep(latency / len(chunks))
+                    yield "data: " + json.dumps({
+                        "id": completion_id,
+                        "object": "chat.completion.chunk",
+                        "created": created,
+                        "model": model,
+                        "choices": [{"index": 0, "delta": {"content": chunk}, "finish_reason": None}]
+                    }) + "\n\n"
+                yield "data: " + json.dumps({
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]
+                }) + "\n\n"
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(stream(), media_type="text/event-stream")
+
+        await asyncio.sleep(latency)
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        }
+
+    return app
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Deterministic mock OpenAI chat completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency-ms", type=float, default=MockConfig.latency_ms)
+    parser.add_argument("--latency-dist", choices=["fixed", "uniform", "lognormal"], default=MockConfig.latency_dist)
+    parser.add_argument("--jitter-ms", type=float, default=MockConfig.jitter_ms)
+    parser.add_argument("--sigma", type=float, default=MockConfig.sigma)
+    parser.add_argument("--error-rate", type=float, default=MockConfig.error_rate)
+    parser.add_argument("--error-status", type=int, default=MockConfig.error_status)
+    parser.add_argument("--chunk-chars", type=int, default=MockConfig.chunk_chars)
+    parser.add_argument("--seed", type=int, default=MockConfig.seed)
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    import uvicorn
+    args = parse_args()
+    config = MockConfig(
+        latency_ms=args.latency_ms,
+        latency_dist=args.latency_dist,
+        jitter_ms=args.jitter_ms,
+        sigma=args.sigma,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        chunk_chars=args.chunk_chars,
+        seed=args.seed
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
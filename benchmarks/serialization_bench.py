@@ -0,0 +1,267 @@
+"""
+Microbenchmarks of the model validation and serialization steps a strategy goes through.
+
+Each operation mirrors one pass in the request path: validating the input,
+building PersonalBrandStrategy in the route, FastAPI's response_model
+serialization, the ResponseWrapperMiddleware pass, the exception
+handlers and StorageService.save_strategy's model_dump plus json.dumps.
+encoded_response is the serialize-once path the strategy routes now take:
+the report is encoded a single time and the bytes are wrapped in the
+envelope and stored as they are.
+Payloads are realistic: full 12-week launch plans with several content
+pieces per week and long input lists.
+
+Reports time per operation and the memory it allocates (tracemalloc peak),
+and writes the results as JSON so runs can be compared across commits.
+
+Usage:
+    python benchmarks/serialization_bench.py --weeks 12 --pieces 5
+    python benchmarks/serialization_bench.py --compare benchmarks/results/serialization-old.json
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import warnings
+import tracemalloc
+import subprocess
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from app.core.middleware import ResponseWrapperMiddleware
+from app.core.json_codec import success_envelope
+from app.models.input_models import PersonalBrandInput
+from app.models.output_models import PersonalBrandStrategy
+from app.models.response_models import APIResponse
+from app.services.storage import encode_strategy
+
+PLATFORMS = ["LinkedIn", "Twitter", "YouTube", "Medium", "Personal Blog", "TikTok"]
+CONTENT_TYPES = ["Article", "Thread", "Video", "Tutorial", "Case Study", "Newsletter"]
+
+def make_strategy(weeks: int, pieces: int, list_size: int) -> Dict[str, Any]:
+    """Build a workflow result shaped like the orchestrator's final report."""
+    return {
+        "brand_identity": {
+            "brand_title": "AI Developer and Tech Educator",
+            "brand_slogan": "Building AI, Inspiring Minds",
+            "core_values": [f"Core value {i}" for i in range(list_size)]
+        },
+        "unique_strengths": {
+            "unique_strengths": [f"Strength {i}: rapid prototyping of ML systems" for i in range(list_size)],
+            "personal_story": "Transitioned from mechanical engineering to AI through self-learning. " * 10
+        },
+        "target_audience": {
+            "target_audience_profile": "Junior AI developers and tech professionals moving into ML. " * 5,
+            "audience_interests": [f"Interest {i}: learning AI fundamentals" for i in range(list_size)]
+        },
+        "content_strategy": {
+            "recommended_platforms": PLATFORMS,
+            "content_themes": [f"Theme {i}: project showcases and tutorials" for i in range(list_size)],
+            "content_formats": CONTENT_TYPES
+        },
+        "launch_plan": {
+            "launch_schedule": [
+                {
+                    "week_number": week,
+                    "content": [
+                        {
+                            "content_type": CONTENT_TYPES[piece % len(CONTENT_TYPES)],
+                            "topic": f"Week {week}: deep dive {piece} into building production ML pipelines",
+                            "platform": PLATFORMS[piece % len(PLATFORMS)]
+                        }
+                        for piece in range(pieces)
+                    ]
+                }
+                for week in range(1, weeks + 1)
+            ]
+        },
+        "missing_sections": []
+    }
+
+def make_input(list_size: int) -> Dict[str, Any]:
+    return {
+        "basic_identity": "AI Developer and Technical Writer",
+        "branding_goal": "Build thought leadership in AI and attract speaking opportunities",
+        "style_tone": "professional",
+        "content_format_preference": ["long_form", "tutorial", "video", "case_study", "short_posts"],
+        "preferred_platforms": PLATFORMS,
+        "target_language": "english",
+        "experience_level": "intermediate",
+        "industry_focus": "AI/Machine Learning",
+        "personal_story_highlights": "Transitioned from traditional software development to AI research. " * 5,
+        "custom_keywords": [f"keyword-{i}" for i in range(list_size)]
+    }
+
+def measure(operation: Callable[[], Any], iterations: int) -> Dict[str, float]:
+    """Time `operation` and measure the memory one call allocates at its peak."""
+    for _ in range(min(iterations, 10)):
+        operation()
+
+    timings: List[float] = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        operation()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        result = operation()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+
+    return {
+        "mean_us": round(sum(timings) / len(timings) * 1e6, 2),
+        "p50_us": round(timings[len(timings) // 2] * 1e6, 2),
+        "p95_us": round(timings[min(len(timings) - 1, int(0.95 * len(timings)))] * 1e6, 2),
+        "peak_alloc_kib": round((peak - baseline) / 1024, 2),
+        "retained_kib": round((current - baseline) / 1024, 2)
+    }
+
+# The route still calls the deprecated .dict(); measure it without the warning noise
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+
+def build_operations(strategy: Dict[str, Any], user_input: Dict[str, Any]) -> Dict[str, Callable[[], Any]]:
+    """Return the request-path passes, each as a no-argument callable."""
+    loop = asyncio.new_event_loop()
+    response_field = create_response_field(name="Response", type_=APIResponse[PersonalBrandStrategy])
+    model = PersonalBrandStrategy(**strategy, strategy_id="bench-strategy")
+    api_response = APIResponse(success=True, data=model)
+    route_body = JSONResponse(
+        loop.run_until_complete(serialize_response(field=response_field, response_content=api_response))
+    ).body
+
+    def route_serialization():
+        # FastAPI validates against response_model, dumps to JSON-able data and renders
+        content = loop.run_until_complete(serialize_response(field=response_field, response_content=api_response))
+        return JSONResponse(content).body
+
+    def run_middleware(body: bytes) -> bytes:
+        async def app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200, "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1"))
+            ]})
+            await send({"type": "http.response.body", "body": body})
+
+        sent: List[bytes] = []
+        async def send(message):
+            sent.append(message.get("body", b""))
+
+        scope = {"type": "http", "method": "GET", "path": "/"}
+        loop.run_until_complete(ResponseWrapperMiddleware(app)(scope, None, send))
+        return b"".join(sent)
+
+    def middleware_wrap():
+        # An APIResponse body passes the wrapper untouched
+        return run_middleware(route_body)
+
+    def storage_dump():
+        strategy_dict = model.model_dump()
+        strategy_dict["strategy_id"] = "bench-strategy"
+        return json.dumps(strategy_dict, indent=2)
+
+    def full_response():
+        built = PersonalBrandStrategy(**strategy, strategy_id="bench-strategy")
+        content = loop.run_until_complete(
+            serialize_response(field=response_field, response_content=APIResponse(success=True, data=built))
+        )
+        return run_middleware(JSONResponse(content).body)
+
+    def encoded_response():
+        return run_middleware(success_envelope(encode_strategy(strategy, "bench-strategy")))
+
+    return {
+        "input_validate": lambda: PersonalBrandInput(**user_input),
+        "input_dict": (lambda parsed: lambda: parsed.dict())(PersonalBrandInput(**user_input)),
+        "strategy_construct": lambda: PersonalBrandStrategy(**strategy, strategy_id="bench-strategy"),
+        "api_response_wrap": lambda: APIResponse(success=True, data=model),
+        "route_serialization": route_serialization,
+        "middleware_wrap": middleware_wrap,
+        "error_handler": lambda: JSONResponse(
+            content=APIResponse(success=False, error="Failed to generate personal brand strategy").model_dump()
+        ).body,
+        "storage_dump": storage_dump,
+        "storage_load": (lambda blob: lambda: PersonalBrandStrategy(**json.loads(blob)))(storage_dump()),
+        "full_response": full_response,
+        "encoded_response": encoded_response
+    }
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def compare(previous_path: str, current: Dict[str, Any]) -> None:
+    """Print per-operation changes against an earlier result file."""
+    with open(previous_path) as f:
+        previous = json.load(f)
+    print(f"\nCompared with {previous['commit']} ({previous['timestamp']}):")
+    for name, stats in current["operations"].items():
+        old = previous["operations"].get(name)
+        if not old:
+            continue
+        change = (stats["mean_us"] - old["mean_us"]) / old["mean_us"] * 100
+        print(f"  {name:<20} {old['mean_us']:>10} -> {stats['mean_us']:>10} us ({change:+.1f}%)  "
+              f"alloc {old['peak_alloc_kib']} -> {stats['peak_alloc_kib']} KiB")
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Model validation and serialization microbenchmarks")
+    parser.add_argument("--weeks", type=int, default=12, help="Weeks in the launch plan")
+    parser.add_argument("--pieces", type=int, default=5, help="Content pieces per week")
+    parser.add_argument("--list-size", type=int, default=20, help="Items in the list fields")
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/serialization-<commit>-<time>.json)")
+    parser.add_argument("--compare", help="Earlier result file to compare against")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    strategy = make_strategy(args.weeks, args.pieces, args.list_size)
+    operations = build_operations(strategy, make_input(args.list_size))
+
+    print(f"{'operation':<20} {'mean us':>10} {'p50 us':>10} {'p95 us':>10} {'alloc KiB':>10}")
+    measured = {}
+    for name, operation in operations.items():
+        stats = measure(operation, args.iterations)
+        measured[name] = stats
+        print(f"{name:<20} {stats['mean_us']:>10} {stats['p50_us']:>10} {stats['p95_us']:>10} {stats['peak_alloc_kib']:>10}")
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "config": {
+            "weeks": args.weeks,
+            "pieces": args.pieces,
+            "list_size": args.list_size,
+            "iterations": args.iterations,
+            "python": sys.version.split()[0]
+        },
+        "operations": measured
+    }
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"serialization-{results['commit']}-{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        compare(args.compare, results)
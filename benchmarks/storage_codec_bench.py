@@ -0,0 +1,224 @@
+"""
+Size and throughput of the storage codecs on a generated strategy corpus.
+
+Generates strategy documents of varying shape and wording, encoded the way
+the routes store them (storage.encode_strategy), and measures each codec:
+stored size relative to the JSON document, and encode and decode
+throughput. The zstd dictionary is trained on a separate part of the
+corpus from the one it is measured on, as it would be in production
+(--save-dictionary writes it for STORAGE_ZSTD_DICTIONARY). zstd codecs are
+skipped when the zstandard package is not installed.
+
+Writes the results as JSON so runs can be compared across commits.
+
+Usage:
+    python benchmarks/storage_codec_bench.py --documents 500
+    python benchmarks/storage_codec_bench.py --save-dictionary strategies.zstd-dict
+    python benchmarks/storage_codec_bench.py --compare benchmarks/results/codecs-old.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import subprocess
+from datetime import datetime
+from typing import Any, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+from app.services.storage import encode_strategy
+from app.services.storage_codecs import GzipCodec, JSONCodec, StorageCodec, ZstdCodec, train_zstd_dictionary, zstandard
+
+PLATFORMS = ["LinkedIn", "Twitter", "YouTube", "Medium", "Personal Blog", "TikTok", "Instagram", "Substack"]
+CONTENT_TYPES = ["Article", "Thread", "Video", "Tutorial", "Case Study", "Newsletter", "Podcast", "Carousel"]
+SUBJECTS = [
+    "machine learning pipelines", "career transitions", "product analytics", "cloud cost control",
+    "remote team leadership", "data visualization", "prompt engineering", "startup fundraising",
+    "technical writing", "open source maintenance", "UX research", "API design", "MLOps tooling"
+]
+ANGLES = [
+    "lessons learned from", "a beginner's guide to", "common mistakes in", "a deep dive into",
+    "behind the scenes of", "five myths about", "a case study on", "the future of"
+]
+VALUES = ["Curiosity", "Integrity", "Craftsmanship", "Generosity", "Clarity", "Resilience", "Empathy", "Rigor"]
+
+def make_document(rng: random.Random, number: int) -> bytes:
+    """Generate one strategy document with randomized shape and wording."""
+    subject = rng.choice(SUBJECTS)
+
+    def phrase() -> str:
+        return f"{rng.choice(ANGLES).capitalize()} {rng.choice(SUBJECTS)}"
+
+    report = {
+        "brand_identity": {
+            "brand_title": f"{subject.title()} Specialist and Educator",
+            "brand_slogan": f"{phrase()}, one step at a time",
+            "core_values": rng.sample(VALUES, rng.randint(3, 5))
+        },
+        "unique_strengths": {
+            "unique_strengths": [phrase() for _ in range(rng.randint(3, 8))],
+            "personal_story": " ".join(
+                f"After {rng.randint(2, 15)} years in {rng.choice(SUBJECTS)}, I moved into {subject}."
+                for _ in range(rng.randint(2, 6))
+            )
+        },
+        "target_audience": {
+            "target_audience_profile": f"Professionals with {rng.randint(0, 10)}+ years of experience interested in {subject}.",
+            "audience_interests": [phrase() for _ in range(rng.randint(3, 8))]
+        },
+        "content_strategy": {
+            "recommended_platforms": rng.sample(PLATFORMS, rng.randint(2, 5)),
+            "content_themes": [phrase() for _ in range(rng.randint(3, 8))],
+            "content_formats": rng.sample(CONTENT_TYPES, rng.randint(2, 5))
+        },
+        "launch_plan": {
+            "launch_schedule": [
+                {
+                    "week_number": week,
+                    "content": [
+                        {
+                            "content_type": rng.choice(CONTENT_TYPES),
+                            "topic": f"Week {week}: {phrase()} ({rng.randint(1, 999)})",
+                            "platform": rng.choice(PLATFORMS)
+                        }
+                        for _ in range(rng.randint(2, 6))
+                    ]
+                }
+                for week in range(1, rng.randint(8, 12) + 1)
+            ]
+        },
+        "missing_sections": []
+    }
+    return encode_strategy(report, f"bench-{number:06d}")
+
+def measure(codec: StorageCodec, documents: List[bytes], repeat: int) -> Dict[str, Any]:
+    """Encode and decode every document `repeat` times; report sizes and throughput."""
+    encoded = [codec.encode(document) for document in documents]
+    if [codec.decode(blob) for blob in encoded] != documents:
+        raise RuntimeError(f"{codec.name} did not round-trip")
+
+    raw_bytes = sum(len(document) for document in documents)
+    stored_bytes = sum(len(blob) for blob in encoded)
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for document in documents:
+            codec.encode(document)
+    encode_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for blob in encoded:
+            codec.decode(blob)
+    decode_seconds = time.perf_counter() - started
+
+    return {
+        "mean_document_bytes": round(raw_bytes / len(documents)),
+        "mean_stored_bytes": round(stored_bytes / len(documents)),
+        "ratio": round(raw_bytes / stored_bytes, 2),
+        "encode_mb_s": round(raw_bytes * repeat / encode_seconds / 1e6, 1),
+        "decode_mb_s": round(raw_bytes * repeat / decode_seconds / 1e6, 1),
+        "encode_us_per_document": round(encode_seconds / (repeat * len(documents)) * 1e6, 1),
+        "decode_us_per_document": round(decode_seconds / (repeat * len(documents)) * 1e6, 1)
+    }
+
+def build_codecs(training: List[bytes], dictionary_size: int, save_dictionary: str = None) -> Dict[str, StorageCodec]:
+    codecs: Dict[str, StorageCodec] = {
+        "json": JSONCodec(),
+        "gzip-1": GzipCodec(1),
+        "gzip-6": GzipCodec(6),
+        "gzip-9": GzipCodec(9)
+    }
+    if zstandard is None:
+        print("zstandard is not installed; skipping the zstd codecs")
+        return codecs
+
+    dictionary = train_zstd_dictionary(training, dictionary_size)
+    if save_dictionary:
+        with open(save_dictionary, "wb") as f:
+            f.write(dictionary)
+        print(f"Dictionary of {len(dictionary)} bytes written to {save_dictionary}")
+    codecs.update({
+        "zstd-1": ZstdCodec(1),
+        "zstd-3": ZstdCodec(3),
+        "zstd-19": ZstdCodec(19),
+        "zstd-3-dict": ZstdCodec(3, dictionary),
+        "zstd-19-dict": ZstdCodec(19, dictionary)
+    })
+    return codecs
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def compare(previous_path: str, current: Dict[str, Any]) -> None:
+    """Print per-codec changes against an earlier result file."""
+    with open(previous_path) as f:
+        previous = json.load(f)
+    print(f"\nCompared with {previous['commit']} ({previous['timestamp']}):")
+    for name, stats in current["codecs"].items():
+        old = previous["codecs"].get(name)
+        if not old:
+            continue
+        print(f"  {name:<13} ratio {old['ratio']} -> {stats['ratio']}  "
+              f"encode {old['encode_mb_s']} -> {stats['encode_mb_s']} MB/s  "
+              f"decode {old['decode_mb_s']} -> {stats['decode_mb_s']} MB/s")
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Storage codec size and throughput comparison")
+    parser.add_argument("--documents", type=int, default=500, help="Documents measured")
+    parser.add_argument("--train-documents", type=int, default=500, help="Separate documents the zstd dictionary is trained on")
+    parser.add_argument("--dictionary-size", type=int, default=16 * 1024, help="zstd dictionary size in bytes")
+    parser.add_argument("--repeat", type=int, default=5, help="Passes over the corpus when timing")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save-dictionary", help="Write the trained zstd dictionary to this file")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/codecs-<commit>-<time>.json)")
+    parser.add_argument("--compare", help="Earlier result file to compare against")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    rng = random.Random(args.seed)
+    training = [make_document(rng, number) for number in range(args.train_documents)]
+    documents = [make_document(rng, args.train_documents + number) for number in range(args.documents)]
+    codecs = build_codecs(training, args.dictionary_size, args.save_dictionary)
+
+    print(f"{'codec':<13} {'stored B':>9} {'ratio':>6} {'enc MB/s':>9} {'dec MB/s':>9} {'enc us':>8} {'dec us':>8}")
+    measured = {}
+    for name, codec in codecs.items():
+        stats = measure(codec, documents, args.repeat)
+        measured[name] = stats
+        print(f"{name:<13} {stats['mean_stored_bytes']:>9} {stats['ratio']:>6} {stats['encode_mb_s']:>9} "
+              f"{stats['decode_mb_s']:>9} {stats['encode_us_per_document']:>8} {stats['decode_us_per_document']:>8}")
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "config": {
+            "documents": args.documents,
+            "train_documents": args.train_documents,
+            "dictionary_size": args.dictionary_size,
+            "repeat": args.repeat,
+            "seed": args.seed,
+            "python": sys.version.split()[0]
+        },
+        "codecs": measured
+    }
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"codecs-{results['commit']}-{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        compare(args.compare, results)
@@ -0,0 +1,79 @@
+import asyncio
+import json
+import types
+from typing import Any, Dict, List
+
+import app.agents.base as base
+from app.agents.registry import create_orchestrator
+from app.models.workflow_models import ExecutionMode
+from app.services.llm_cache import LLMCache
+
+# One response carrying every agent's output fields; each agent keeps its own
+RESPONSE = json.dumps({
+    "brand_title": "AI Developer",
+    "brand_slogan": "Building AI",
+    "core_values": ["Innovation"],
+    "unique_strengths": ["Teaching"],
+    "personal_story": "From research to production",
+    "target_audience_profile": "Engineers adopting ML",
+    "audience_interests": ["MLOps"],
+    "recommended_platforms": ["LinkedIn"],
+    "content_themes": ["MLOps"],
+    "content_formats": ["Article"],
+    "launch_schedule": [
+        {"week_number": week, "content": [{"content_type": "Article", "topic": "MLOps", "platform": "LinkedIn"}]}
+        for week in range(1, 13)
+    ]
+})
+
+USER_INPUT = {
+    "basic_identity": "AI Developer and Technical Writer",
+    "branding_goal": "Build thought leadership",
+    "style_tone": "professional",
+    "content_format_preference": ["long_form"],
+    "preferred_platforms": ["LinkedIn"],
+    "target_language": "english",
+    "experience_level": "intermediate",
+    "industry_focus": "AI/Machine Learning",
+    "personal_story_highlights": "Moved from research to production ML",
+    "custom_keywords": ["MLOps"]
+}
+
+class FakeCompletions:
+    """Records the prompts of chat completion calls and answers each with RESPONSE."""
+
+    def __init__(self):
+        self.prompts: List[str] = []
+
+    async def create(self, **params: Any) -> Any:
+        self.prompts.append(params["messages"][1]["content"])
+        message = types.SimpleNamespace(content=RESPONSE)
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)], usage=None)
+
+def run_workflow(orchestrator, user_input: Dict[str, Any], previous_states=None) -> Dict[str, Any]:
+    return asyncio.run(orchestrator.execute_workflow(
+        user_input, previous_states=previous_states, mode=ExecutionMode.COMBINED
+    ))
+
+def test_combined_group_reused_when_its_members_inputs_are_unchanged(monkeypatch):
+    # Without the response cache, every agent that runs calls the LLM
+    cache = LLMCache(cache_dir=None, enabled=False)
+    monkeypatch.setattr(base, "get_llm_cache", lambda: cache)
+    completions = FakeCompletions()
+    orchestrator = create_orchestrator(types.SimpleNamespace(chat=types.SimpleNamespace(completions=completions)))
+
+    report = run_workflow(orchestrator, USER_INPUT)
+    states = orchestrator.agent_states(USER_INPUT, report)
+    group_calls = sum("Task 1" in prompt for prompt in completions.prompts)
+    assert group_calls == 1
+
+    # Only the content strategy reads the format preference
+    completions.prompts.clear()
+    changed_input = dict(USER_INPUT, content_format_preference=["short_form"])
+    regenerated = run_workflow(orchestrator, changed_input, previous_states=states)
+
+    assert not any("Task 1" in prompt for prompt in completions.prompts)
+    # The content strategy reruns; its answer is unchanged, so the launch plan is reused
+    assert len(completions.prompts) == 1
+    for section in ("brand_identity", "unique_strengths", "target_audience"):
+        assert regenerated[section] == report[section]